@@ -0,0 +1,32 @@
+import threading
+
+from django.apps import AppConfig
+from django.conf import settings
+
+
+class ApiConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'api'
+
+    def ready(self):
+        """Configure the scraper layer once per process, before any request is served."""
+        from scraper.admission import configure_bulkheads
+        from scraper.politeness import configure_outbound
+        from scraper.runtime import configure_runtime
+
+        configure_bulkheads(getattr(settings, 'BULKHEADS', None))
+        configure_outbound(getattr(settings, 'OUTBOUND_RATES', None))
+        # Shut down at process exit by scraper.runtime (atexit)
+        runtime = configure_runtime(
+            daraz_pool_size=getattr(settings, 'DARAZ_BROWSER_POOL', 2),
+            driver_max_uses=getattr(settings, 'DARAZ_DRIVER_MAX_USES', 50),
+        )
+
+        if getattr(settings, 'SCRAPER_PREWARM', False):
+            # Browsers take seconds to start; don't hold up boot for them
+            threading.Thread(
+                target=runtime.warm,
+                kwargs={'browsers': getattr(settings, 'SCRAPER_PREWARM_BROWSERS', 1)},
+                name='scraper-prewarm',
+                daemon=True,
+            ).start()
@@ -0,0 +1,214 @@
+"""
+Async versions of the scraping endpoints for ASGI deployments.
+
+Same URLs, parameters and response shapes as the views in api/views.py, but
+the request coroutine awaits the upstream work instead of blocking a worker
+thread. Blocking scraper calls run on a bounded thread pool, so one ASGI
+worker can hold many in-flight searches while only ASYNC_SCRAPE_WORKERS
+threads do the actual scraping.
+
+That pool is a hard ceiling: a process runs at most ASYNC_SCRAPE_WORKERS
+blocking scrapes at once and queues the rest, so with a 1 s upstream
+throughput stays near ASYNC_SCRAPE_WORKERS requests per second, the same
+as a WSGI worker with that many threads (see the measurements in
+README.md). The gain is that requests which don't scrape are not queued
+behind the ones that do.
+
+Enabled by ASYNC_VIEWS = True in config/settings.py (see ulrs.py).
+"""
+import asyncio
+import functools
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+
+from scraper.admission import Overloaded
+from scraper.payload import pack_compare
+from scraper.runtime import get_runtime
+from scraper.warmer import get_query_tracker
+from .caching import conditional_response, search_version
+from .pagination import search_page, slice_results
+from .params import compare_params, daraz_search_params, jeevee_search_params, lowest_prices_params
+from .views import search_daraz_page, search_jeevee_page
+
+# Threads that run blocking scraper calls for all async views; at most this
+# many scrapes run concurrently per process, the rest wait in the pool's queue
+scrape_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'ASYNC_SCRAPE_WORKERS', 32),
+    thread_name_prefix='async-scrape',
+)
+
+
+async def run_blocking(func, *args, **kwargs):
+    """Run a blocking call on the scrape pool and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(scrape_executor, functools.partial(func, *args, **kwargs))
+
+
+def error(message, status=400):
+    return JsonResponse({'error': message}, status=status)
+
+
+def overloaded(exc):
+    """429 with Retry-After, matching DRF's Throttled response"""
+    response = JsonResponse(
+        {'detail': f'Request was throttled. Expected available in {exc.retry_after} seconds.'},
+        status=429,
+    )
+    response['Retry-After'] = str(exc.retry_after)
+    return response
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncAPIView(View):
+    """Base class: JSON body parsing and CSRF exemption like DRF's APIView."""
+
+    def json_body(self, request):
+        try:
+            return json.loads(request.body or b'{}')
+        except ValueError:
+            return {}
+
+
+class ScrapeView(AsyncAPIView):
+    """
+    POST with {"url": "https://example.com"} to scrape product data from a site.
+    """
+    async def post(self, request):
+        url = self.json_body(request).get('url')
+        if not url:
+            return error('URL is required')
+        try:
+            data = await run_blocking(get_runtime().webscraper().fetch, url)
+            return JsonResponse(data)
+        except Overloaded as e:
+            return overloaded(e)
+        except Exception as e:
+            return error(str(e), status=500)
+
+
+class DarazSearchView(AsyncAPIView):
+    """
+    Search products on Daraz.
+    POST with {"query": "shoes", "region": "pk", "page": 1, "sort": "popularity"}
+    GET with ?q=shoes&region=pk&page=1&sort=popularity
+    """
+    async def post(self, request):
+        return await self._search(self.json_body(request), 'query')
+
+    async def get(self, request):
+        return await self._search(request.GET, 'q')
+
+    async def _search(self, params, key):
+        try:
+            args = daraz_search_params(params, key)
+        except ValueError as e:
+            return error(str(e))
+        try:
+            data = await run_blocking(search_daraz_page, args.query, args.region, args.page, args.sort)
+            return JsonResponse(search_page(data, args.page + 1 if data.get('products') else None, args.fields))
+        except Overloaded as e:
+            return overloaded(e)
+        except Exception as e:
+            return error(str(e), status=500)
+
+
+class JeeveeSearchView(AsyncAPIView):
+    """
+    Search products on Jeevee.
+    POST with {"query": "face wash", "page": 1, "limit": 20}
+    GET with ?q=face+wash&page=1&limit=20
+    """
+    async def post(self, request):
+        return await self._search(self.json_body(request), 'query')
+
+    async def get(self, request):
+        return await self._search(request.GET, 'q')
+
+    async def _search(self, params, key):
+        try:
+            args = jeevee_search_params(params, key)
+        except ValueError as e:
+            return error(str(e))
+        try:
+            data = await run_blocking(search_jeevee_page, args.query, args.page, args.limit)
+            return JsonResponse(search_page(data, args.page + 1 if data.get('has_next') else None, args.fields))
+        except Overloaded as e:
+            return overloaded(e)
+        except Exception as e:
+            return error(str(e), status=500)
+
+
+class PriceCompareView(AsyncAPIView):
+    """
+    Compare prices between Daraz and Jeevee.
+    POST with {"query": "face wash", "limit": 20, "min_rating": 4.0, "deadline": 30}
+    GET with ?q=face+wash&limit=20&min_rating=4&deadline=30&layout=refs
+    """
+    async def post(self, request):
+        return await self._compare(request, self.json_body(request), 'query')
+
+    async def get(self, request):
+        return await self._compare(request, request.GET, 'q')
+
+    async def _compare(self, request, params, key):
+        try:
+            args = compare_params(params, key)
+        except ValueError as e:
+            return error(str(e))
+        try:
+            # record() occasionally flushes to SQLite, keep that off the event loop
+            await run_blocking(get_query_tracker().record, args.query, args.limit)
+            comparer = get_runtime().comparer()
+            data = await run_blocking(comparer.search_all, args.query, limit=args.limit,
+                                      min_rating=args.min_rating, deadline=args.deadline)
+            if request.method == 'POST':
+                return JsonResponse(pack_compare(data, args.layout, args.fields))
+            return conditional_response(
+                request, 'search', search_version(*(data.get(name) for name in comparer.registry.names())),
+                lambda: JsonResponse(pack_compare(data, args.layout, args.fields)),
+            )
+        except Overloaded as e:
+            return overloaded(e)
+        except Exception as e:
+            return error(str(e), status=500)
+
+
+class LowestPricesView(AsyncAPIView):
+    """
+    Get products sorted by lowest price across all platforms.
+    POST with {"query": "face wash", "limit": 20, "min_rating": 4.0, "sort": "price_asc"}
+    GET with ?q=face+wash&limit=20&min_rating=4&sort=price_asc&page_size=10&fields=name,price
+    """
+    async def post(self, request):
+        return await self._lowest(request, self.json_body(request), 'query')
+
+    async def get(self, request):
+        return await self._lowest(request, request.GET, 'q')
+
+    async def _lowest(self, request, params, key):
+        try:
+            args = lowest_prices_params(params, key)
+        except ValueError as e:
+            return error(str(e))
+        try:
+            await run_blocking(get_query_tracker().record, args.query, args.limit)
+            comparer = get_runtime().comparer()
+            data = await run_blocking(comparer.get_lowest_prices, args.query, limit=args.limit,
+                                      min_rating=args.min_rating, sort=args.sort, deadline=args.deadline,
+                                      facet_query=args.facet_query)
+            if request.method == 'POST':
+                return JsonResponse(slice_results(data, args.page, args.fields))
+            return conditional_response(
+                request, 'search', search_version(*data['sources'].values()),
+                lambda: JsonResponse(slice_results(data, args.page, args.fields)),
+            )
+        except Overloaded as e:
+            return overloaded(e)
+        except Exception as e:
+            return error(str(e), status=500)
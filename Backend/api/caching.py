@@ -0,0 +1,68 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.utils.cache import get_conditional_response, patch_cache_control
+
+# Cache-Control per endpoint group; override with settings.HTTP_CACHE_CONTROL
+DEFAULT_CACHE_CONTROL = {
+    'static': {'public': True, 'max_age': 3600},
+    'catalog': {'public': True, 'max_age': 300},
+    'search': {'public': True, 'max_age': 60},
+}
+
+
+def make_etag(*parts):
+    """Strong ETag (quoted) for any JSON-serializable parts"""
+    blob = json.dumps(parts, sort_keys=True, default=str).encode('utf-8')
+    return '"%s"' % hashlib.sha1(blob).hexdigest()[:32]
+
+
+def search_version(*sections):
+    """
+    Version of a search response built from result-cache entries: the key,
+    stored_at and negative flag from the cache meta ('cache' key) of every
+    source section. The entry's status (fresh/stale) and overloaded flag
+    are left out, since the same stored entry is the same body whatever
+    state it is served in. None if any section was not served from the
+    cache (live, pending, timed out), since then there is nothing cheaper
+    than the body itself to validate against.
+    """
+    metas = [section.get('cache') if isinstance(section, dict) else None for section in sections]
+    if not metas or any(meta is None for meta in metas):
+        return None
+    return [[meta.get('key'), meta.get('stored_at'), meta.get('negative', False)] for meta in metas]
+
+
+def conditional_response(request, policy, version, build):
+    """
+    Answer a GET with validators, and with 304 Not Modified when the
+    client's If-None-Match already matches, without building (or rendering)
+    the body.
+
+    Args:
+        request: Django or DRF request
+        policy: Key of the Cache-Control policy ('static', 'catalog', 'search')
+        version: JSON-serializable identity of the body; None means the
+            body cannot be validated (e.g. partial search results) and is
+            sent with no ETag and Cache-Control: no-cache
+        build: Returns the full response when it is needed
+    """
+    etag = None
+    if version is not None:
+        # The browsable API and JSON are different bodies for the same data
+        renderer = getattr(request, 'accepted_renderer', None)
+        etag = make_etag(version, getattr(renderer, 'format', 'json'))
+
+    response = get_conditional_response(request, etag=etag) if etag else None
+    if response is None:
+        response = build()
+    if not (200 <= response.status_code < 300 or response.status_code == 304):
+        return response
+    if etag is None:
+        patch_cache_control(response, no_cache=True)
+        return response
+    response['ETag'] = etag
+    cache_control = getattr(settings, 'HTTP_CACHE_CONTROL', {}).get(policy) or DEFAULT_CACHE_CONTROL[policy]
+    patch_cache_control(response, **cache_control)
+    return response
@@ -0,0 +1,257 @@
+"""
+Shopping carts keyed by session.
+
+Each cart holds its lines in a dict keyed by (product_id, size, color), plus
+running totals, so adding, removing and reading a cart never scans or
+re-sums it. Adding to an existing line reprices it at the product's current
+price. Every mutation is atomic. Two backends:
+
+- MemoryCartStore: per-process, for development and single-worker setups
+- SQLiteCartStore: shared by every worker on the host (CART_STORE = 'sqlite')
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from decimal import Decimal
+
+from django.conf import settings
+
+from scraper import storage
+
+
+def line_key(product_id, size, color):
+    return json.dumps([product_id, size, color])
+
+
+class CartStore:
+    """
+    Interface shared by the cart backends. Carts are returned as
+    {'items': [...], 'total': Decimal, 'count': lines, 'quantity': units}.
+    """
+
+    def get(self, session):
+        raise NotImplementedError
+
+    def add(self, session, product, quantity=1, size=None, color=None):
+        """Add quantity of product (a dict with id, name, price, image); returns the cart"""
+        raise NotImplementedError
+
+    def remove(self, session, product_id, size=None, color=None):
+        """Remove the matching line, if any; returns the cart"""
+        raise NotImplementedError
+
+
+def _empty_cart():
+    return {'items': [], 'total': Decimal('0'), 'count': 0, 'quantity': 0}
+
+
+class MemoryCartStore(CartStore):
+    """
+    Carts in a dict in this process, least recently used evicted past
+    max_carts.
+    """
+
+    def __init__(self, max_carts=10000):
+        self.max_carts = max_carts
+        self._carts = OrderedDict()  # session -> {'lines': {key: line}, 'total', 'quantity'}
+        self._lock = threading.Lock()
+
+    def get(self, session):
+        with self._lock:
+            cart = self._carts.get(session)
+            if cart is not None:
+                self._carts.move_to_end(session)
+            return self._snapshot(cart)
+
+    def add(self, session, product, quantity=1, size=None, color=None):
+        key = line_key(product['id'], size, color)
+        price = Decimal(str(product['price']))
+        with self._lock:
+            cart = self._carts.get(session)
+            if cart is None:
+                cart = self._carts[session] = {'lines': {}, 'total': Decimal('0'), 'quantity': 0}
+                while len(self._carts) > self.max_carts:
+                    self._carts.popitem(last=False)
+            self._carts.move_to_end(session)
+            line = cart['lines'].get(key)
+            if line is None:
+                line = cart['lines'][key] = {
+                    'product_id': product['id'],
+                    'name': product['name'],
+                    'price': price,
+                    'quantity': 0,
+                    'size': size,
+                    'color': color,
+                    'image': product['image'],
+                }
+            # The whole line is repriced at the current price, so the total
+            # stays the sum of the lines when the catalog changes
+            cart['total'] += price * (line['quantity'] + quantity) - line['price'] * line['quantity']
+            line['price'] = price
+            line['quantity'] += quantity
+            cart['quantity'] += quantity
+            return self._snapshot(cart)
+
+    def remove(self, session, product_id, size=None, color=None):
+        with self._lock:
+            cart = self._carts.get(session)
+            if cart is None:
+                return _empty_cart()
+            line = cart['lines'].pop(line_key(product_id, size, color), None)
+            if line is not None:
+                cart['total'] -= line['price'] * line['quantity']
+                cart['quantity'] -= line['quantity']
+            return self._snapshot(cart)
+
+    def _snapshot(self, cart):
+        # Caller holds self._lock; copies so callers never see later mutations
+        if cart is None:
+            return _empty_cart()
+        return {
+            'items': [dict(line) for line in cart['lines'].values()],
+            'total': cart['total'],
+            'count': len(cart['lines']),
+            'quantity': cart['quantity'],
+        }
+
+
+class SQLiteCartStore(CartStore):
+    """
+    Carts in SQLite, shared by every worker process on the host. Lines are
+    keyed by (session, product_id, size, color) and each cart row keeps its
+    running totals; every mutation is one IMMEDIATE transaction.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or storage.data_path('carts.sqlite3')
+        self._lock = threading.Lock()
+        self._conn = storage.connect(self.path)
+        self._conn.executescript('''
+            CREATE TABLE IF NOT EXISTS cart_lines (
+                session TEXT NOT NULL,
+                line_key TEXT NOT NULL,
+                line TEXT NOT NULL,
+                price TEXT NOT NULL,
+                quantity INTEGER NOT NULL,
+                PRIMARY KEY (session, line_key)
+            );
+            CREATE TABLE IF NOT EXISTS carts (
+                session TEXT PRIMARY KEY,
+                total TEXT NOT NULL,
+                quantity INTEGER NOT NULL,
+                lines INTEGER NOT NULL,
+                updated_at REAL NOT NULL
+            );
+        ''')
+        self._conn.commit()
+
+    def get(self, session):
+        with self._lock:
+            return self._read(session)
+
+    def add(self, session, product, quantity=1, size=None, color=None):
+        key = line_key(product['id'], size, color)
+        line = {
+            'product_id': product['id'],
+            'name': product['name'],
+            'size': size,
+            'color': color,
+            'image': product['image'],
+        }
+        price = Decimal(str(product['price']))
+
+        def mutate(conn, total, units, lines):
+            existing = conn.execute(
+                'SELECT price, quantity FROM cart_lines WHERE session = ? AND line_key = ?', (session, key)
+            ).fetchone()
+            # The whole line is repriced at the current price, as in MemoryCartStore
+            conn.execute('''
+                INSERT INTO cart_lines VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (session, line_key) DO UPDATE SET
+                    price = excluded.price, quantity = quantity + excluded.quantity
+            ''', (session, key, json.dumps(line), str(price), quantity))
+            if existing is None:
+                return total + price * quantity, units + quantity, lines + 1
+            old_price, old_quantity = Decimal(existing[0]), existing[1]
+            total += price * (old_quantity + quantity) - old_price * old_quantity
+            return total, units + quantity, lines
+
+        return self._mutate(session, mutate)
+
+    def remove(self, session, product_id, size=None, color=None):
+        key = line_key(product_id, size, color)
+
+        def mutate(conn, total, units, lines):
+            row = conn.execute(
+                'SELECT price, quantity FROM cart_lines WHERE session = ? AND line_key = ?', (session, key)
+            ).fetchone()
+            if row is None:
+                return total, units, lines
+            conn.execute('DELETE FROM cart_lines WHERE session = ? AND line_key = ?', (session, key))
+            return total - Decimal(row[0]) * row[1], units - row[1], lines - 1
+
+        return self._mutate(session, mutate)
+
+    def _mutate(self, session, mutate):
+        with self._lock:
+            conn = self._conn
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                row = conn.execute(
+                    'SELECT total, quantity, lines FROM carts WHERE session = ?', (session,)
+                ).fetchone()
+                total, units, lines = (Decimal(row[0]), row[1], row[2]) if row else (Decimal('0'), 0, 0)
+                total, units, lines = mutate(conn, total, units, lines)
+                conn.execute(
+                    'INSERT OR REPLACE INTO carts VALUES (?, ?, ?, ?, ?)',
+                    (session, str(total), units, lines, time.time()),
+                )
+                cart = self._read(session)
+                conn.execute('COMMIT')
+                return cart
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+
+    def _read(self, session):
+        # Caller holds self._lock
+        totals = self._conn.execute(
+            'SELECT total, quantity, lines FROM carts WHERE session = ?', (session,)
+        ).fetchone()
+        if totals is None:
+            return _empty_cart()
+        items = []
+        for line, price, quantity in self._conn.execute(
+            'SELECT line, price, quantity FROM cart_lines WHERE session = ? ORDER BY rowid', (session,)
+        ):
+            line = json.loads(line)
+            items.append({
+                'product_id': line['product_id'],
+                'name': line['name'],
+                'price': Decimal(price),
+                'quantity': quantity,
+                'size': line['size'],
+                'color': line['color'],
+                'image': line['image'],
+            })
+        return {'items': items, 'total': Decimal(totals[0]), 'count': totals[2], 'quantity': totals[1]}
+
+
+CART_STORES = {
+    'memory': MemoryCartStore,
+    'sqlite': SQLiteCartStore,
+}
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_cart_store():
+    """Return the process-wide cart store selected by settings.CART_STORE"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = CART_STORES[getattr(settings, 'CART_STORE', 'memory')]()
+        return _store
@@ -0,0 +1,85 @@
+import csv
+import json
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api.models import Product
+
+UPDATE_FIELDS = ['name', 'price', 'description', 'image', 'colors', 'sizes',
+                 'category', 'brand', 'featured', 'updated_at']
+
+
+def read_rows(path):
+    """Yield product dicts from a .json (list), .jsonl or .csv file"""
+    if path.endswith('.csv'):
+        with open(path, newline='', encoding='utf-8') as f:
+            yield from csv.DictReader(f)
+    elif path.endswith('.jsonl'):
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        yield from data.get('products', []) if isinstance(data, dict) else data
+
+
+def parse_list(value, item=str):
+    """List from a JSON array, a JSON string or a 'a|b|c' string (CSV cells)"""
+    if value in (None, ''):
+        return []
+    if isinstance(value, str):
+        value = json.loads(value) if value.startswith('[') else value.split('|')
+    return [item(v) for v in value]
+
+
+def to_product(row):
+    try:
+        return Product(
+            id=int(row['id']) if row.get('id') not in (None, '') else None,
+            name=row['name'],
+            price=Decimal(str(row['price'])),
+            description=row.get('description') or '',
+            image=row.get('image') or '',
+            colors=parse_list(row.get('colors')),
+            sizes=parse_list(row.get('sizes'), int),
+            category=row.get('category') or '',
+            brand=row.get('brand') or '',
+            featured=str(row.get('featured', '')).lower() in ('1', 'true', 'yes'),
+        )
+    except (KeyError, ValueError, InvalidOperation) as e:
+        raise CommandError(f"Bad catalog row {row!r}: {e}")
+
+
+class Command(BaseCommand):
+    help = 'Bulk-load catalog products from a JSON, JSON Lines or CSV file (upserts on id).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Catalog file (.json, .jsonl or .csv)')
+        parser.add_argument('--batch-size', type=int, default=2000, help='Rows per INSERT')
+        parser.add_argument('--replace', action='store_true', help='Delete every existing product first')
+
+    def handle(self, *args, **options):
+        rows = read_rows(options['path'])
+        loaded = 0
+        with transaction.atomic():
+            if options['replace']:
+                deleted, _ = Product.objects.all().delete()
+                self.stdout.write(f"Deleted {deleted} existing products")
+            while True:
+                batch = [to_product(row) for row in islice(rows, options['batch_size'])]
+                if not batch:
+                    break
+                with_id = [p for p in batch if p.id is not None]
+                Product.objects.bulk_create(
+                    with_id, update_conflicts=True, unique_fields=['id'], update_fields=UPDATE_FIELDS,
+                )
+                Product.objects.bulk_create([p for p in batch if p.id is None])
+                loaded += len(batch)
+                if options['verbosity'] > 1:
+                    self.stdout.write(f"  {loaded} products loaded")
+        self.stdout.write(self.style.SUCCESS(f"Loaded {loaded} products"))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from scraper.jobs import JobWorker
+
+
+class Command(BaseCommand):
+    help = 'Process queued scrape and compare jobs (see /api/jobs/). Run as many as you need.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=1, help='Jobs run at once by this worker')
+        parser.add_argument('--poll', type=float, default=1.0, help='Seconds between polls when idle')
+        parser.add_argument('--once', action='store_true', help='Run the jobs that are ready now and exit')
+
+    def handle(self, *args, **options):
+        worker = JobWorker(concurrency=options['concurrency'], poll_interval=options['poll'])
+
+        if options['once']:
+            ran = worker.run_once()
+            self.stdout.write(self.style.SUCCESS(f"Ran {ran} job(s)"))
+            return
+
+        self.stdout.write(f"Worker {worker.owner} processing jobs (Ctrl+C to stop)")
+        try:
+            worker.run_forever()
+        except KeyboardInterrupt:
+            worker.stop()
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from scraper.warmer import CacheWarmer
+
+
+class Command(BaseCommand):
+    help = 'Refresh cached search results for popular and quick-search queries before they expire.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=100, help='Number of popular queries to keep warm')
+        parser.add_argument('--sessions', type=int, default=1, help='Max concurrent upstream fetches (browser sessions)')
+        parser.add_argument('--interval', type=float, default=60.0, help='Seconds between passes')
+        parser.add_argument('--once', action='store_true', help='Run a single pass and exit')
+
+    def handle(self, *args, **options):
+        warmer = CacheWarmer(top_n=options['top'], max_sessions=options['sessions'])
+
+        if options['once']:
+            summary = warmer.run_once()
+            self.stdout.write(self.style.SUCCESS(f"Warmed cache: {summary}"))
+            return
+
+        self.stdout.write(f"Warming cache every {options['interval']}s (Ctrl+C to stop)")
+        try:
+            warmer.run_forever(interval=options['interval'])
+        except KeyboardInterrupt:
+            warmer.stop()
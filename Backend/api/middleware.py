@@ -0,0 +1,88 @@
+import gzip
+import re
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    brotli = None
+    BROTLI_AVAILABLE = False
+
+COMPRESSIBLE_TYPES = ('application/json', 'application/javascript', 'text/')
+
+_encoding_re = re.compile(r'\s*([\w*-]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?\s*$')
+
+
+def accepted_encodings(header):
+    """Encodings from an Accept-Encoding header with q > 0, best first"""
+    weighted = []
+    for part in header.split(','):
+        match = _encoding_re.match(part)
+        if not match:
+            continue
+        try:
+            q = float(match.group(2)) if match.group(2) else 1.0
+        except ValueError:
+            continue
+        if q > 0:
+            weighted.append((q, match.group(1).lower()))
+    weighted.sort(key=lambda item: -item[0])
+    return [encoding for _, encoding in weighted]
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compress responses with Brotli (when the brotli package is installed) or
+    gzip, whichever the client prefers, once the body is larger than
+    COMPRESS_MIN_SIZE bytes. Small bodies are sent as is since compressing
+    them costs more CPU than it saves on the wire.
+
+    Streaming responses (SSE / NDJSON comparisons) are left alone so their
+    events still reach the client as they are produced.
+    """
+
+    def process_response(self, request, response):
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        content_type = response.get('Content-Type', '')
+        if not content_type.startswith(COMPRESSIBLE_TYPES):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if len(response.content) < getattr(settings, 'COMPRESS_MIN_SIZE', 1024):
+            return response
+
+        encoding = None
+        for candidate in accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', '')):
+            if candidate == 'br' and BROTLI_AVAILABLE:
+                encoding = 'br'
+                break
+            if candidate in ('gzip', '*'):
+                encoding = 'gzip'
+                break
+        if encoding is None:
+            return response
+
+        if encoding == 'br':
+            compressed = brotli.compress(
+                response.content, quality=getattr(settings, 'COMPRESS_BROTLI_QUALITY', 5)
+            )
+        else:
+            compressed = gzip.compress(
+                response.content, compresslevel=getattr(settings, 'COMPRESS_GZIP_LEVEL', 6), mtime=0
+            )
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response.headers['Content-Length'] = str(len(compressed))
+        response.headers['Content-Encoding'] = encoding
+        # The compressed body differs byte-for-byte, so a strong ETag must
+        # become weak (same as django.middleware.gzip.GZipMiddleware)
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        return response
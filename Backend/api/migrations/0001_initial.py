@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:19
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Product',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200)),
+                ('price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('description', models.TextField(blank=True)),
+                ('image', models.CharField(blank=True, max_length=500)),
+                ('colors', models.JSONField(blank=True, default=list)),
+                ('sizes', models.JSONField(blank=True, default=list)),
+                ('category', models.CharField(max_length=100)),
+                ('brand', models.CharField(max_length=100)),
+                ('featured', models.BooleanField(default=False)),
+                ('updated_at', models.DateTimeField(auto_now=True, db_index=True)),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['category', 'id'], name='product_category_idx'), models.Index(django.db.models.functions.text.Lower('brand'), models.F('id'), name='product_brand_idx'), models.Index(condition=models.Q(('featured', True)), fields=['id'], name='product_featured_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,64 @@
+from django.db import migrations
+
+# The catalog that used to live in api/views.py as PRODUCTS
+SEED_PRODUCTS = [
+    {
+        'id': 1,
+        'name': 'Nike Air Max 270',
+        'price': '150.00',
+        'description': 'The Nike Air Max 270 delivers visible cushioning under every step.',
+        'image': '/images/shoe1.png',
+        'colors': ['#2e2c2e', '#ffffff', '#ff0000', '#0000ff'],
+        'sizes': [7, 8, 9, 10, 11, 12],
+        'category': 'running',
+        'brand': 'Nike',
+        'featured': True,
+    },
+    {
+        'id': 2,
+        'name': 'Nike React Infinity',
+        'price': '160.00',
+        'description': 'Designed to help reduce injury and keep you on the run.',
+        'image': '/images/shoe2.png',
+        'colors': ['#2e2c2e', '#808080', '#00ff00'],
+        'sizes': [7, 8, 9, 10, 11],
+        'category': 'running',
+        'brand': 'Nike',
+        'featured': True,
+    },
+    {
+        'id': 3,
+        'name': 'Nike ZoomX Vaporfly',
+        'price': '250.00',
+        'description': 'Built for record-breaking speed.',
+        'image': '/images/shoe3.png',
+        'colors': ['#ff6b6b', '#4ecdc4', '#2e2c2e'],
+        'sizes': [8, 9, 10, 11, 12],
+        'category': 'performance',
+        'brand': 'Nike',
+        'featured': False,
+    },
+]
+
+
+def seed_products(apps, schema_editor):
+    Product = apps.get_model('api', 'Product')
+    Product.objects.bulk_create(
+        [Product(**product) for product in SEED_PRODUCTS], ignore_conflicts=True,
+    )
+
+
+def unseed_products(apps, schema_editor):
+    Product = apps.get_model('api', 'Product')
+    Product.objects.filter(id__in=[product['id'] for product in SEED_PRODUCTS]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_products, unseed_products),
+    ]
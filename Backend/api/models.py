@@ -0,0 +1,79 @@
+import threading
+import time
+
+from django.db import models
+from django.db.models import F, Max, Q
+from django.db.models.functions import Lower
+
+# Columns sent in product lists; detail views add the description
+PRODUCT_LIST_FIELDS = ('id', 'name', 'price', 'image', 'colors', 'sizes', 'category', 'brand', 'featured')
+PRODUCT_DETAIL_FIELDS = PRODUCT_LIST_FIELDS + ('description',)
+
+# Seconds catalog_version() may lag behind writes from other processes
+CATALOG_VERSION_TTL = 5.0
+
+
+class ProductQuerySet(models.QuerySet):
+    def catalog(self, category=None, brand=None, featured=False):
+        """
+        Filter the way ProductListView does, in a form the indexes cover:
+        category and featured are exact matches, brand is case-insensitive
+        through the Lower(brand) index.
+        """
+        qs = self
+        if category:
+            qs = qs.filter(category=category)
+        if brand:
+            qs = qs.annotate(brand_lower=Lower('brand')).filter(brand_lower=brand.lower())
+        if featured:
+            qs = qs.filter(featured=True)
+        return qs
+
+
+class Product(models.Model):
+    name = models.CharField(max_length=200)
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+    description = models.TextField(blank=True)
+    image = models.CharField(max_length=500, blank=True)
+    colors = models.JSONField(default=list, blank=True)
+    sizes = models.JSONField(default=list, blank=True)
+    category = models.CharField(max_length=100)
+    brand = models.CharField(max_length=100)
+    featured = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = ProductQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['id']
+        # Each filter index ends with id so filtered pages come out in id
+        # order straight from the index. Featured is a partial index since
+        # Django filters booleans as a bare `WHERE featured`.
+        indexes = [
+            models.Index(fields=['category', 'id'], name='product_category_idx'),
+            models.Index(Lower('brand'), F('id'), name='product_brand_idx'),
+            models.Index(fields=['id'], condition=Q(featured=True), name='product_featured_idx'),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+_version = None
+_version_checked = 0.0
+_version_lock = threading.Lock()
+
+
+def catalog_version():
+    """
+    Identity of the catalog's current contents (last update time and row
+    count), for ETags. Cached for CATALOG_VERSION_TTL seconds.
+    """
+    global _version, _version_checked
+    with _version_lock:
+        if _version is None or time.monotonic() - _version_checked > CATALOG_VERSION_TTL:
+            # Two queries: SQLite answers MAX from the index but only when alone
+            updated = Product.objects.aggregate(updated=Max('updated_at'))['updated']
+            _version = [updated, Product.objects.count()]
+            _version_checked = time.monotonic()
+        return _version
@@ -0,0 +1,118 @@
+"""
+Cursor pagination and sparse fieldsets for the product and search endpoints.
+
+Cursors are opaque to clients: URL-safe base64 of a little JSON state, e.g.
+{"after": 120} (catalog keyset), {"page": 3} (upstream search page) or
+{"offset": 40} (a slice of a cached result set). Clients send back the
+previous response's next_cursor unchanged; null means there is no next page.
+
+fields=name,price,image projects each product to those keys before it is
+serialized; unknown fields are ignored.
+"""
+import base64
+import json
+
+from scraper.payload import project
+
+# Default page_size when slicing a cached result set (lowest prices)
+RESULT_PAGE_SIZE = 20
+
+
+def encode_cursor(**state):
+    blob = json.dumps(state, separators=(',', ':'), sort_keys=True).encode('utf-8')
+    return base64.urlsafe_b64encode(blob).rstrip(b'=').decode('ascii')
+
+
+def decode_cursor(cursor, key):
+    """
+    The non-negative integer `key` of a cursor from encode_cursor.
+
+    Raises:
+        ValueError: malformed cursor, or one made for another endpoint
+    """
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        value = state[key]
+    except (ValueError, TypeError, KeyError):
+        raise ValueError('Invalid cursor')
+    if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+        raise ValueError('Invalid cursor')
+    return value
+
+
+def parse_fields(value):
+    """'name,price' (or a list, from JSON bodies) -> ('name', 'price'); None when absent"""
+    if not value:
+        return None
+    if isinstance(value, str):
+        value = value.split(',')
+    fields = tuple(dict.fromkeys(str(field).strip() for field in value if str(field).strip()))
+    return fields or None
+
+
+def request_page(params):
+    """
+    Upstream page number from a `cursor` if one was sent, else from `page`
+    (default 1).
+
+    Raises:
+        ValueError: invalid cursor or page
+    """
+    cursor = params.get('cursor')
+    if cursor:
+        return max(1, decode_cursor(cursor, 'page'))
+    try:
+        return max(1, int(params.get('page', 1)))
+    except (TypeError, ValueError):
+        raise ValueError('page must be an integer')
+
+
+def search_page(data, next_page, fields=None):
+    """
+    An upstream search page with its products projected to fields and
+    next_cursor pointing at next_page (None on the last page).
+    """
+    data = dict(data, products=project(data.get('products', []), fields))
+    data['next_cursor'] = encode_cursor(page=next_page) if next_page else None
+    return data
+
+
+def result_slice(params):
+    """
+    (offset, page_size) from `cursor`/`page_size`, or None when neither was
+    sent and the client wants the whole result set.
+
+    Raises:
+        ValueError: invalid cursor or page_size
+    """
+    cursor = params.get('cursor')
+    page_size = params.get('page_size')
+    if not cursor and page_size in (None, ''):
+        return None
+    offset = decode_cursor(cursor, 'offset') if cursor else 0
+    try:
+        page_size = RESULT_PAGE_SIZE if page_size in (None, '') else int(page_size)
+    except (TypeError, ValueError):
+        raise ValueError('page_size must be an integer')
+    if page_size < 1:
+        raise ValueError('page_size must be at least 1')
+    return offset, page_size
+
+
+def slice_results(data, page, fields=None):
+    """
+    One page of a result set the server already holds (data['products']),
+    with products projected to fields. page is a result_slice() tuple; None
+    sends every product.
+
+    The set is rebuilt from the result cache on every request, so offsets
+    stay stable for as long as the cached source results do.
+    """
+    products = data.get('products', [])
+    if page is None:
+        return dict(data, products=project(products, fields)) if fields else data
+    offset, page_size = page
+    end = offset + page_size
+    data = dict(data, products=project(products[offset:end], fields))
+    data['next_cursor'] = encode_cursor(offset=end) if end < len(products) else None
+    return data
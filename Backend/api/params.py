@@ -0,0 +1,100 @@
+"""
+Request parameters for the search and comparison endpoints, shared by the
+sync views (api/views.py), the async ones (api/async_views.py) and batch
+operations so they all validate the same way.
+
+Each parser takes a QueryDict or a JSON body plus the name the query
+arrives under ('q' for GET, 'query' for POST bodies and batch params) and
+returns SearchArgs. Invalid input raises ValueError with the message the
+views send back in a 400.
+"""
+from scraper.facets import parse_facet_query
+from scraper.payload import LAYOUTS
+from scraper.price_compare import SORT_KEYS, parse_deadline, parse_min_rating
+from .pagination import parse_fields, request_page, result_slice
+
+DEFAULT_LIMIT = 20
+
+
+class SearchArgs:
+    """Validated parameters; the ones an endpoint doesn't take stay None"""
+
+    def __init__(self, query, fields=None, limit=DEFAULT_LIMIT, page=None, region=None, sort=None,
+                 min_rating=None, deadline=None, layout=None, facet_query=None):
+        self.query = query
+        self.fields = fields  # parse_fields() tuple
+        self.limit = limit
+        self.page = page  # upstream page number, or a result_slice() tuple for lowest prices
+        self.region = region
+        self.sort = sort
+        self.min_rating = min_rating
+        self.deadline = deadline
+        self.layout = layout
+        self.facet_query = facet_query
+
+
+def parse_query(params, key='query'):
+    query = params.get(key)
+    if not query:
+        raise ValueError('Query is required' if key == 'query' else f'Query parameter "{key}" is required')
+    return query
+
+
+def parse_limit(value, default=DEFAULT_LIMIT):
+    """
+    Raises:
+        ValueError: value is not an integer
+    """
+    if value is None or value == '':
+        return default
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError('limit must be an integer')
+
+
+def daraz_search_params(params, key='query'):
+    """query, region (default pk), sort (default popularity), page/cursor and fields"""
+    return SearchArgs(
+        parse_query(params, key), fields=parse_fields(params.get('fields')), page=request_page(params),
+        region=params.get('region', 'pk'), sort=params.get('sort', 'popularity'),
+    )
+
+
+def jeevee_search_params(params, key='query'):
+    """query, limit (default 20), page/cursor and fields"""
+    return SearchArgs(
+        parse_query(params, key), fields=parse_fields(params.get('fields')), page=request_page(params),
+        limit=parse_limit(params.get('limit')),
+    )
+
+
+def stream_params(params, key='query'):
+    """query, limit, min_rating (default 4.0, 0 for no filter), deadline and fields"""
+    return SearchArgs(
+        parse_query(params, key), fields=parse_fields(params.get('fields')), limit=parse_limit(params.get('limit')),
+        min_rating=parse_min_rating(params.get('min_rating')), deadline=parse_deadline(params.get('deadline')),
+    )
+
+
+def compare_params(params, key='query'):
+    """stream_params() plus layout (default full, one of LAYOUTS)"""
+    args = stream_params(params, key)
+    args.layout = params.get('layout', 'full')
+    if args.layout not in LAYOUTS:
+        raise ValueError(f'layout must be one of: {", ".join(LAYOUTS)}')
+    return args
+
+
+def lowest_prices_params(params, key='query'):
+    """
+    stream_params() plus sort (default price_asc, one of SORT_KEYS), a
+    result_slice() page and the facet filters (see scraper/facets.py)
+    """
+    args = stream_params(params, key)
+    args.sort = params.get('sort', 'price_asc')
+    if args.sort not in SORT_KEYS:
+        raise ValueError(f'sort must be one of: {", ".join(SORT_KEYS)}')
+    args.page = result_slice(params)
+    args.facet_query = parse_facet_query(params)
+    return args
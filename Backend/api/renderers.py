@@ -0,0 +1,71 @@
+import json
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes with orjson when it is installed (several
+    times faster on large product lists). Output is compact UTF-8 like
+    the default renderer; indented output (Accept: application/json;
+    indent=2) and anything orjson cannot encode fall back to the stdlib.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if ORJSON_AVAILABLE and not self.get_indent(accepted_media_type, renderer_context or {}):
+            try:
+                return orjson.dumps(
+                    data,
+                    default=self.encoder_class().default,
+                    option=orjson.OPT_NON_STR_KEYS,
+                )
+            except (orjson.JSONEncodeError, TypeError):
+                pass
+        return super().render(data, accepted_media_type, renderer_context)
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Server-Sent Events. Each event dict is written as
+    `event: <name>` / `data: <json>` followed by a blank line.
+    """
+    media_type = 'text/event-stream'
+    format = 'sse'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, dict) and 'event' not in data:
+            # Plain responses (e.g. validation errors) become a single event
+            data = {'event': 'error' if 'error' in data else 'message', **data}
+        return self.encode_event(data)
+
+    @staticmethod
+    def encode_event(event):
+        payload = {k: v for k, v in event.items() if k != 'event'}
+        return (
+            f"event: {event.get('event', 'message')}\n"
+            f"data: {json.dumps(payload, default=str)}\n\n"
+        ).encode('utf-8')
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Newline-delimited JSON, one event object per line."""
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return self.encode_event(data)
+
+    @staticmethod
+    def encode_event(event):
+        return (json.dumps(event, default=str) + '\n').encode('utf-8')
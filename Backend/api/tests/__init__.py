@@ -0,0 +1,7 @@
+"""
+Tests for the api app. Run from Backend/ with `python manage.py test`.
+
+Importing scraper.tests points scraper storage at a temporary directory.
+"""
+
+import scraper.tests  # noqa: F401
@@ -0,0 +1,25 @@
+from django.test import SimpleTestCase
+
+from scraper.admission import Overloaded
+from scraper.runtime import get_runtime
+
+
+class OverloadedWebScraper:
+    def fetch(self, url):
+        raise Overloaded('webscraper', 4.5)
+
+
+class AdmissionViewTests(SimpleTestCase):
+    def setUp(self):
+        runtime = get_runtime()
+        previous, runtime._webscraper = runtime._webscraper, OverloadedWebScraper()
+        self.addCleanup(setattr, runtime, '_webscraper', previous)
+
+    def test_rejected_call_is_429_with_retry_after(self):
+        response = self.client.post('/api/scrape/', {'url': 'https://example.com'}, content_type='application/json')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '5')
+
+    def test_stats_endpoint(self):
+        response = self.client.get('/api/admission/stats/')
+        self.assertEqual(response.status_code, 200)
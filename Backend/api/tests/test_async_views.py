@@ -0,0 +1,105 @@
+import json
+import threading
+
+from asgiref.sync import async_to_sync
+from django.test import RequestFactory, SimpleTestCase
+
+from api import async_views
+from scraper.admission import Overloaded
+from scraper.runtime import get_runtime
+from scraper.tests.fakes import FakeSource, runtime_comparer
+
+
+def products(source, count):
+    return [{'id': f'{source}{i}', 'name': f'{source} toner {i}', 'price': str(200 - i), 'rating': 4.5}
+            for i in range(count)]
+
+
+class FakeWebScraper:
+    def __init__(self, error=None):
+        self.error = error
+        self.threads = []
+
+    def fetch(self, url):
+        self.threads.append(threading.current_thread().name)
+        if self.error is not None:
+            raise self.error
+        return {'url': url, 'title': 'Example'}
+
+
+class AsyncViewTests(SimpleTestCase):
+    factory = RequestFactory()
+
+    def call(self, view, request):
+        return async_to_sync(view.as_view())(request)
+
+    def use_webscraper(self, scraper):
+        runtime = get_runtime()
+        previous, runtime._webscraper = runtime._webscraper, scraper
+        self.addCleanup(setattr, runtime, '_webscraper', previous)
+
+    def test_blocking_calls_run_on_the_scrape_pool(self):
+        scraper = FakeWebScraper()
+        self.use_webscraper(scraper)
+        request = self.factory.post('/api/scrape/', json.dumps({'url': 'https://example.com'}),
+                                    content_type='application/json')
+        response = self.call(async_views.ScrapeView, request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)['title'], 'Example')
+        self.assertTrue(scraper.threads[0].startswith('async-scrape'))
+
+    def test_overloaded_becomes_429(self):
+        self.use_webscraper(FakeWebScraper(error=Overloaded('daraz-browser', 2.2)))
+        request = self.factory.post('/api/scrape/', json.dumps({'url': 'https://example.com'}),
+                                    content_type='application/json')
+        response = self.call(async_views.ScrapeView, request)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '3')
+
+    def test_lowest_prices_matches_the_sync_shape(self):
+        sources = (FakeSource('jeevee', products('j', 3)), FakeSource('daraz', products('d', 2)))
+        with runtime_comparer(*sources):
+            request = self.factory.get('/api/lowest-prices/', {'q': 'async toner', 'min_rating': '0',
+                                                               'page_size': '2'})
+            response = self.call(async_views.LowestPricesView, request)
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content)
+        self.assertEqual([p['price'] for p in data['products']], ['198', '199'])
+        self.assertIsNotNone(data['next_cursor'])
+        # Live (uncached) results cannot be validated
+        self.assertFalse(response.has_header('ETag'))
+        self.assertIn('no-cache', response['Cache-Control'])
+
+    def test_lowest_prices_filters_before_the_limit(self):
+        sources = (FakeSource('jeevee', products('j', 3)), FakeSource('daraz', products('d', 3)))
+        with runtime_comparer(*sources):
+            request = self.factory.get('/api/lowest-prices/', {'q': 'async toner', 'min_rating': '0',
+                                                               'limit': '2', 'source': 'jeevee'})
+            response = self.call(async_views.LowestPricesView, request)
+        data = json.loads(response.content)
+        self.assertEqual([p['source'] for p in data['products']], ['Jeevee', 'Jeevee'])
+        self.assertEqual(data['matched'], 2)
+
+    def test_lowest_prices_rejects_unknown_sort(self):
+        request = self.factory.get('/api/lowest-prices/', {'q': 'toner', 'sort': 'cheapest'})
+        response = self.call(async_views.LowestPricesView, request)
+        self.assertEqual(response.status_code, 400)
+
+    def test_bad_min_rating_is_a_client_error(self):
+        for view in (async_views.PriceCompareView, async_views.LowestPricesView):
+            request = self.factory.get('/api/compare/', {'q': 'toner', 'min_rating': 'abc'})
+            response = self.call(view, request)
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(json.loads(response.content), {'error': 'min_rating must be a number'})
+
+    def test_compare_requires_a_query(self):
+        response = self.call(async_views.PriceCompareView, self.factory.get('/api/compare/'))
+        self.assertEqual(response.status_code, 400)
+
+    def test_bad_limit_is_a_client_error(self):
+        for request in (self.factory.get('/api/jeevee/search/', {'q': 'toner', 'limit': 'abc'}),
+                        self.factory.post('/api/jeevee/search/', json.dumps({'query': 'toner', 'limit': 'abc'}),
+                                          content_type='application/json')):
+            response = self.call(async_views.JeeveeSearchView, request)
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(json.loads(response.content), {'error': 'limit must be an integer'})
@@ -0,0 +1,89 @@
+import time
+
+from django.test import SimpleTestCase
+
+from api import views
+
+from scraper.admission import Overloaded
+from scraper.runtime import get_runtime
+from scraper.tests.fakes import FakeSource, runtime_comparer
+
+PRODUCTS = [{'id': f'b{i}', 'name': f'batch lotion {i}', 'price': str(300 - i), 'rating': 4.5} for i in range(3)]
+
+
+class OverloadedWebScraper:
+    def fetch(self, url):
+        raise Overloaded('webscraper', 2)
+
+
+class SlowWebScraper:
+    def fetch(self, url):
+        time.sleep(1.0)
+        return {'url': url}
+
+
+class BatchViewTests(SimpleTestCase):
+    def batch(self, operations, **body):
+        return self.client.post('/api/batch/', dict(body, operations=operations), content_type='application/json')
+
+    def use_webscraper(self, scraper):
+        runtime = get_runtime()
+        previous, runtime._webscraper = runtime._webscraper, scraper
+        self.addCleanup(setattr, runtime, '_webscraper', previous)
+
+    def test_results_in_order_with_their_own_status(self):
+        self.use_webscraper(OverloadedWebScraper())
+        with runtime_comparer(FakeSource('jeevee', PRODUCTS)):
+            response = self.batch([
+                {'id': 'home', 'op': 'lowest_prices', 'params': {'query': 'batch lotion', 'min_rating': 0}},
+                {'op': 'lowest_prices', 'params': {'query': 'batch lotion', 'sort': 'cheapest'}},
+                {'id': 'site', 'op': 'scrape', 'params': {'url': 'https://example.com'}},
+                {'op': 'launch'},
+            ])
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual([r['id'] for r in results], ['home', 1, 'site', 3])
+        self.assertEqual([r['status'] for r in results], [200, 400, 429, 400])
+        self.assertEqual([p['id'] for p in results[0]['data']['products']], ['b2', 'b1', 'b0'])
+        self.assertEqual(results[2]['retry_after'], 2)
+
+    def test_identical_operations_run_once(self):
+        source = FakeSource('jeevee', PRODUCTS)
+        operation = {'op': 'compare', 'params': {'query': 'batch lotion', 'layout': 'refs'}}
+        with runtime_comparer(source):
+            response = self.batch([dict(operation, id='a'), dict(operation, id='b')])
+        body = response.json()
+        self.assertEqual((body['operations'], body['executed']), (2, 1))
+        self.assertEqual(source.calls, 1)
+        self.assertEqual(body['results'][0]['data'], body['results'][1]['data'])
+
+    def test_slow_operation_times_out(self):
+        # scrape has no deadline of its own, unlike compare and lowest_prices
+        self.use_webscraper(SlowWebScraper())
+        response = self.batch([{'op': 'scrape', 'params': {'url': 'https://example.com'}}], deadline=0.1)
+        self.assertEqual(response.json()['results'][0]['status'], 504)
+        self.assertLess(response.json()['elapsed'], 1.0)
+
+    def test_deadline_is_capped(self):
+        self.use_webscraper(SlowWebScraper())
+        previous, views.BATCH_MAX_DEADLINE = views.BATCH_MAX_DEADLINE, 0.1
+        self.addCleanup(setattr, views, 'BATCH_MAX_DEADLINE', previous)
+        response = self.batch([{'op': 'scrape', 'params': {'url': 'https://example.com'}}], deadline=1e9)
+        self.assertEqual(response.json()['results'][0]['status'], 504)
+
+    def test_queued_operation_gets_what_is_left_of_the_deadline(self):
+        source = FakeSource('jeevee', PRODUCTS)
+        with runtime_comparer(source):
+            with self.assertRaises(TimeoutError):
+                views.run_batch_operation('compare', {'query': 'batch lotion'}, time.monotonic() - 1)
+        self.assertEqual(source.calls, 0)
+
+    def test_request_validation(self):
+        self.assertEqual(self.batch([]).status_code, 400)
+        self.assertEqual(self.batch([{'op': 'compare'}] * 21).status_code, 400)
+        for deadline in ('soon', -1, 0):
+            self.assertEqual(self.batch([{'op': 'compare'}], deadline=deadline).status_code, 400)
+
+    def test_params_must_be_an_object(self):
+        response = self.batch([{'op': 'compare', 'params': 'x'}, {'op': 'scrape', 'params': ['url']}])
+        self.assertEqual([r['status'] for r in response.json()['results']], [400, 400])
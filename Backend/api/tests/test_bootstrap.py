@@ -0,0 +1,49 @@
+import json
+
+from django.test import TestCase, TransactionTestCase
+
+from api import models, views
+from api.models import Product
+
+
+class BootstrapViewTests(TestCase):
+    def setUp(self):
+        # Read the catalog version afresh, not from an earlier test's cache
+        models._version = None
+
+    def test_body_and_caching(self):
+        response = self.client.get('/api/bootstrap/')
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content)
+        self.assertEqual(set(data), {'version', 'navLinks', 'performanceData', 'features', 'featuredProducts'})
+        self.assertTrue(all(product['featured'] for product in data['featuredProducts']))
+        self.assertLessEqual(len(data['featuredProducts']), views.BOOTSTRAP_FEATURED_LIMIT)
+        self.assertIn('max-age=300', response['Cache-Control'])
+
+    def test_not_modified(self):
+        etag = self.client.get('/api/bootstrap/')['ETag']
+        response = self.client.get('/api/bootstrap/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_catalog_change_changes_the_version(self):
+        before = json.loads(self.client.get('/api/bootstrap/').content)['version']
+        Product.objects.create(name='Bootstrap Runner', price='99.00', category='running', brand='Test',
+                               featured=True)
+        models._version = None
+        after = json.loads(self.client.get('/api/bootstrap/').content)
+        self.assertNotEqual(after['version'], before)
+        self.assertIn('Bootstrap Runner', [p['name'] for p in after['featuredProducts']])
+
+
+
+class BootstrapWarmTests(TransactionTestCase):
+    """The warm thread has its own connection, so it needs committed tables"""
+
+    def test_warm_renders_before_the_first_request(self):
+        models._version = None
+        previous, views._bootstrap = views._bootstrap, (None, None, None)
+        self.addCleanup(setattr, views, '_bootstrap', previous)
+        views.warm_bootstrap().join(timeout=10)
+        version, body = views._bootstrap[1:]
+        self.assertIsNotNone(body)
+        self.assertEqual(json.loads(self.client.get('/api/bootstrap/').content)['version'], version)
@@ -0,0 +1,57 @@
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.test import SimpleTestCase
+
+from api.caching import search_version
+from scraper.cache import ResultCache
+from scraper.tests.fakes import FakeSource, runtime_comparer
+
+PRODUCTS = [{'id': f'c{i}', 'name': f'etag serum {i}', 'price': str(500 + i), 'rating': 4.4} for i in range(3)]
+
+
+def section(**meta):
+    return {'products': [], 'cache': dict({'key': 'jeevee|serum|limit=20', 'status': 'fresh',
+                                           'stored_at': 1000.0, 'negative': False}, **meta)}
+
+
+class SearchVersionTests(SimpleTestCase):
+    def test_serving_state_does_not_change_the_version(self):
+        version = search_version(section(), section(key='daraz|serum|limit=20'))
+        self.assertIsNotNone(version)
+        served = search_version(section(status='stale', overloaded=True),
+                                section(key='daraz|serum|limit=20', status='miss'))
+        self.assertEqual(served, version)
+
+    def test_a_new_entry_changes_the_version(self):
+        self.assertNotEqual(search_version(section(stored_at=2000.0)), search_version(section()))
+        self.assertNotEqual(search_version(section(negative=True)), search_version(section()))
+
+    def test_live_sections_cannot_be_validated(self):
+        self.assertIsNone(search_version(section(), {'products': [], 'status': 'timed_out'}))
+        self.assertIsNone(search_version())
+
+
+class ConditionalResponseTests(SimpleTestCase):
+    def test_static_endpoint(self):
+        response = self.client.get('/api/nav-links/')
+        etag = response['ETag']
+        self.assertIn('max-age=3600', response['Cache-Control'])
+        again = self.client.get('/api/nav-links/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again.content, b'')
+        self.assertEqual(again['ETag'], etag)
+
+    def test_cached_search_results(self):
+        directory = Path(tempfile.mkdtemp(prefix='etag-'))
+        self.addCleanup(shutil.rmtree, directory, True)
+        source = FakeSource('jeevee', PRODUCTS)
+        url = '/api/lowest-prices/?q=etag+serum&min_rating=0'
+        with runtime_comparer(source, cache=ResultCache(disk_path=directory / 'results.sqlite3')):
+            first = self.client.get(url)
+            etag = first['ETag']
+            self.assertIn('max-age=60', first['Cache-Control'])
+            again = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(again.status_code, 304)
+        self.assertEqual(source.calls, 1)
@@ -0,0 +1,124 @@
+import shutil
+import tempfile
+import threading
+from decimal import Decimal
+from pathlib import Path
+from unittest import TestCase as UnitTestCase
+
+from django.test import TestCase
+
+from api import cart
+from api.cart import MemoryCartStore, SQLiteCartStore
+
+SHOE = {'id': 1, 'name': 'Runner', 'price': Decimal('120.50'), 'image': 'runner.png'}
+SOCK = {'id': 2, 'name': 'Sock', 'price': '5', 'image': ''}
+
+
+class CartStoreTests:
+    """Behaviour shared by every backend; subclasses set self.store"""
+
+    def test_empty(self):
+        self.assertEqual(self.store.get('nobody'), {'items': [], 'total': Decimal('0'), 'count': 0, 'quantity': 0})
+        self.assertEqual(self.store.remove('nobody', 1)['count'], 0)
+
+    def test_lines_and_totals(self):
+        self.store.add('s', SHOE, 1, size=9, color='#000')
+        self.store.add('s', SHOE, 2, size=9, color='#000')
+        self.store.add('s', SHOE, 1, size=10, color='#000')
+        cart = self.store.add('s', SOCK, 3)
+        self.assertEqual((cart['count'], cart['quantity'], cart['total']), (3, 7, Decimal('497.00')))
+        self.assertEqual([(item['product_id'], item['size'], item['quantity']) for item in cart['items']],
+                         [(1, 9, 3), (1, 10, 1), (2, None, 3)])
+        self.assertEqual(cart['items'][0]['price'], Decimal('120.50'))
+
+        cart = self.store.remove('s', 1, size=9, color='#000')
+        self.assertEqual((cart['count'], cart['quantity'], cart['total']), (2, 4, Decimal('135.50')))
+        # Removing a line that isn't there changes nothing
+        self.assertEqual(self.store.remove('s', 1, size=9, color='#000'), cart)
+        self.assertEqual(self.store.get('s'), cart)
+
+    def test_price_change_reprices_the_line(self):
+        self.store.add('s', SHOE, 2)
+        cart = self.store.add('s', dict(SHOE, price='100'), 1)
+        self.assertEqual(cart['items'][0]['price'], Decimal('100'))
+        self.assertEqual((cart['quantity'], cart['total']), (3, Decimal('300')))
+        self.assertEqual(self.store.get('s'), cart)
+        self.assertEqual(self.store.remove('s', 1)['total'], Decimal('0'))
+
+    def test_sessions_are_separate(self):
+        self.store.add('a', SHOE)
+        self.assertEqual(self.store.get('b')['count'], 0)
+
+    def test_concurrent_adds(self):
+        threads = [threading.Thread(target=lambda: [self.store.add('s', SOCK) for _ in range(25)]) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        cart = self.store.get('s')
+        self.assertEqual((cart['quantity'], cart['total'], cart['items'][0]['quantity']), (100, Decimal('500'), 100))
+
+
+class MemoryCartStoreTests(CartStoreTests, UnitTestCase):
+    def setUp(self):
+        self.store = MemoryCartStore()
+
+    def test_least_recently_used_cart_is_evicted(self):
+        store = MemoryCartStore(max_carts=2)
+        store.add('a', SOCK)
+        store.add('b', SOCK)
+        store.get('a')
+        store.add('c', SOCK)
+        self.assertEqual(store.get('b')['count'], 0)
+        self.assertEqual(store.get('a')['count'], 1)
+
+    def test_returned_carts_are_copies(self):
+        cart = self.store.add('s', SOCK)
+        self.store.add('s', SOCK)
+        self.assertEqual(cart['items'][0]['quantity'], 1)
+
+
+class SQLiteCartStoreTests(CartStoreTests, UnitTestCase):
+    def setUp(self):
+        directory = Path(tempfile.mkdtemp(prefix='carts-'))
+        self.addCleanup(shutil.rmtree, directory, True)
+        self.store = SQLiteCartStore(directory / 'carts.sqlite3')
+        self.addCleanup(self.store._conn.close)
+
+    def test_shared_between_stores(self):
+        self.store.add('s', SHOE)
+        other = SQLiteCartStore(self.store.path)
+        self.addCleanup(other._conn.close)
+        self.assertEqual(other.add('s', SHOE)['quantity'], 2)
+        self.assertEqual(self.store.get('s')['quantity'], 2)
+
+
+class CartViewTests(TestCase):
+    def setUp(self):
+        previous, cart._store = cart._store, MemoryCartStore()
+        self.addCleanup(setattr, cart, '_store', previous)
+
+    def add(self, **body):
+        return self.client.post('/api/cart/', dict({'product_id': 1}, **body), content_type='application/json')
+
+    def test_add_and_remove(self):
+        self.assertEqual(self.client.get('/api/cart/').json()['count'], 0)
+        response = self.add(quantity=2, size=9)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 1)
+        self.assertEqual(self.client.get('/api/cart/').json()['quantity'], 2)
+        response = self.client.delete('/api/cart/', {'product_id': 1, 'size': 9}, content_type='application/json')
+        self.assertEqual(response.json()['count'], 0)
+
+    def test_quantity_strings_are_coerced(self):
+        self.assertEqual(self.add(quantity='3').status_code, 200)
+        self.assertEqual(self.client.get('/api/cart/').json()['quantity'], 3)
+
+    def test_invalid_quantity(self):
+        for quantity in (0, -1, '0', 'two', True, None, [1]):
+            with self.subTest(quantity=quantity):
+                self.assertEqual(self.add(quantity=quantity).status_code, 400)
+
+    def test_unknown_product(self):
+        self.assertEqual(self.add(product_id=999999).status_code, 404)
+        self.assertEqual(self.add(product_id='abc').status_code, 404)
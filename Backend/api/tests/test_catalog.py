@@ -0,0 +1,122 @@
+import json
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from api.models import Product
+
+
+class CatalogTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # The seed migration's three products plus enough to page through
+        Product.objects.bulk_create([
+            Product(name=f'Trail Shoe {i}', price='50.00', category='trail' if i % 2 else 'running',
+                    brand='Salomon' if i % 3 else 'NIKE', featured=i % 5 == 0)
+            for i in range(20)
+        ])
+
+
+class ProductQuerySetTests(CatalogTestCase):
+    def test_filters(self):
+        trail = Product.objects.catalog(category='trail')
+        self.assertEqual(trail.count(), 10)
+        self.assertTrue(all(p.category == 'trail' for p in trail))
+        # Brand matches case-insensitively
+        self.assertEqual(Product.objects.catalog(brand='nike').count(), 3 + 7)
+        self.assertTrue(all(p.featured for p in Product.objects.catalog(featured=True)))
+
+    def test_filters_use_the_indexes(self):
+        plans = {
+            'product_category_idx': Product.objects.catalog(category='trail').filter(id__gt=5),
+            'product_brand_idx': Product.objects.catalog(brand='nike').filter(id__gt=5),
+            'product_featured_idx': Product.objects.catalog(featured=True).filter(id__gt=5),
+        }
+        for index, queryset in plans.items():
+            with self.subTest(index=index):
+                self.assertIn(index, queryset.explain())
+
+
+class ProductListViewTests(CatalogTestCase):
+    def test_cursor_walks_every_product_once(self):
+        seen, cursor = [], None
+        while True:
+            params = {'page_size': 7, 'fields': 'name'}
+            if cursor:
+                params['cursor'] = cursor
+            data = self.client.get('/api/products/', params).json()
+            seen += [product['id'] for product in data['products']]
+            self.assertTrue(all(set(product) == {'id', 'name'} for product in data['products']))
+            cursor = data['next_cursor']
+            self.assertEqual(data['has_next'], cursor is not None)
+            if not cursor:
+                break
+        self.assertEqual(seen, list(Product.objects.values_list('id', flat=True)))
+
+    def test_filtered_pages(self):
+        first = self.client.get('/api/products/', {'category': 'trail', 'page_size': 4}).json()
+        self.assertEqual(first['page'], 1)
+        rest = self.client.get('/api/products/', {'category': 'trail', 'cursor': first['next_cursor'],
+                                                   'page_size': 100}).json()
+        self.assertIsNone(rest['page'])
+        self.assertFalse(rest['has_next'])
+        ids = [p['id'] for p in first['products'] + rest['products']]
+        self.assertEqual(ids, sorted(set(ids)))
+        self.assertEqual(len(ids), 10)
+
+    def test_page_numbers(self):
+        data = self.client.get('/api/products/', {'page': 2, 'page_size': 20}).json()
+        self.assertEqual(len(data['products']), 3)
+        self.assertFalse(data['has_next'])
+        # Lists leave out descriptions
+        self.assertNotIn('description', data['products'][0])
+
+    def test_bad_parameters(self):
+        self.assertEqual(self.client.get('/api/products/', {'page_size': 'many'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/products/', {'cursor': 'not-a-cursor'}).status_code, 400)
+
+
+class ProductDetailViewTests(CatalogTestCase):
+    def test_detail(self):
+        product = self.client.get('/api/products/1/').json()
+        self.assertIn('description', product)
+        self.assertEqual(self.client.get('/api/products/1/', {'fields': 'price'}).json(),
+                         {'id': 1, 'price': product['price']})
+        self.assertEqual(self.client.get('/api/products/999999/').status_code, 404)
+
+
+class LoadCatalogTests(TestCase):
+    def setUp(self):
+        self.dir = Path(tempfile.mkdtemp(prefix='catalog-'))
+        self.addCleanup(shutil.rmtree, self.dir, True)
+
+    def load(self, name, content, *args):
+        path = self.dir / name
+        path.write_text(content, encoding='utf-8')
+        call_command('load_catalog', str(path), *args, stdout=StringIO())
+
+    def test_jsonl_upserts_on_id(self):
+        self.load('catalog.jsonl', '\n'.join(json.dumps(row) for row in (
+            {'id': 1, 'name': 'Renamed', 'price': '10', 'category': 'running', 'brand': 'Nike'},
+            {'name': 'New Shoe', 'price': 20.5, 'sizes': [8, 9], 'featured': 'true'},
+        )))
+        self.assertEqual(Product.objects.get(pk=1).name, 'Renamed')
+        new = Product.objects.get(name='New Shoe')
+        self.assertEqual((new.sizes, new.featured), ([8, 9], True))
+        self.assertEqual(Product.objects.count(), 4)
+
+    def test_csv_with_replace(self):
+        self.load('catalog.csv', 'id,name,price,colors,sizes,category,brand\n'
+                                 '10,Court Shoe,30,#fff|#000,7|8,tennis,Adidas\n', '--replace')
+        self.assertEqual(list(Product.objects.values_list('id', flat=True)), [10])
+        product = Product.objects.get(pk=10)
+        self.assertEqual((product.colors, product.sizes), (['#fff', '#000'], [7, 8]))
+
+    def test_bad_row(self):
+        with self.assertRaises(CommandError):
+            self.load('catalog.json', json.dumps([{'name': 'No Price'}]))
+        self.assertEqual(Product.objects.count(), 3)
@@ -0,0 +1,61 @@
+import json
+
+from django.test import SimpleTestCase
+
+from scraper.tests.fakes import FakeSource, runtime_comparer
+
+
+def products(source, count):
+    return [{'id': f'{source}{i}', 'name': f'{source} cleanser {i}', 'price': str(300 - i), 'rating': 4.2}
+            for i in range(count)]
+
+
+class ComparisonParamTests(SimpleTestCase):
+    """Bad parameters are client errors (400) on every comparison endpoint"""
+
+    endpoints = ('/api/compare/', '/api/lowest-prices/', '/api/compare/stream/')
+
+    def assertRejected(self, params, endpoints=endpoints):
+        with runtime_comparer(FakeSource('jeevee', products('j', 2))):
+            for url in endpoints:
+                with self.subTest(url=url, params=params):
+                    response = self.client.get(url, dict({'q': 'cleanser'}, **params))
+                    self.assertEqual(response.status_code, 400)
+                    self.assertIn(b'error', response.content)
+
+    def test_bad_min_rating(self):
+        self.assertRejected({'min_rating': 'abc'})
+
+    def test_bad_limit(self):
+        self.assertRejected({'limit': 'abc'})
+
+    def test_bad_deadline(self):
+        for deadline in ('abc', '0', '-5', 'nan', 'inf'):
+            self.assertRejected({'deadline': deadline}, self.endpoints[:2])
+
+    def test_bad_min_rating_in_a_post_body(self):
+        for url in self.endpoints[:2]:
+            response = self.client.post(url, {'query': 'cleanser', 'min_rating': 'high'}, content_type='application/json')
+            self.assertEqual(response.status_code, 400)
+
+    def test_zero_min_rating_turns_the_filter_off(self):
+        with runtime_comparer(FakeSource('jeevee', [{'id': 'j1', 'name': 'Unrated cleanser', 'price': '99'}])):
+            data = self.client.get('/api/lowest-prices/', {'q': 'cleanser', 'min_rating': '0'}).json()
+        self.assertEqual([p['id'] for p in data['products']], ['j1'])
+
+
+class CompareStreamParamTests(SimpleTestCase):
+    def test_bad_params_are_json_400s(self):
+        for params in ({'limit': 'abc'}, {'min_rating': 'abc'}, {'deadline': 'abc'}, {'deadline': '-1'}, {}):
+            with self.subTest(params=params):
+                response = self.client.get('/api/compare/stream/', dict({'q': 'cleanser'} if params else {}, **params))
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response['Content-Type'], 'application/json')
+                self.assertIn('error', json.loads(response.content))
+
+    def test_streams_events(self):
+        with runtime_comparer(FakeSource('jeevee', products('j', 2))):
+            response = self.client.get('/api/compare/stream/', {'q': 'cleanser', 'format': 'ndjson', 'deadline': '5'})
+            events = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(events[-1]['event'], 'summary')
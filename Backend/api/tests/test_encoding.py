@@ -0,0 +1,81 @@
+import datetime
+import gzip
+import json
+import unittest
+from decimal import Decimal
+
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from rest_framework.renderers import JSONRenderer
+
+from api.middleware import BROTLI_AVAILABLE, CompressionMiddleware, accepted_encodings
+from api.renderers import FastJSONRenderer
+
+BODY = json.dumps({'products': [{'name': f'cream {i}', 'price': 100 + i} for i in range(100)]})
+
+
+class FastJSONRendererTests(unittest.TestCase):
+    def test_matches_the_drf_renderer(self):
+        data = {'price': Decimal('12.50'), 'seen': datetime.date(2024, 5, 1), 1: 'key', 'name': 'ñ'}
+        body = FastJSONRenderer().render(data)
+        self.assertEqual(json.loads(body), json.loads(JSONRenderer().render(data)))
+        # Compact UTF-8
+        self.assertNotIn(b' ', body)
+        self.assertIn('ñ'.encode('utf-8'), body)
+
+    def test_indent_uses_the_stdlib(self):
+        body = FastJSONRenderer().render({'a': 1}, 'application/json; indent=2')
+        self.assertEqual(body, b'{\n  "a": 1\n}')
+
+    def test_none_is_empty(self):
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+
+class AcceptedEncodingsTests(unittest.TestCase):
+    def test_ordered_by_quality_without_refused(self):
+        self.assertEqual(accepted_encodings('gzip;q=0.5, br, identity;q=0, deflate;q=x'), ['br', 'gzip'])
+
+
+class CompressionMiddlewareTests(SimpleTestCase):
+    factory = RequestFactory()
+
+    def respond(self, accept, body=BODY, content_type='application/json', **headers):
+        response = HttpResponse(body, content_type=content_type)
+        for name, value in headers.items():
+            response[name] = value
+        request = self.factory.get('/', HTTP_ACCEPT_ENCODING=accept)
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def test_gzip(self):
+        response = self.respond('gzip', ETag='"abc"')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content).decode(), BODY)
+        self.assertEqual(response['Content-Length'], str(len(response.content)))
+        self.assertEqual(response['ETag'], 'W/"abc"')
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    @unittest.skipUnless(BROTLI_AVAILABLE, 'brotli is not installed')
+    def test_brotli_when_preferred(self):
+        import brotli
+        response = self.respond('gzip;q=0.8, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(response.content).decode(), BODY)
+
+    @unittest.skipIf(BROTLI_AVAILABLE, 'brotli is installed')
+    def test_gzip_when_brotli_is_missing(self):
+        self.assertEqual(self.respond('br, gzip;q=0.5')['Content-Encoding'], 'gzip')
+
+    @override_settings(COMPRESS_MIN_SIZE=1024)
+    def test_small_bodies_are_not_compressed(self):
+        response = self.respond('gzip', body='{"ok": true}')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_other_content_is_left_alone(self):
+        self.assertFalse(self.respond('gzip', content_type='image/png').has_header('Content-Encoding'))
+        self.assertFalse(self.respond('identity').has_header('Content-Encoding'))
+
+    def test_streaming_is_left_alone(self):
+        response = StreamingHttpResponse(iter([BODY.encode()]), content_type='text/event-stream')
+        request = self.factory.get('/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(CompressionMiddleware(lambda request: response)(request).has_header('Content-Encoding'))
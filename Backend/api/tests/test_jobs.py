@@ -0,0 +1,27 @@
+from django.test import SimpleTestCase
+
+from scraper.jobs import get_job_queue
+
+
+class JobListViewTests(SimpleTestCase):
+    def post(self, kind, params):
+        return self.client.post('/api/jobs/', {'kind': kind, 'params': params}, content_type='application/json')
+
+    def test_comparison_params_are_normalized(self):
+        response = self.post('lowest_prices', {'query': 'soap', 'limit': '10', 'min_rating': 0})
+        self.assertEqual(response.status_code, 202)
+        job = get_job_queue().get(response.json()['id'])
+        self.assertEqual(job['params'], {'query': 'soap', 'limit': 10, 'min_rating': 0.0, 'sort': 'price_asc'})
+        self.assertEqual(response['Location'], f"/api/jobs/{job['id']}/")
+
+    def test_invalid_comparison_params(self):
+        for kind, params in (('compare', {'limit': 'ten'}), ('compare', {'min_rating': 'good'}),
+                             ('lowest_prices', {'sort': 'cheapest'})):
+            with self.subTest(kind=kind, params=params):
+                response = self.post(kind, dict(params, query='soap'))
+                self.assertEqual(response.status_code, 400)
+
+    def test_query_required(self):
+        self.assertEqual(self.post('compare', {}).status_code, 400)
+        self.assertEqual(self.post('daraz_details', {}).status_code, 400)
+        self.assertEqual(self.post('unknown', {'query': 'soap'}).status_code, 400)
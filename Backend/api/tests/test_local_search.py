@@ -0,0 +1,43 @@
+import tempfile
+from pathlib import Path
+
+from django.test import SimpleTestCase
+
+from scraper import product_index
+from scraper.product_index import ProductIndex
+
+
+class LocalSearchViewTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.index = ProductIndex(Path(tmp.name) / 'products.sqlite3', flush_every=1000, flush_interval=3600)
+        previous, product_index._default_index = product_index._default_index, self.index
+        self.addCleanup(setattr, product_index, '_default_index', previous)
+        self.index.add([
+            {'id': f'j{i}', 'name': f'Vitamin C Serum {i}', 'price': 500 + i * 100, 'source': 'Jeevee'}
+            for i in range(5)
+        ])
+
+    def test_pages_follow_the_cursor(self):
+        params = {'q': 'vitamin', 'page_size': '3', 'fields': 'id,price'}
+        first = self.client.get('/api/local-search/', params).json()
+        self.assertEqual(first['count'], 3)
+        self.assertEqual(set(first['products'][0]), {'id', 'price'})
+        second = self.client.get('/api/local-search/', dict(params, cursor=first['next_cursor'])).json()
+        self.assertEqual(second['count'], 2)
+        self.assertIsNone(second['next_cursor'])
+
+    def test_bounds(self):
+        data = self.client.get('/api/local-search/', {'q': 'serum', 'max_price': '650'}).json()
+        self.assertEqual(sorted(p['id'] for p in data['products']), ['j0', 'j1'])
+
+    def test_bad_parameters(self):
+        self.assertEqual(self.client.get('/api/local-search/').status_code, 400)
+        self.assertEqual(self.client.get('/api/local-search/', {'q': 'serum', 'min_price': 'low'}).status_code, 400)
+
+    def test_stats(self):
+        stats = self.client.get('/api/local-search/stats/').json()
+        self.assertEqual((stats['products'], stats['pending']), (0, 5))
+        self.index.flush()
+        self.assertEqual(self.client.get('/api/local-search/stats/').json()['products'], 5)
@@ -0,0 +1,105 @@
+import base64
+import json
+import unittest
+
+from django.test import SimpleTestCase
+
+from api import views
+from api.pagination import (
+    RESULT_PAGE_SIZE, decode_cursor, encode_cursor, parse_fields, request_page, result_slice, search_page,
+    slice_results,
+)
+from scraper.tests.fakes import runtime_jeevee
+
+
+def raw_cursor(state):
+    return base64.urlsafe_b64encode(json.dumps(state).encode()).rstrip(b'=').decode()
+
+
+class CursorTests(unittest.TestCase):
+    def test_round_trip(self):
+        for state in ({'after': 0}, {'page': 3}, {'offset': 12345678}):
+            with self.subTest(state=state):
+                cursor = encode_cursor(**state)
+                self.assertNotIn('=', cursor)
+                key, value = next(iter(state.items()))
+                self.assertEqual(decode_cursor(cursor, key), value)
+
+    def test_rejected_cursors(self):
+        for cursor in ('', '!!!', raw_cursor({'page': 2}), raw_cursor({'offset': -1}), raw_cursor({'offset': 1.5}),
+                       raw_cursor({'offset': True}), raw_cursor({'offset': '4'}), raw_cursor([1]),
+                       base64.urlsafe_b64encode(b'\xff\xfe').decode()):
+            with self.subTest(cursor=cursor), self.assertRaises(ValueError):
+                decode_cursor(cursor, 'offset')
+
+
+class ParamTests(unittest.TestCase):
+    def test_parse_fields(self):
+        self.assertEqual(parse_fields('name, price,,name'), ('name', 'price'))
+        self.assertEqual(parse_fields(['price', 'name']), ('price', 'name'))
+        self.assertIsNone(parse_fields(''))
+        self.assertIsNone(parse_fields(' , '))
+
+    def test_request_page(self):
+        self.assertEqual(request_page({}), 1)
+        self.assertEqual(request_page({'page': '0'}), 1)
+        self.assertEqual(request_page({'page': '4', 'cursor': encode_cursor(page=7)}), 7)
+        with self.assertRaises(ValueError):
+            request_page({'page': 'next'})
+        with self.assertRaises(ValueError):
+            request_page({'cursor': encode_cursor(offset=7)})
+
+    def test_result_slice(self):
+        self.assertIsNone(result_slice({}))
+        self.assertEqual(result_slice({'page_size': '5'}), (0, 5))
+        self.assertEqual(result_slice({'cursor': encode_cursor(offset=10)}), (10, RESULT_PAGE_SIZE))
+        for params in ({'page_size': '0'}, {'page_size': 'all'}, {'cursor': encode_cursor(page=2)}):
+            with self.subTest(params=params), self.assertRaises(ValueError):
+                result_slice(params)
+
+
+class SliceTests(unittest.TestCase):
+    data = {'query': 'q', 'products': [{'id': i, 'name': f'p{i}', 'price': i} for i in range(5)]}
+
+    def test_pages_cover_every_product_once(self):
+        seen, page = [], (0, 2)
+        while True:
+            result = slice_results(self.data, page)
+            seen += [p['id'] for p in result['products']]
+            if not result['next_cursor']:
+                break
+            page = result_slice({'cursor': result['next_cursor'], 'page_size': 2})
+        self.assertEqual(seen, list(range(5)))
+
+    def test_whole_set_with_fields(self):
+        self.assertIs(slice_results(self.data, None), self.data)
+        result = slice_results(self.data, None, ('price',))
+        self.assertEqual(result['products'][0], {'price': 0})
+        # The input is not modified
+        self.assertIn('name', self.data['products'][0])
+
+    def test_search_page(self):
+        result = search_page(self.data, 3, ('id',))
+        self.assertEqual(decode_cursor(result['next_cursor'], 'page'), 3)
+        self.assertEqual(result['products'][0], {'id': 0})
+        self.assertIsNone(search_page(self.data, None)['next_cursor'])
+
+
+class SearchCursorViewTests(SimpleTestCase):
+    def test_jeevee_search_follows_cursors(self):
+        pages, cursor = [], None
+        with runtime_jeevee(views.prefetcher):
+            while True:
+                params = {'q': 'cursor toner', 'fields': 'id'}
+                if cursor:
+                    params['cursor'] = cursor
+                data = self.client.get('/api/jeevee/search/', params).json()
+                pages.append([p['id'] for p in data['products']])
+                cursor = data['next_cursor']
+                if not cursor:
+                    break
+        self.assertEqual(pages, [['1-0', '1-1'], ['2-0', '2-1'], ['3-0', '3-1']])
+
+    def test_bad_cursor(self):
+        response = self.client.get('/api/jeevee/search/', {'q': 'toner', 'cursor': 'garbage'})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,32 @@
+from django.http import QueryDict
+from django.test import SimpleTestCase
+
+from api.params import compare_params, daraz_search_params, jeevee_search_params, lowest_prices_params
+
+
+class ParamsTests(SimpleTestCase):
+    def test_defaults(self):
+        args = lowest_prices_params({'query': 'toner'})
+        self.assertEqual((args.limit, args.min_rating, args.deadline, args.sort), (20, 4.0, None, 'price_asc'))
+        self.assertIsNone(args.page)
+        self.assertIsNone(args.facet_query)
+        args = daraz_search_params(QueryDict('q=shoes'), 'q')
+        self.assertEqual((args.query, args.region, args.sort, args.page), ('shoes', 'pk', 'popularity', 1))
+
+    def test_query_parameters_and_json_bodies_parse_alike(self):
+        query = compare_params(QueryDict('q=toner&limit=5&min_rating=0&deadline=2.5&layout=refs&fields=name'), 'q')
+        body = compare_params({'query': 'toner', 'limit': 5, 'min_rating': 0, 'deadline': 2.5,
+                               'layout': 'refs', 'fields': ['name']})
+        self.assertEqual(vars(query), vars(body))
+
+    def test_errors(self):
+        for parse, params, key, message in (
+            (jeevee_search_params, {}, 'query', 'Query is required'),
+            (jeevee_search_params, QueryDict(''), 'q', 'Query parameter "q" is required'),
+            (jeevee_search_params, {'query': 'toner', 'limit': 'abc'}, 'query', 'limit must be an integer'),
+            (jeevee_search_params, {'query': 'toner', 'page': 'two'}, 'query', 'page must be an integer'),
+            (compare_params, {'query': 'toner', 'layout': 'flat'}, 'query', 'layout must be one of'),
+            (lowest_prices_params, {'query': 'toner', 'sort': 'cheapest'}, 'query', 'sort must be one of'),
+        ):
+            with self.subTest(params=params), self.assertRaisesMessage(ValueError, message):
+                parse(params, key)
@@ -0,0 +1,17 @@
+from django.test import SimpleTestCase
+
+from api import views
+from scraper.tests.fakes import runtime_jeevee
+
+
+class SearchPagePrefetchTests(SimpleTestCase):
+    def setUp(self):
+        views.prefetcher._stats.pop('jeevee', None)
+
+    def test_first_page_lookups_are_not_misses(self):
+        with runtime_jeevee(views.prefetcher) as jeevee:
+            views.search_jeevee_page('prefetch first page', 1, 7)
+            self.assertNotIn('misses', views.prefetcher.stats()['sources'].get('jeevee', {}))
+            views.search_jeevee_page('prefetch first page', 2, 7)
+        self.assertEqual(views.prefetcher.stats()['sources']['jeevee']['misses'], 1)
+        self.assertEqual(jeevee.calls, [1, 2])
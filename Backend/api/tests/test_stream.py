@@ -0,0 +1,52 @@
+import json
+
+from django.test import SimpleTestCase
+
+from api.renderers import EventStreamRenderer, NDJSONRenderer
+from scraper.tests.fakes import FakeSource, runtime_comparer
+
+
+def products(source, count):
+    return [{'id': f'{source}{i}', 'name': f'{source} shampoo {i}', 'price': str(100 + i), 'rating': 4.5}
+            for i in range(count)]
+
+
+class RendererTests(SimpleTestCase):
+    def test_event_stream_encoding(self):
+        body = EventStreamRenderer.encode_event({'event': 'source', 'source': 'jeevee', 'products': []})
+        self.assertEqual(body, b'event: source\ndata: {"source": "jeevee", "products": []}\n\n')
+
+    def test_plain_error_becomes_an_error_event(self):
+        body = EventStreamRenderer().render({'error': 'bad'})
+        self.assertTrue(body.startswith(b'event: error\n'))
+
+    def test_ndjson_encoding(self):
+        self.assertEqual(NDJSONRenderer.encode_event({'event': 'summary'}), b'{"event": "summary"}\n')
+
+
+class PriceCompareStreamViewTests(SimpleTestCase):
+    def stream(self, **headers):
+        sources = (FakeSource('jeevee', products('j', 2)), FakeSource('daraz', products('d', 1)))
+        with runtime_comparer(*sources):
+            response = self.client.get('/api/compare/stream/?q=stream+shampoo&min_rating=0', **headers)
+            body = b''.join(response.streaming_content).decode('utf-8')
+        return response, body
+
+    def test_server_sent_events(self):
+        response, body = self.stream()
+        self.assertEqual(response['Content-Type'], 'text/event-stream; charset=utf-8')
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+        names = [line.split(': ', 1)[1] for line in body.splitlines() if line.startswith('event: ')]
+        self.assertEqual(names[:2], ['source', 'source'])
+        self.assertEqual(names[-1], 'summary')
+
+    def test_ndjson(self):
+        response, body = self.stream(HTTP_ACCEPT='application/x-ndjson')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        events = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual(events[-1]['event'], 'summary')
+        self.assertEqual(events[-1]['total'], 3)
+
+    def test_query_required(self):
+        response = self.client.get('/api/compare/stream/')
+        self.assertEqual(response.status_code, 400)
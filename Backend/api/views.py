@@ -1,53 +1,95 @@
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.decorators import api_view
-from scraper.webscraper import WebScraper
-from scraper.daraz import DarazScraper, search_daraz
-from scraper.jeevee import JeeveeScraper, search_jeevee
-from scraper.price_compare import PriceComparer, compare_prices, get_lowest_prices
-
-# In-memory product storage (replace with database models in production)
-PRODUCTS = [
-    {
-        'id': 1,
-        'name': 'Nike Air Max 270',
-        'price': 150.00,
-        'description': 'The Nike Air Max 270 delivers visible cushioning under every step.',
-        'image': '/images/shoe1.png',
-        'colors': ['#2e2c2e', '#ffffff', '#ff0000', '#0000ff'],
-        'sizes': [7, 8, 9, 10, 11, 12],
-        'category': 'running',
-        'brand': 'Nike',
-        'featured': True,
-    },
-    {
-        'id': 2,
-        'name': 'Nike React Infinity',
-        'price': 160.00,
-        'description': 'Designed to help reduce injury and keep you on the run.',
-        'image': '/images/shoe2.png',
-        'colors': ['#2e2c2e', '#808080', '#00ff00'],
-        'sizes': [7, 8, 9, 10, 11],
-        'category': 'running',
-        'brand': 'Nike',
-        'featured': True,
-    },
-    {
-        'id': 3,
-        'name': 'Nike ZoomX Vaporfly',
-        'price': 250.00,
-        'description': 'Built for record-breaking speed.',
-        'image': '/images/shoe3.png',
-        'colors': ['#ff6b6b', '#4ecdc4', '#2e2c2e'],
-        'sizes': [8, 9, 10, 11, 12],
-        'category': 'performance',
-        'brand': 'Nike',
-        'featured': False,
-    },
-]
+from rest_framework.exceptions import Throttled
+from django.conf import settings
+from django.db import DatabaseError, connection
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.cache import patch_cache_control
+from scraper.daraz import search_daraz
+from scraper.jeevee import search_jeevee
+from scraper.price_compare import compare_prices, get_lowest_prices, parse_deadline
+from scraper.admission import Overloaded, bulkhead_stats
+from scraper.cache import get_result_cache, make_key
+from scraper.politeness import get_scheduler
+from scraper.product_index import get_product_index
+from scraper.runtime import get_runtime
+from scraper.suggest import MAX_SUGGESTIONS, get_suggest_index
+from scraper.jobs import JOB_HANDLERS, comparison_params, get_job_queue
+from scraper.payload import pack_compare, project
+from scraper.prefetch import Prefetcher
+from scraper.warmer import get_query_tracker
+from .caching import conditional_response, make_etag, search_version
+from .cart import get_cart_store
+from .models import PRODUCT_DETAIL_FIELDS, PRODUCT_LIST_FIELDS, Product, catalog_version
+from .pagination import decode_cursor, encode_cursor, parse_fields, search_page, slice_results
+from .params import (compare_params, daraz_search_params, jeevee_search_params, lowest_prices_params,
+                     stream_params)
+from .renderers import EventStreamRenderer, FastJSONRenderer, NDJSONRenderer
+
+logger = logging.getLogger(__name__)
+
+
+def cart_session(request):
+    """Session key that identifies the caller's cart, starting a session if needed"""
+    if not request.session.session_key:
+        request.session.save()
+    return request.session.session_key
+
+
+# Speculative prefetch of the next search results page (see scraper/prefetch.py)
+prefetcher = Prefetcher(
+    enabled=getattr(settings, 'PREFETCH_NEXT_PAGE', {}),
+    ttl=getattr(settings, 'PREFETCH_TTL', 60),
+)
+
+
+def search_daraz_page(query, region, page, sort='popularity'):
+    """Search one Daraz page, serving a prefetched copy if we have one, then prefetch the next page."""
+    key = make_key(f'daraz-{region}', query, page=page, sort=sort)
+    # Page 1 is never prefetched, so only later pages count as hits or misses
+    data = prefetcher.get('daraz', key) if page > 1 else None
+    if data is None:
+        with prefetcher.live('daraz'):
+            with get_runtime().daraz(region) as scraper:
+                data = scraper.search(query, page=page, sort=sort)
+    
+    if data.get('products'):
+        if page == 1:
+            get_product_index().record_query(query)
+        prefetcher.schedule(
+            'daraz',
+            make_key(f'daraz-{region}', query, page=page + 1, sort=sort),
+            lambda: search_daraz(query, region=region, page=page + 1, sort=sort),
+        )
+    return data
+
+
+def search_jeevee_page(query, page, limit):
+    """Search one Jeevee page, serving a prefetched copy if we have one, then prefetch the next page."""
+    key = make_key('jeevee', query, page=page, limit=limit)
+    data = prefetcher.get('jeevee', key) if page > 1 else None
+    if data is None:
+        with prefetcher.live('jeevee'):
+            data = get_runtime().jeevee().search(query, page=page, limit=limit)
+    
+    if data.get('products') and page == 1:
+        get_product_index().record_query(query)
+    if data.get('has_next'):
+        prefetcher.schedule(
+            'jeevee',
+            make_key('jeevee', query, page=page + 1, limit=limit),
+            lambda: search_jeevee(query, page=page + 1, limit=limit),
+        )
+    return data
 
-CART = []
 
 # Navigation links matching frontend
 NAV_LINKS = [
@@ -104,6 +146,70 @@ FEATURES = [
     },
 ]
 
+# Data versions for ETags, computed once since the data above only changes on deploy
+NAV_VERSION = make_etag(NAV_LINKS)
+PERFORMANCE_VERSION = make_etag(PERFORMANCE_DATA)
+FEATURES_VERSION = make_etag(FEATURES)
+
+
+PRODUCT_PAGE_SIZE = 50
+PRODUCT_MAX_PAGE_SIZE = 200
+BOOTSTRAP_FEATURED_LIMIT = 24
+
+
+def catalog_fields(value, allowed):
+    """Catalog columns to select for a fields= value: the requested ones of allowed, always with id"""
+    fields = parse_fields(value)
+    if not fields:
+        return allowed
+    return tuple(field for field in allowed if field == 'id' or field in fields)
+
+_bootstrap = (None, None, None)  # (catalog version, bootstrap version, rendered body)
+_bootstrap_lock = threading.Lock()
+
+
+def get_bootstrap():
+    """
+    Everything the frontend needs for first paint, as (version, rendered JSON
+    body). Rendered at server start (warm_bootstrap) and kept until the
+    catalog changes.
+    """
+    global _bootstrap
+    catalog = catalog_version()
+    with _bootstrap_lock:
+        if _bootstrap[0] != catalog:
+            featured = Product.objects.catalog(featured=True).values(*PRODUCT_LIST_FIELDS)
+            data = {
+                'navLinks': NAV_LINKS,
+                'performanceData': PERFORMANCE_DATA,
+                'features': FEATURES,
+                'featuredProducts': list(featured[:BOOTSTRAP_FEATURED_LIMIT]),
+            }
+            version = make_etag(data).strip('"')
+            _bootstrap = (catalog, version, FastJSONRenderer().render({'version': version, **data}))
+        return _bootstrap[1], _bootstrap[2]
+
+
+def warm_bootstrap() -> threading.Thread:
+    """
+    Render the bootstrap body on a background thread, so the first request
+    doesn't pay for it. Started by the server entry points (config/wsgi.py,
+    config/asgi.py); returns the thread.
+    """
+    thread = threading.Thread(target=_warm_bootstrap, name='bootstrap-warm', daemon=True)
+    thread.start()
+    return thread
+
+
+def _warm_bootstrap():
+    try:
+        get_bootstrap()
+    except DatabaseError as e:
+        # e.g. before the first migrate; the first request renders it instead
+        logger.warning(f"Could not prerender the bootstrap response: {e}")
+    finally:
+        connection.close()
+
 
 class ScrapeView(APIView):
     """
@@ -113,10 +219,12 @@ class ScrapeView(APIView):
         url = request.data.get('url')
         if not url:
             return Response({'error': 'URL is required'}, status=status.HTTP_400_BAD_REQUEST)
-        scraper = WebScraper()
+        scraper = get_runtime().webscraper()
         try:
             data = scraper.fetch(url)
             return Response(data)
+        except Overloaded as e:
+            raise Throttled(wait=e.retry_after)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -125,38 +233,31 @@ class DarazSearchView(APIView):
     """
     Search products on Daraz.
     POST with {"query": "shoes", "region": "pk", "page": 1, "sort": "popularity"}
+    GET with ?q=shoes&region=pk&page=1&sort=popularity
     Regions: pk (Pakistan), np (Nepal), bd (Bangladesh), lk (Sri Lanka)
     Sort: popularity, price_low, price_high, newest
+    
+    Optional cursor (the previous response's next_cursor) instead of page,
+    and fields=name,price,... to send only those product fields.
     """
     def post(self, request):
-        query = request.data.get('query', '')
-        region = request.data.get('region', 'pk')
-        page = request.data.get('page', 1)
-        sort = request.data.get('sort', 'popularity')
-        
-        if not query:
-            return Response({'error': 'Query is required'}, status=status.HTTP_400_BAD_REQUEST)
-        
-        try:
-            scraper = DarazScraper(region=region)
-            data = scraper.search(query, page=page, sort=sort)
-            return Response(data)
-        except Exception as e:
-            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        return self._search(request.data, 'query')
     
     def get(self, request):
         """GET method for easy browser testing."""
-        query = request.query_params.get('q', '')
-        region = request.query_params.get('region', 'pk')
-        page = int(request.query_params.get('page', 1))
-        
-        if not query:
-            return Response({'error': 'Query parameter "q" is required'}, status=status.HTTP_400_BAD_REQUEST)
+        return self._search(request.query_params, 'q')
+    
+    def _search(self, params, key):
+        try:
+            args = daraz_search_params(params, key)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         
         try:
-            scraper = DarazScraper(region=region)
-            data = scraper.search(query, page=page)
-            return Response(data)
+            data = search_daraz_page(args.query, args.region, args.page, args.sort)
+            return Response(search_page(data, args.page + 1 if data.get('products') else None, args.fields))
+        except Overloaded as e:
+            raise Throttled(wait=e.retry_after)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -175,9 +276,11 @@ class DarazCategoryView(APIView):
             return Response({'error': 'Category slug is required'}, status=status.HTTP_400_BAD_REQUEST)
         
         try:
-            scraper = DarazScraper(region=region)
-            data = scraper.get_category(slug, page=page)
+            with get_runtime().daraz(region) as scraper:
+                data = scraper.get_category(slug, page=page)
             return Response(data)
+        except Overloaded as e:
+            raise Throttled(wait=e.retry_after)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -188,9 +291,11 @@ class DarazDealsView(APIView):
         region = request.query_params.get('region', 'pk')
         
         try:
-            scraper = DarazScraper(region=region)
-            data = scraper.get_deals()
+            with get_runtime().daraz(region) as scraper:
+                data = scraper.get_deals()
             return Response(data)
+        except Overloaded as e:
+            raise Throttled(wait=e.retry_after)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -208,9 +313,11 @@ class DarazProductDetailView(APIView):
             return Response({'error': 'Product URL is required'}, status=status.HTTP_400_BAD_REQUEST)
         
         try:
-            scraper = DarazScraper(region=region)
-            data = scraper.get_product_details(url)
+            with get_runtime().daraz(region) as scraper:
+                data = scraper.get_product_details(url)
             return Response(data)
+        except Overloaded as e:
+            raise Throttled(wait=e.retry_after)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -227,47 +334,83 @@ class SearchShoesView(APIView):
         if not query:
             return Response({'error': 'Query is required'}, status=status.HTTP_400_BAD_REQUEST)
         
-        scraper = WebScraper()
+        scraper = get_runtime().webscraper()
         try:
             data = scraper.search_shoes(query, site)
             return Response(data)
+        except Overloaded as e:
+            raise Throttled(wait=e.retry_after)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
 class ProductListView(APIView):
-    """Get all products or filter by category/brand."""
+    """
+    Get products, optionally filtered by category/brand/featured.
+    GET with ?category=running&brand=nike&featured=true&page=1&page_size=50
+    
+    Pages are in id order (page_size up to 200); the list omits descriptions,
+    fetch /api/products/<id>/ for the full product. Pass the response's
+    next_cursor as ?cursor= to get the next page by id (no OFFSET scan);
+    fields=name,price,... selects only those columns (id is always sent).
+    """
     def get(self, request):
         category = request.query_params.get('category')
         brand = request.query_params.get('brand')
         featured = request.query_params.get('featured')
-        
-        products = PRODUCTS.copy()
-        
-        if category:
-            products = [p for p in products if p['category'] == category]
-        if brand:
-            products = [p for p in products if p['brand'].lower() == brand.lower()]
-        if featured:
-            products = [p for p in products if p['featured']]
-        
-        return Response({'products': products})
+        cursor = request.query_params.get('cursor')
+        fields = catalog_fields(request.query_params.get('fields'), PRODUCT_LIST_FIELDS)
+        try:
+            page = max(1, int(request.query_params.get('page', 1)))
+            page_size = int(request.query_params.get('page_size', PRODUCT_PAGE_SIZE))
+            page_size = min(PRODUCT_MAX_PAGE_SIZE, max(1, page_size))
+        except ValueError:
+            return Response({'error': 'page and page_size must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            after = decode_cursor(cursor, 'after') if cursor else None
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        def build():
+            rows = Product.objects.catalog(category, brand, bool(featured))
+            if after is None:
+                offset = (page - 1) * page_size
+            else:
+                # Keyset: the filter indexes end with id, so this seeks straight to the page
+                rows, offset = rows.filter(id__gt=after), 0
+            # One extra row tells us whether there is a next page without a COUNT(*)
+            products = list(rows.values(*fields)[offset:offset + page_size + 1])
+            has_next = len(products) > page_size
+            products = products[:page_size]
+            return Response({
+                'products': products,
+                'page': page if after is None else None,
+                'page_size': page_size,
+                'has_next': has_next,
+                'next_cursor': encode_cursor(after=products[-1]['id']) if has_next else None,
+            })
+        
+        return conditional_response(request, 'catalog', catalog_version(), build)
 
 
 class ProductDetailView(APIView):
-    """Get a single product by ID."""
+    """Get a single product by ID, optionally only ?fields=name,price,..."""
     def get(self, request, product_id):
-        product = next((p for p in PRODUCTS if p['id'] == product_id), None)
+        fields = catalog_fields(request.query_params.get('fields'), PRODUCT_DETAIL_FIELDS)
+        product = Product.objects.filter(pk=product_id).values(*fields).first()
         if not product:
             return Response({'error': 'Product not found'}, status=status.HTTP_404_NOT_FOUND)
-        return Response(product)
+        return conditional_response(request, 'catalog', catalog_version(), lambda: Response(product))
 
 
 class CartView(APIView):
-    """Manage shopping cart."""
+    """
+    Manage the caller's shopping cart (one per session, see api/cart.py).
+    POST/DELETE with {"product_id": 1, "quantity": 1, "size": 9, "color": "#2e2c2e"}
+    """
     def get(self, request):
-        total = sum(item['price'] * item['quantity'] for item in CART)
-        return Response({'items': CART, 'total': total, 'count': len(CART)})
+        # No session yet means an empty cart; don't start one just to say so
+        return Response(get_cart_store().get(request.session.session_key))
     
     def post(self, request):
         product_id = request.data.get('product_id')
@@ -275,56 +418,77 @@ class CartView(APIView):
         size = request.data.get('size')
         color = request.data.get('color')
         
-        product = next((p for p in PRODUCTS if p['id'] == product_id), None)
+        try:
+            product_id = int(product_id)
+            product = Product.objects.filter(pk=product_id).values('id', 'name', 'price', 'image').first()
+        except (TypeError, ValueError):
+            product = None
         if not product:
             return Response({'error': 'Product not found'}, status=status.HTTP_404_NOT_FOUND)
-        
-        cart_item = {
-            'product_id': product_id,
-            'name': product['name'],
-            'price': product['price'],
-            'quantity': quantity,
-            'size': size,
-            'color': color,
-            'image': product['image'],
-        }
-        
-        # Check if item already in cart
-        existing = next((i for i in CART if i['product_id'] == product_id and i['size'] == size and i['color'] == color), None)
-        if existing:
-            existing['quantity'] += quantity
-        else:
-            CART.append(cart_item)
-        
-        return Response({'message': 'Added to cart', 'cart': CART})
+        try:
+            # Form posts and query-style clients send "2"; true/false are not quantities
+            quantity = int(quantity) if not isinstance(quantity, bool) else 0
+        except (TypeError, ValueError):
+            quantity = 0
+        if quantity < 1:
+            return Response({'error': 'quantity must be a positive integer'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        cart = get_cart_store().add(cart_session(request), product, quantity, size, color)
+        return Response({
+            'message': 'Added to cart', 'cart': cart['items'], 'total': cart['total'], 'count': cart['count'],
+        })
     
     def delete(self, request):
         product_id = request.data.get('product_id')
         size = request.data.get('size')
         color = request.data.get('color')
         
-        global CART
-        CART = [i for i in CART if not (i['product_id'] == product_id and i['size'] == size and i['color'] == color)]
+        try:
+            product_id = int(product_id)
+        except (TypeError, ValueError):
+            return Response({'error': 'product_id is required'}, status=status.HTTP_400_BAD_REQUEST)
         
-        return Response({'message': 'Removed from cart', 'cart': CART})
+        cart = get_cart_store().remove(cart_session(request), product_id, size, color)
+        return Response({
+            'message': 'Removed from cart', 'cart': cart['items'], 'total': cart['total'], 'count': cart['count'],
+        })
 
 
 class NavLinksView(APIView):
     """Get navigation links."""
     def get(self, request):
-        return Response({'navLinks': NAV_LINKS})
+        return conditional_response(request, 'static', NAV_VERSION,
+                                    lambda: Response({'navLinks': NAV_LINKS}))
 
 
 class PerformanceView(APIView):
     """Get performance section data."""
     def get(self, request):
-        return Response({'performanceData': PERFORMANCE_DATA})
+        return conditional_response(request, 'static', PERFORMANCE_VERSION,
+                                    lambda: Response({'performanceData': PERFORMANCE_DATA}))
 
 
 class FeaturesView(APIView):
     """Get features data."""
     def get(self, request):
-        return Response({'features': FEATURES})
+        return conditional_response(request, 'static', FEATURES_VERSION,
+                                    lambda: Response({'features': FEATURES}))
+
+
+class BootstrapView(APIView):
+    """
+    Initial page data in one request: nav links, performance data, features
+    and featured products, plus a version that changes with any of them.
+    The JSON body is rendered once (again only when the catalog changes);
+    send If-None-Match to get 304.
+    """
+    def get(self, request):
+        version, body = get_bootstrap()
+        # Featured products are catalog data, so revalidate on the catalog's schedule
+        return conditional_response(
+            request, 'catalog', version,
+            lambda: HttpResponse(body, content_type='application/json'),
+        )
 
 
 class ContactView(APIView):
@@ -348,35 +512,28 @@ class JeeveeSearchView(APIView):
     Search products on Jeevee (Nepal's health & lifestyle platform).
     POST with {"query": "face wash", "page": 1, "limit": 20}
     GET with ?q=face+wash&page=1&limit=20
+    
+    Optional cursor (the previous response's next_cursor) instead of page,
+    and fields=name,price,... to send only those product fields.
     """
     def post(self, request):
-        query = request.data.get('query', '')
-        page = request.data.get('page', 1)
-        limit = request.data.get('limit', 20)
-        
-        if not query:
-            return Response({'error': 'Query is required'}, status=status.HTTP_400_BAD_REQUEST)
-        
-        try:
-            scraper = JeeveeScraper()
-            data = scraper.search(query, page=page, limit=limit)
-            return Response(data)
-        except Exception as e:
-            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        return self._search(request.data, 'query')
     
     def get(self, request):
         """GET method for easy browser testing."""
-        query = request.query_params.get('q', '')
-        page = int(request.query_params.get('page', 1))
-        limit = int(request.query_params.get('limit', 20))
-        
-        if not query:
-            return Response({'error': 'Query parameter "q" is required'}, status=status.HTTP_400_BAD_REQUEST)
+        return self._search(request.query_params, 'q')
+    
+    def _search(self, params, key):
+        try:
+            args = jeevee_search_params(params, key)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         
         try:
-            scraper = JeeveeScraper()
-            data = scraper.search(query, page=page, limit=limit)
-            return Response(data)
+            data = search_jeevee_page(args.query, args.page, args.limit)
+            return Response(search_page(data, args.page + 1 if data.get('has_next') else None, args.fields))
+        except Overloaded as e:
+            raise Throttled(wait=e.retry_after)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -392,9 +549,11 @@ class JeeveeProductsView(APIView):
         limit = int(request.query_params.get('limit', 20))
         
         try:
-            scraper = JeeveeScraper()
+            scraper = get_runtime().jeevee()
             data = scraper.get_products(category=category, page=page, limit=limit)
             return Response(data)
+        except Overloaded as e:
+            raise Throttled(wait=e.retry_after)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -403,9 +562,11 @@ class JeeveeCategoriesView(APIView):
     """Get available categories from Jeevee."""
     def get(self, request):
         try:
-            scraper = JeeveeScraper()
+            scraper = get_runtime().jeevee()
             data = scraper.get_categories()
             return Response(data)
+        except Overloaded as e:
+            raise Throttled(wait=e.retry_after)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -421,43 +582,77 @@ class PriceCompareView(APIView):
     Returns products from both platforms with price comparison data.
     Only products with rating >= min_rating are returned (default: 4.0).
     Set min_rating=0 to disable rating filter.
+    Optional deadline (seconds): answer with whatever sources have returned by then.
+    Optional layout: "refs" or "columns" send each product once (see
+    scraper/payload.py); default "full".
+    Optional fields=name,price,...: send only those product fields.
     """
     def post(self, request):
-        query = request.data.get('query', '')
-        limit = request.data.get('limit', 20)
-        min_rating = request.data.get('min_rating', 4.0)  # Default: only 4+ rated products
-        
-        if not query:
-            return Response({'error': 'Query is required'}, status=status.HTTP_400_BAD_REQUEST)
+        return self._compare(request, request.data, 'query')
+    
+    def get(self, request):
+        """GET method for easy browser testing."""
+        return self._compare(request, request.query_params, 'q')
+    
+    def _compare(self, request, params, key):
+        try:
+            args = compare_params(params, key)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         
         try:
-            # Convert min_rating to float, None if 0 or not provided
-            min_rating = float(min_rating) if min_rating and float(min_rating) > 0 else None
-            
-            comparer = PriceComparer()
-            data = comparer.search_all(query, limit=limit, min_rating=min_rating)
-            return Response(data)
+            get_query_tracker().record(args.query, args.limit)
+            comparer = get_runtime().comparer()
+            data = comparer.search_all(args.query, limit=args.limit, min_rating=args.min_rating,
+                                       deadline=args.deadline)
+            if request.method == 'POST':
+                return Response(pack_compare(data, args.layout, args.fields))
+            return conditional_response(
+                request, 'search', search_version(*(data.get(name) for name in comparer.registry.names())),
+                lambda: Response(pack_compare(data, args.layout, args.fields)),
+            )
+        except Overloaded as e:
+            raise Throttled(wait=e.retry_after)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class PriceCompareStreamView(APIView):
+    """
+    Streaming variant of /api/compare/.
+    GET with ?q=face+wash&limit=20&min_rating=4&deadline=30
+    
+    Sends events as they land instead of waiting for every source:
+    one "source" event per marketplace (Jeevee usually first), "matches"
+    events with batches of compared products, then a final "summary".
+    Server-Sent Events by default; use ?format=ndjson (or
+    Accept: application/x-ndjson) for newline-delimited JSON.
+    """
+    renderer_classes = [EventStreamRenderer, NDJSONRenderer]
     
     def get(self, request):
-        """GET method for easy browser testing."""
-        query = request.query_params.get('q', '')
-        limit = int(request.query_params.get('limit', 20))
-        min_rating = request.query_params.get('min_rating', '4.0')  # Default: only 4+ rated products
+        try:
+            args = stream_params(request.query_params, 'q')
+        except ValueError as e:
+            # Errors are plain JSON, not an event stream
+            return JsonResponse({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         
-        if not query:
-            return Response({'error': 'Query parameter "q" is required'}, status=status.HTTP_400_BAD_REQUEST)
+        renderer = request.accepted_renderer
+        get_query_tracker().record(args.query, args.limit)
+        comparer = get_runtime().comparer()
         
-        try:
-            # Convert min_rating to float, None if 0 or "0"
-            min_rating = float(min_rating) if min_rating and float(min_rating) > 0 else None
-            
-            comparer = PriceComparer()
-            data = comparer.search_all(query, limit=limit, min_rating=min_rating)
-            return Response(data)
-        except Exception as e:
-            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        def stream():
+            try:
+                for event in comparer.iter_search(args.query, limit=args.limit, min_rating=args.min_rating,
+                                                  deadline=args.deadline):
+                    yield renderer.encode_event(event)
+            except Exception as e:
+                yield renderer.encode_event({'event': 'error', 'error': str(e)})
+        
+        response = StreamingHttpResponse(stream(), content_type=f'{renderer.media_type}; charset=utf-8')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'  # Don't let nginx buffer the stream
+        return response
 
 
 class LowestPricesView(APIView):
@@ -469,40 +664,359 @@ class LowestPricesView(APIView):
     Returns a single list of products sorted by price (lowest first).
     Only products with rating >= min_rating are returned (default: 4.0).
     Set min_rating=0 to disable rating filter.
+    Optional sort: price_asc (default), price_desc, rating, discount
+    Optional deadline (seconds): answer with whatever sources have returned by then.
+    Optional page_size and cursor page through the `limit` products (each
+    response's next_cursor); fields=name,price,... sends only those fields.
+    Optional min_price, max_price, min_discount, source and brand filter the
+    products server-side; facets=true adds source/brand counts, value ranges
+    and a price histogram (see scraper/facets.py).
     """
     def post(self, request):
-        query = request.data.get('query', '')
-        limit = request.data.get('limit', 20)
-        min_rating = request.data.get('min_rating', 4.0)  # Default: only 4+ rated products
-        
-        if not query:
-            return Response({'error': 'Query is required'}, status=status.HTTP_400_BAD_REQUEST)
+        return self._lowest(request, request.data, 'query')
+    
+    def get(self, request):
+        """GET method for easy browser testing."""
+        return self._lowest(request, request.query_params, 'q')
+    
+    def _lowest(self, request, params, key):
+        try:
+            args = lowest_prices_params(params, key)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         
         try:
-            # Convert min_rating to float, None if 0 or not provided
-            min_rating = float(min_rating) if min_rating and float(min_rating) > 0 else None
-            
-            comparer = PriceComparer()
-            data = comparer.get_lowest_prices(query, limit=limit, min_rating=min_rating)
-            return Response(data)
+            get_query_tracker().record(args.query, args.limit)
+            comparer = get_runtime().comparer()
+            data = comparer.get_lowest_prices(args.query, limit=args.limit, min_rating=args.min_rating,
+                                              sort=args.sort, deadline=args.deadline,
+                                              facet_query=args.facet_query)
+            if request.method == 'POST':
+                return Response(slice_results(data, args.page, args.fields))
+            return conditional_response(request, 'search', search_version(*data['sources'].values()),
+                                        lambda: Response(slice_results(data, args.page, args.fields)))
+        except Overloaded as e:
+            raise Throttled(wait=e.retry_after)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+# ============== LOCAL INDEX VIEWS ==============
+
+LOCAL_SEARCH_PAGE_SIZE = 20
+LOCAL_SEARCH_MAX_PAGE_SIZE = 100
+
+
+class LocalSearchView(APIView):
+    """
+    Search every product scraped so far, from the local full-text index
+    (no upstream requests), best BM25 match first.
+    GET with ?q=face+wash&min_price=200&max_price=900&min_rating=4&source=jeevee&page_size=20
     
+    Words match as prefixes in name, brand and manufacturer. Prices and
+    ratings are as of each product's last scrape (seen_at). Supports
+    cursor (next_cursor) and fields like the other search endpoints.
+    """
     def get(self, request):
-        """GET method for easy browser testing."""
         query = request.query_params.get('q', '')
-        limit = int(request.query_params.get('limit', 20))
-        min_rating = request.query_params.get('min_rating', '4.0')  # Default: only 4+ rated products
+        source = request.query_params.get('source')
+        cursor = request.query_params.get('cursor')
+        fields = parse_fields(request.query_params.get('fields'))
         
         if not query:
             return Response({'error': 'Query parameter "q" is required'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            bounds = {
+                name: float(request.query_params[name])
+                for name in ('min_price', 'max_price', 'min_rating')
+                if request.query_params.get(name)
+            }
+            page_size = int(request.query_params.get('page_size', LOCAL_SEARCH_PAGE_SIZE))
+            page_size = min(LOCAL_SEARCH_MAX_PAGE_SIZE, max(1, page_size))
+            offset = decode_cursor(cursor, 'offset') if cursor else 0
+        except ValueError:
+            return Response({'error': 'min_price, max_price, min_rating, page_size and cursor must be valid numbers'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        
+        # One extra product tells us whether there is a next page
+        products = get_product_index().search(query, limit=page_size + 1, offset=offset, source=source, **bounds)
+        has_next = len(products) > page_size
+        products = products[:page_size]
+        return Response({
+            'query': query,
+            'success': True,
+            'source': 'index',
+            'products': project(products, fields),
+            'count': len(products),
+            'next_cursor': encode_cursor(offset=offset + page_size) if has_next else None,
+        })
+
+
+class LocalIndexStatsView(APIView):
+    """Size of the local product index."""
+    def get(self, request):
+        return Response(get_product_index().stats())
+
+
+# Seconds clients and proxies may reuse a suggestion list
+SUGGEST_MAX_AGE = 30
+
+
+class SuggestView(APIView):
+    """
+    Typeahead suggestions for a partly typed query, most popular first.
+    GET with ?q=face+w&limit=8
+    
+    Suggestions come from an in-memory prefix index of past successful
+    searches, brands and product names (see scraper/suggest.py); each has
+    'text', 'type' ('query', 'brand' or 'product') and 'score'.
+    """
+    def get(self, request):
+        prefix = request.query_params.get('q', '')
+        try:
+            limit = int(request.query_params.get('limit', MAX_SUGGESTIONS))
+        except ValueError:
+            return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
         
+        response = Response({
+            'query': prefix,
+            'suggestions': get_suggest_index().suggest(prefix, limit=limit),
+        })
+        patch_cache_control(response, public=True, max_age=SUGGEST_MAX_AGE)
+        return response
+
+
+class SuggestStatsView(APIView):
+    """Size of the suggest index."""
+    def get(self, request):
+        return Response(get_suggest_index().stats())
+
+
+# ============== BATCH VIEWS ==============
+
+BATCH_MAX_OPERATIONS = 20
+BATCH_DEFAULT_DEADLINE = 30.0
+BATCH_MAX_DEADLINE = 60.0
+BATCH_OPERATIONS = ('compare', 'lowest_prices', 'jeevee_search', 'daraz_search', 'scrape')
+
+# Runs batch operations; separate from the source pool, which compare/lowest-prices use inside them
+batch_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'BATCH_WORKERS', 16),
+    thread_name_prefix='batch',
+)
+
+
+def run_batch_operation(op, params, expires_at):
+    """
+    Run one batch operation and return its data.
+    
+    Args:
+        op: One of BATCH_OPERATIONS
+        params: The operation's params
+        expires_at: time.monotonic() at which the batch answers; the
+            operation gets whatever is left of the deadline when it starts
+    
+    Raises:
+        ValueError: unknown operation or missing/invalid params
+        TimeoutError: the operation waited in the queue past the deadline
+    """
+    if not isinstance(params, dict):
+        raise ValueError('params must be an object')
+    deadline = expires_at - time.monotonic()
+    if deadline <= 0:
+        # The batch has already answered 504 for it; free the worker
+        raise TimeoutError('Deadline exceeded')
+    if op in ('compare', 'lowest_prices'):
+        args = (compare_params if op == 'compare' else lowest_prices_params)(params)
+        # An operation's own deadline can only shorten the batch's
+        if args.deadline is not None:
+            deadline = min(deadline, args.deadline)
+        get_query_tracker().record(args.query, args.limit)
+        comparer = get_runtime().comparer()
+        if op == 'compare':
+            data = comparer.search_all(args.query, limit=args.limit, min_rating=args.min_rating, deadline=deadline)
+            return pack_compare(data, args.layout, args.fields)
+        data = comparer.get_lowest_prices(args.query, limit=args.limit, min_rating=args.min_rating, sort=args.sort,
+                                          deadline=deadline, facet_query=args.facet_query)
+        return slice_results(data, args.page, args.fields)
+    
+    if op == 'jeevee_search':
+        args = jeevee_search_params(params)
+        data = search_jeevee_page(args.query, args.page, args.limit)
+        return search_page(data, args.page + 1 if data.get('has_next') else None, args.fields)
+    
+    if op == 'daraz_search':
+        args = daraz_search_params(params)
+        data = search_daraz_page(args.query, args.region, args.page, args.sort)
+        return search_page(data, args.page + 1 if data.get('products') else None, args.fields)
+    
+    if op == 'scrape':
+        if not params.get('url'):
+            raise ValueError('params.url is required')
+        return get_runtime().webscraper().fetch(params['url'])
+    
+    raise ValueError(f"Unknown op '{op}'. Use one of: {', '.join(BATCH_OPERATIONS)}")
+
+
+class BatchView(APIView):
+    """
+    Run several searches concurrently under one deadline (seconds, default
+    BATCH_DEFAULT_DEADLINE, at most BATCH_MAX_DEADLINE).
+    POST with {
+        "deadline": 30,
+        "operations": [
+            {"id": "home", "op": "lowest_prices", "params": {"query": "shoes", "limit": 50}},
+            {"id": "fw", "op": "compare", "params": {"query": "face wash"}},
+            {"op": "jeevee_search", "params": {"query": "moisturizer", "page": 1}}
+        ]
+    }
+    ops: compare, lowest_prices, jeevee_search, daraz_search, scrape
+    params match the single endpoints', including fields and cursor.
+    
+    Identical operations run once. Each result carries its own HTTP-style
+    status: 200, 400 (bad params), 429 (upstream overloaded, with
+    retry_after), 500 (error) or 504 (not finished by the deadline).
+    """
+    def post(self, request):
+        operations = request.data.get('operations')
+        if not isinstance(operations, list) or not operations:
+            return Response({'error': 'operations must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(operations) > BATCH_MAX_OPERATIONS:
+            return Response({'error': f'At most {BATCH_MAX_OPERATIONS} operations per batch'}, status=status.HTTP_400_BAD_REQUEST)
         try:
-            # Convert min_rating to float, None if 0 or "0"
-            min_rating = float(min_rating) if min_rating and float(min_rating) > 0 else None
-            
-            comparer = PriceComparer()
-            data = comparer.get_lowest_prices(query, limit=limit, min_rating=min_rating)
-            return Response(data)
-        except Exception as e:
-            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            deadline = parse_deadline(request.data.get('deadline'), maximum=BATCH_MAX_DEADLINE)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if deadline is None:
+            deadline = BATCH_DEFAULT_DEADLINE
+        
+        started = time.monotonic()
+        items = []
+        futures = {}  # dedup key -> future
+        for index, operation in enumerate(operations):
+            if not isinstance(operation, dict):
+                operation = {}
+            op = operation.get('op', '')
+            params = operation.get('params') or {}
+            key = json.dumps([op, params], sort_keys=True, default=str)
+            if key not in futures:
+                futures[key] = batch_executor.submit(run_batch_operation, op, params, started + deadline)
+            items.append((operation.get('id', index), op, key))
+        
+        wait(futures.values(), timeout=deadline)
+        
+        results = []
+        for item_id, op, key in items:
+            future = futures[key]
+            result = {'id': item_id, 'op': op}
+            if not future.done():
+                result.update(status=504, error='Deadline exceeded')
+            else:
+                try:
+                    result.update(status=200, data=future.result())
+                except ValueError as e:
+                    result.update(status=400, error=str(e))
+                except Overloaded as e:
+                    result.update(status=429, error=str(e), retry_after=e.retry_after)
+                except Exception as e:
+                    result.update(status=500, error=str(e))
+            results.append(result)
+        
+        # Don't start queued operations nobody is waiting for any more
+        for future in futures.values():
+            future.cancel()
+        
+        return Response({
+            'results': results,
+            'operations': len(items),
+            'executed': len(futures),
+            'elapsed': round(time.monotonic() - started, 3),
+        })
+
+
+# ============== JOB VIEWS ==============
+
+class JobListView(APIView):
+    """
+    Queue a long-running scrape or comparison, processed by `manage.py run_jobs`.
+    POST with {"kind": "daraz_pages", "params": {"query": "shoes", "pages": 5}}
+    GET returns job counts per status.
+    
+    Kinds: daraz_pages, daraz_details, search_shoes, compare, lowest_prices
+    """
+    def post(self, request):
+        kind = request.data.get('kind', '')
+        params = request.data.get('params') or {}
+        
+        if kind not in JOB_HANDLERS:
+            return Response({'error': f'kind must be one of: {", ".join(JOB_HANDLERS)}'}, status=status.HTTP_400_BAD_REQUEST)
+        if not isinstance(params, dict):
+            return Response({'error': 'params must be an object'}, status=status.HTTP_400_BAD_REQUEST)
+        if kind == 'daraz_details' and not params.get('urls'):
+            return Response({'error': 'params.urls is required'}, status=status.HTTP_400_BAD_REQUEST)
+        if kind != 'daraz_details' and not params.get('query'):
+            return Response({'error': 'params.query is required'}, status=status.HTTP_400_BAD_REQUEST)
+        if kind in ('compare', 'lowest_prices'):
+            try:
+                params = comparison_params(params, sort=kind == 'lowest_prices')
+            except ValueError as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        job = get_job_queue().submit(kind, params)
+        response = Response(job, status=status.HTTP_202_ACCEPTED)
+        response['Location'] = f"/api/jobs/{job['id']}/"
+        return response
+    
+    def get(self, request):
+        return Response(get_job_queue().stats())
+
+
+class JobDetailView(APIView):
+    """Status of a job: queued, running, done or failed."""
+    def get(self, request, job_id):
+        job = get_job_queue().get(job_id)
+        if job is None:
+            return Response({'error': 'Job not found or expired'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(job)
+
+
+class JobResultView(APIView):
+    """
+    Result of a finished job.
+    200 with the result when done, 202 with the status while queued or running,
+    500 with the error if it failed.
+    """
+    def get(self, request, job_id):
+        job = get_job_queue().get(job_id, with_result=True)
+        if job is None:
+            return Response({'error': 'Job not found or expired'}, status=status.HTTP_404_NOT_FOUND)
+        if job['status'] == 'done':
+            return Response(job['result'])
+        if job['status'] == 'failed':
+            return Response({'error': job['error']}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        job.pop('result', None)
+        return Response(job, status=status.HTTP_202_ACCEPTED)
+
+
+class CacheStatsView(APIView):
+    """Hit/miss metrics for the search result cache."""
+    def get(self, request):
+        return Response(get_result_cache().stats())
+
+
+class AdmissionStatsView(APIView):
+    """Per-upstream bulkhead load, queue-time estimates and rejections."""
+    def get(self, request):
+        return Response(bulkhead_stats())
+
+
+class OutboundStatsView(APIView):
+    """Per-domain outbound request rate, waits and anti-bot pushback."""
+    def get(self, request):
+        return Response(get_scheduler().stats())
+
+
+class PrefetchStatsView(APIView):
+    """Per-source hit rate of the next-page prefetcher."""
+    def get(self, request):
+        return Response(prefetcher.stats())
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -48,6 +49,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
+    'api.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -141,8 +143,67 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
+    # orjson-backed JSON; the browsable API is only offered while DEBUG is on
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
-        'rest_framework.renderers.BrowsableAPIRenderer',
-    ],
+        'api.renderers.FastJSONRenderer',
+    ] + (['rest_framework.renderers.BrowsableAPIRenderer'] if DEBUG else []),
+}
+
+# Where shopping carts live (api/cart.py): 'memory' (one process, dev) or
+# 'sqlite' (shared by every worker on the host, under SCRAPER_DATA_DIR)
+CART_STORE = os.environ.get('CART_STORE', 'memory')
+
+# Cache-Control per endpoint group (api/caching.py). Responses also carry ETags,
+# so clients revalidate with If-None-Match and get 304 Not Modified when
+# nothing changed. Search results are only cacheable when every source was
+# served from the result cache.
+HTTP_CACHE_CONTROL = {
+    'static': {'public': True, 'max_age': 3600},   # nav links, performance, features
+    'catalog': {'public': True, 'max_age': 300},   # products
+    'search': {'public': True, 'max_age': 60},     # compare, lowest-prices
+}
+
+# Responses larger than this are gzip/Brotli compressed (api/middleware.py)
+COMPRESS_MIN_SIZE = 1024  # bytes
+COMPRESS_GZIP_LEVEL = 6
+COMPRESS_BROTLI_QUALITY = 5  # 0-11; higher is smaller but much slower
+
+# Speculative prefetch of the next search results page, per source.
+# Check /api/prefetch/stats/ and switch off sources with a poor hit rate.
+PREFETCH_NEXT_PAGE = {
+    'daraz': True,
+    'jeevee': True,
+}
+PREFETCH_TTL = 60  # seconds a prefetched page is kept
+
+# Per-upstream admission limits. Requests that would queue longer than
+# max_wait (or find max_queue callers already waiting) get 429 + Retry-After,
+# or the last cached result for comparisons. See /api/admission/stats/.
+BULKHEADS = {
+    'daraz-browser': {'max_concurrent': 2, 'max_queue': 4, 'max_wait': 30},
+    'daraz-http': {'max_concurrent': 4, 'max_queue': 8, 'max_wait': 15},
+    'jeevee': {'max_concurrent': 8, 'max_queue': 16, 'max_wait': 10},
+    'webscraper': {'max_concurrent': 4, 'max_queue': 8, 'max_wait': 15},
 }
+
+# Outbound requests per second and burst per marketplace host, shared by every
+# worker process, the cache warmer and prefetches. A 429 or captcha halves a
+# host's rate and pauses it; successes bring it back up to these values.
+# Hosts not listed get 1 req/s. See /api/outbound/stats/.
+OUTBOUND_RATES = {
+    'daraz.com.np': {'rate': 0.5, 'burst': 3},
+    'api.jeevee.com': {'rate': 5.0, 'burst': 10},
+}
+
+# Serve the scraping endpoints with native async views (api/async_views.py).
+# Only useful under an ASGI server: DJANGO_ASYNC_VIEWS=1 uvicorn config.asgi:application
+ASYNC_VIEWS = os.environ.get('DJANGO_ASYNC_VIEWS') == '1'
+ASYNC_SCRAPE_WORKERS = 32  # threads running blocking scraper calls for async views
+
+# Scrapers are created once per process (api/apps.py, scraper/runtime.py).
+# Daraz browsers are pooled and kept running between searches.
+DARAZ_BROWSER_POOL = 2        # idle browsers kept per region
+DARAZ_DRIVER_MAX_USES = 50    # searches before a browser is restarted
+# Start the scrapers (and SCRAPER_PREWARM_BROWSERS browsers) at boot instead of on first use
+SCRAPER_PREWARM = os.environ.get('SCRAPER_PREWARM') == '1'
+SCRAPER_PREWARM_BROWSERS = 1
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_wsgi_application()
+
+# Render /api/bootstrap/ now rather than on the first request
+from api.views import warm_bootstrap  # noqa: E402
+
+warm_bootstrap()
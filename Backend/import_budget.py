@@ -0,0 +1,88 @@
+"""
+Import-time budget check.
+
+Imports each entry point in a fresh interpreter with `python -X importtime`,
+reports the total and the slowest top-level imports, and fails if an entry
+point goes over its budget or pulls in a browser library (those must only be
+imported when a Daraz browser is actually started).
+
+Usage:
+    python import_budget.py            # check all budgets
+    python import_budget.py --top 15   # show more of the slowest imports
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DJANGO_BOOT = (
+    "import os, django; "
+    "os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings'); "
+    "django.setup(); import ulrs"
+)
+
+# name -> (code to run, budget in milliseconds)
+BUDGETS = {
+    'scraper.jeevee (Jeevee-only worker)': ('import scraper.jeevee', 400),
+    'scraper (API-only worker)': ('import scraper', 600),
+    'django + urls (web worker boot)': (DJANGO_BOOT, 2000),
+}
+
+# Modules that must stay out of every entry point above
+FORBIDDEN = ('selenium', 'undetected_chromedriver', 'webdriver_manager')
+
+LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+def measure(code):
+    """Return (total microseconds, [(cumulative us, module)] for top-level imports, all modules)"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=BACKEND_DIR, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    top_level, modules = [], set()
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if not match:
+            continue
+        cumulative, indent, module = int(match.group(2)), len(match.group(3)), match.group(4)
+        modules.add(module)
+        if indent == 1:
+            top_level.append((cumulative, module))
+    return sum(us for us, _ in top_level), top_level, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check import-time budgets')
+    parser.add_argument('--top', type=int, default=5, help='Slowest top-level imports to show')
+    args = parser.parse_args()
+
+    failed = False
+    for name, (code, budget_ms) in BUDGETS.items():
+        try:
+            total, top_level, modules = measure(code)
+        except RuntimeError as e:
+            print(f"FAIL  {name}: {e}")
+            failed = True
+            continue
+        total_ms = total / 1000
+        forbidden = sorted(m for m in modules if m.split('.')[0] in FORBIDDEN)
+        ok = total_ms <= budget_ms and not forbidden
+        failed = failed or not ok
+        print(f"{'ok  ' if ok else 'FAIL'}  {name}: {total_ms:.0f} ms (budget {budget_ms} ms)")
+        if forbidden:
+            print(f"      imports browser libraries: {', '.join(forbidden[:5])}")
+        for us, module in sorted(top_level, reverse=True)[:args.top]:
+            print(f"      {us / 1000:8.1f} ms  {module}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Simple concurrency load test for the API.
+
+Fires --requests GET requests at --url from --concurrency threads and reports
+throughput, latency percentiles and errors. Run it against the same endpoint
+under WSGI and under ASGI with DJANGO_ASYNC_VIEWS=1 to compare them. Run it
+against a cheap endpoint at the same time to see whether it queues behind the
+slow one. README.md ("Run under ASGI") records one such comparison.
+
+Usage:
+    python loadtest.py --url "http://127.0.0.1:8000/api/lowest-prices/?q=shoes" --concurrency 50 --requests 500
+"""
+
+import argparse
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+
+def hit(url, timeout):
+    """Return (status, seconds) for one request; status is the error name on failure"""
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except Exception as e:
+        status = type(e).__name__
+    return status, time.perf_counter() - started
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Concurrent GET load test')
+    parser.add_argument('--url', required=True)
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--timeout', type=float, default=120.0)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(lambda _: hit(args.url, args.timeout), range(args.requests)))
+    elapsed = time.perf_counter() - started
+
+    statuses = Counter(status for status, _ in results)
+    latencies = sorted(seconds for status, seconds in results if status == 200)
+    errors = args.requests - statuses.get(200, 0)
+
+    print(f"URL:          {args.url}")
+    print(f"Requests:     {args.requests} at concurrency {args.concurrency}")
+    print(f"Elapsed:      {elapsed:.2f}s")
+    print(f"Throughput:   {args.requests / elapsed:.1f} req/s")
+    print(f"Latency p50:  {percentile(latencies, 50) * 1000:.0f} ms")
+    print(f"Latency p95:  {percentile(latencies, 95) * 1000:.0f} ms")
+    print(f"Latency p99:  {percentile(latencies, 99) * 1000:.0f} ms")
+    print(f"Errors:       {errors} ({dict(statuses)})")
+
+
+if __name__ == '__main__':
+    main()
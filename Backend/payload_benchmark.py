@@ -0,0 +1,127 @@
+"""
+Compare payload benchmark.
+
+Builds a typical /api/compare/ response (40 Daraz + 40 Jeevee products,
+matched with the real PriceComparer logic, no network) and reports how long
+each renderer takes to serialize it, in each payload layout (see
+scraper/payload.py), and how many bytes go on the wire raw, gzipped and
+Brotli-compressed.
+
+Usage:
+    python payload_benchmark.py
+    python payload_benchmark.py --products 60 --rounds 500
+"""
+
+import argparse
+import gzip
+import os
+import random
+import tempfile
+import time
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from api.middleware import BROTLI_AVAILABLE, brotli  # noqa: E402
+from api.renderers import ORJSON_AVAILABLE, FastJSONRenderer  # noqa: E402
+from scraper.match_store import MatchStore  # noqa: E402
+from scraper.payload import LAYOUTS, pack_compare  # noqa: E402
+from scraper.price_compare import PriceComparer  # noqa: E402
+
+WORDS = ['Himalaya', 'Cetaphil', 'Nivea', 'Neutrogena', 'Gentle', 'Oil Control',
+         'Face Wash', 'Cleanser', 'Moisturizing', 'Foaming', 'Herbal', 'Neem',
+         '100ml', '150ml', 'Pack of 2', 'For Men', 'For Women', 'Daily']
+
+
+def make_products(source, count, rng):
+    products = []
+    for i in range(count):
+        name = ' '.join(rng.sample(WORDS, 5))
+        price = rng.randint(150, 2500)
+        product = {
+            'id': f'{source.lower()}-{100000 + i}',
+            'name': name,
+            'price': f'Rs. {price}',
+            'original_price': f'Rs. {int(price * 1.2)}',
+            'discount': '-17%',
+            'image': f'https://static.example.com/{source.lower()}/{100000 + i}.jpg',
+            'url': f'https://www.{source.lower()}.com.np/products/{name.lower().replace(" ", "-")}-{100000 + i}',
+            'rating': str(round(rng.uniform(3, 5), 1)),
+            'source': source,
+            'in_stock': True,
+        }
+        if source == 'Daraz':
+            product['link'] = product['url']
+            product['currency'] = 'NPR'
+        else:
+            product['brand'] = name.split()[0]
+        products.append(product)
+    return products
+
+
+def make_payload(count, seed=1):
+    """A compare response shaped like PriceComparer.search_all's"""
+    rng = random.Random(seed)
+    daraz = make_products('Daraz', count, rng)
+    jeevee = make_products('Jeevee', count, rng)
+    # Give about a third of the Daraz products a close Jeevee twin to match
+    for i in range(0, count, 3):
+        jeevee[i]['name'] = daraz[i]['name'] + ' New'
+
+    with tempfile.TemporaryDirectory() as tmp:
+        comparer = PriceComparer(match_store=MatchStore(path=os.path.join(tmp, 'links.sqlite3')),
+                                 use_cache=False)
+        compared = comparer._compare_products(daraz, jeevee)
+        all_products = comparer._sort_by_price(daraz + jeevee)
+    return {
+        'query': 'face wash',
+        'daraz': {'products': daraz, 'success': True, 'status': 'done', 'count': count},
+        'jeevee': {'products': jeevee, 'success': True, 'status': 'done', 'count': count},
+        'all_products': all_products,
+        'compared_products': compared,
+        'min_rating_filter': None,
+        'partial': False,
+    }
+
+
+def timed(func, rounds):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        result = func()
+    return (time.perf_counter() - started) / rounds * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark compare payload encoding')
+    parser.add_argument('--products', type=int, default=40, help='Products per source')
+    parser.add_argument('--rounds', type=int, default=200, help='Encodes per measurement')
+    args = parser.parse_args()
+
+    payload = make_payload(args.products)
+    renderers = {'JSONRenderer (stdlib)': JSONRenderer()}
+    if ORJSON_AVAILABLE:
+        renderers['FastJSONRenderer (orjson)'] = FastJSONRenderer()
+    else:
+        print('orjson not installed; FastJSONRenderer falls back to the stdlib\n')
+
+    print(f"{args.products} + {args.products} products, "
+          f"{len(payload['compared_products'])} comparisons\n")
+    print(f"{'renderer':<28} {'layout':<8} {'pack':>8} {'encode':>9} {'raw':>9} {'gzip':>9} {'br':>9}")
+    for name, renderer in renderers.items():
+        for layout in LAYOUTS:
+            pack_ms, packed = timed(lambda: pack_compare(payload, layout), args.rounds)
+            ms, body = timed(lambda: renderer.render(packed), args.rounds)
+            gzipped = len(gzip.compress(body, compresslevel=settings.COMPRESS_GZIP_LEVEL))
+            brotlied = (f"{len(brotli.compress(body, quality=settings.COMPRESS_BROTLI_QUALITY)):,}"
+                        if BROTLI_AVAILABLE else '-')
+            print(f"{name:<28} {layout:<8} {pack_ms:>6.2f}ms {ms:>7.2f}ms "
+                  f"{len(body):>9,} {gzipped:>9,} {brotlied:>9}")
+
+
+if __name__ == '__main__':
+    main()
@@ -3,6 +3,7 @@ from .webscraper import WebScraper
 from .daraz import DarazScraper, search_daraz
 from .jeevee import JeeveeScraper, search_jeevee
 from .price_compare import PriceComparer, compare_prices, get_lowest_prices
+from .sources import Source, SourceRegistry, default_registry
 
 __all__ = [
     'WebScraper',
@@ -13,4 +14,7 @@ __all__ = [
     'PriceComparer',
     'compare_prices',
     'get_lowest_prices',
+    'Source',
+    'SourceRegistry',
+    'default_registry',
 ]
\ No newline at end of file
@@ -0,0 +1,186 @@
+"""
+Admission Control
+One bulkhead per upstream (Daraz browser, Daraz HTTP, Jeevee, generic sites)
+so a spike against one of them cannot exhaust memory or starve the others.
+
+A bulkhead runs at most `max_concurrent` calls, lets at most `max_queue` more
+wait for a slot, and estimates how long a new caller would queue from the
+recent service time. Callers that would wait longer than `max_wait` (or find
+the queue full) are rejected at once with Overloaded, which carries a
+Retry-After hint, instead of piling up until everything times out.
+
+Background work (prefetch, cache warming and stale refreshes; see
+politeness.background()) never queues: it is admitted only while fewer than
+`background_share` of the slots are busy, and rejected at once otherwise, so
+speculative calls cannot hold the slots live requests need.
+"""
+
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# name -> limits; service_time is the initial guess for one call in seconds
+DEFAULT_BULKHEADS = {
+    'daraz-browser': {'max_concurrent': 2, 'max_queue': 4, 'max_wait': 30.0, 'service_time': 15.0},
+    'daraz-http': {'max_concurrent': 4, 'max_queue': 8, 'max_wait': 15.0, 'service_time': 3.0},
+    'jeevee': {'max_concurrent': 8, 'max_queue': 16, 'max_wait': 10.0, 'service_time': 1.0},
+    'webscraper': {'max_concurrent': 4, 'max_queue': 8, 'max_wait': 15.0, 'service_time': 3.0},
+}
+
+
+class Overloaded(Exception):
+    """An upstream's bulkhead rejected the call"""
+
+    def __init__(self, upstream: str, retry_after: float):
+        self.upstream = upstream
+        self.retry_after = max(1, int(math.ceil(retry_after)))
+        super().__init__(f"{upstream} overloaded, retry in {self.retry_after}s")
+
+
+class Bulkhead:
+    """
+    Concurrency limit with a bounded wait queue and queue-time estimate.
+
+    Args:
+        name: Upstream name, used in errors and stats
+        max_concurrent: Calls allowed to run at once
+        max_queue: Callers allowed to wait for a slot
+        max_wait: Longest (estimated or actual) wait before rejecting
+        service_time: Initial estimate of one call's duration in seconds
+        background_share: Share of the slots background work may start in;
+            at least one slot is always left to live calls
+    """
+
+    def __init__(self, name: str, max_concurrent: int = 4, max_queue: int = 8,
+                 max_wait: float = 15.0, service_time: float = 3.0,
+                 background_share: float = 0.5):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.service_time = service_time  # moving average of recent calls
+        self.background_limit = min(max_concurrent - 1, int(max_concurrent * background_share))
+        self.active = 0
+        self.queued = 0
+        self._cond = threading.Condition()
+        self._stats = {'admitted': 0, 'queued': 0, 'rejected': 0, 'timed_out': 0,
+                       'background_rejected': 0, 'queue_seconds': 0.0}
+
+    def estimate_wait(self) -> float:
+        """Seconds a caller arriving now would expect to wait for a slot"""
+        with self._cond:
+            return self._estimate()
+
+    def _estimate(self) -> float:
+        # Caller holds self._cond
+        ahead = self.active + self.queued - self.max_concurrent + 1
+        if ahead <= 0:
+            return 0.0
+        return math.ceil(ahead / self.max_concurrent) * self.service_time
+
+    @contextmanager
+    def slot(self):
+        """
+        Hold one slot for the duration of the block.
+
+        Yields:
+            Seconds spent queueing
+
+        Raises:
+            Overloaded: the queue is full, the estimated wait exceeds
+                max_wait, or no slot freed up within max_wait; for
+                background work, the background share is in use
+        """
+        # Imported here to avoid a circular import (politeness raises Overloaded)
+        from .politeness import BACKGROUND, current_priority
+
+        started = time.monotonic()
+        with self._cond:
+            if current_priority() == BACKGROUND:
+                if self.queued or self.active >= self.background_limit:
+                    self._stats['background_rejected'] += 1
+                    raise Overloaded(self.name, self._estimate() or self.service_time)
+            elif self.active >= self.max_concurrent or self.queued:
+                estimate = self._estimate()
+                if self.queued >= self.max_queue or estimate > self.max_wait:
+                    self._stats['rejected'] += 1
+                    raise Overloaded(self.name, estimate or self.service_time)
+                self.queued += 1
+                self._stats['queued'] += 1
+                try:
+                    deadline = started + self.max_wait
+                    while self.active >= self.max_concurrent:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self._stats['timed_out'] += 1
+                            raise Overloaded(self.name, self._estimate() or self.service_time)
+                        self._cond.wait(remaining)
+                finally:
+                    self.queued -= 1
+            self.active += 1
+            self._stats['admitted'] += 1
+            queue_time = time.monotonic() - started
+            self._stats['queue_seconds'] += queue_time
+
+        try:
+            yield queue_time
+        finally:
+            duration = time.monotonic() - started - queue_time
+            with self._cond:
+                self.active -= 1
+                self.service_time = 0.8 * self.service_time + 0.2 * duration
+                self._cond.notify()
+
+    def stats(self) -> Dict:
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update({
+                'active': self.active,
+                'queued_now': self.queued,
+                'max_concurrent': self.max_concurrent,
+                'max_queue': self.max_queue,
+                'background_limit': self.background_limit,
+                'service_time': round(self.service_time, 3),
+                'estimated_wait': round(self._estimate(), 3),
+            })
+        queue_seconds = stats.pop('queue_seconds')
+        stats['avg_queue_time'] = round(queue_seconds / stats['admitted'], 3) if stats['admitted'] else 0.0
+        return stats
+
+
+_bulkheads: Dict[str, Bulkhead] = {}
+_bulkheads_lock = threading.Lock()
+
+
+def configure_bulkheads(limits: Optional[Dict[str, Dict]] = None):
+    """
+    Override bulkhead limits, e.g. from Django settings.
+
+    Args:
+        limits: upstream name -> keyword arguments for Bulkhead; missing
+            keys keep their defaults
+    """
+    with _bulkheads_lock:
+        for name, overrides in (limits or {}).items():
+            options = dict(DEFAULT_BULKHEADS.get(name, {}), **overrides)
+            _bulkheads[name] = Bulkhead(name, **options)
+
+
+def get_bulkhead(name: str) -> Bulkhead:
+    """Return the process-wide bulkhead for an upstream, creating it on first use"""
+    with _bulkheads_lock:
+        if name not in _bulkheads:
+            _bulkheads[name] = Bulkhead(name, **DEFAULT_BULKHEADS.get(name, {}))
+        return _bulkheads[name]
+
+
+def bulkhead_stats() -> Dict[str, Dict]:
+    """Stats for every bulkhead created so far"""
+    with _bulkheads_lock:
+        bulkheads = list(_bulkheads.values())
+    return {bulkhead.name: bulkhead.stats() for bulkhead in bulkheads}
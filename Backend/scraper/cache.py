@@ -0,0 +1,365 @@
+"""
+Search Result Cache
+Two-tier cache for source search results: an in-process LRU bounded by size
+in front of a SQLite tier on disk that every worker on the host shares.
+
+Entries have their own TTL, a stale window during which they are still served
+while a background refresh runs (stale-while-revalidate), and empty or failed
+results are cached for a shorter negative TTL.
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
+
+from . import storage
+from .politeness import background
+
+logger = logging.getLogger(__name__)
+
+# Defaults used when a caller does not pass its own
+DEFAULT_TTL = 600
+DEFAULT_STALE_TTL = 3600
+DEFAULT_NEGATIVE_TTL = 60
+DEFAULT_MEMORY_BYTES = 32 * 1024 * 1024
+REFRESH_WORKERS = 4
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a search query"""
+    return ' '.join(str(query).lower().split())
+
+
+def make_key(namespace: str, query: str, **params) -> str:
+    """
+    Build a cache key from a namespace, a normalized query and parameters.
+
+    Example:
+        make_key('daraz', ' Face  Wash', limit=20) -> 'daraz|face wash|limit=20'
+    """
+    parts = [namespace, normalize_query(query)]
+    parts.extend(f"{name}={params[name]}" for name in sorted(params))
+    return '|'.join(parts)
+
+
+class CacheEntry:
+    """A cached value with its freshness window"""
+
+    __slots__ = ('blob', 'stored_at', 'fresh_until', 'stale_until', 'negative')
+
+    def __init__(self, blob: bytes, stored_at: float, fresh_until: float,
+                 stale_until: float, negative: bool = False):
+        self.blob = blob
+        self.stored_at = stored_at
+        self.fresh_until = fresh_until
+        self.stale_until = stale_until
+        self.negative = negative
+
+    def state(self, now: float) -> Optional[str]:
+        """'fresh', 'stale', or None once the stale window has passed"""
+        if now < self.fresh_until:
+            return 'fresh'
+        if now < self.stale_until:
+            return 'stale'
+        return None
+
+
+class LRUCache:
+    """Thread-safe LRU of CacheEntry objects bounded by total blob size"""
+
+    def __init__(self, max_bytes: int = DEFAULT_MEMORY_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.evictions = 0
+        self._entries: 'OrderedDict[str, CacheEntry]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CacheEntry):
+        if len(entry.blob) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old.blob)
+            self._entries[key] = entry
+            self.size += len(entry.blob)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted.blob)
+                self.evictions += 1
+
+    def delete(self, key: str):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old.blob)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class DiskCache:
+    """SQLite tier shared by all worker processes"""
+
+    def __init__(self, path=None):
+        self.path = path or storage.data_path('results.sqlite3')
+        self._lock = threading.Lock()
+        self._conn = storage.connect(self.path)
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS search_results (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                stored_at REAL NOT NULL,
+                fresh_until REAL NOT NULL,
+                stale_until REAL NOT NULL,
+                negative INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT value, stored_at, fresh_until, stale_until, negative '
+                'FROM search_results WHERE key = ?',
+                (key,),
+            ).fetchone()
+        if row is None:
+            return None
+        return CacheEntry(bytes(row[0]), row[1], row[2], row[3], bool(row[4]))
+
+    def set(self, key: str, entry: CacheEntry):
+        try:
+            with self._lock:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO search_results VALUES (?, ?, ?, ?, ?, ?)',
+                    (key, entry.blob, entry.stored_at, entry.fresh_until,
+                     entry.stale_until, int(entry.negative)),
+                )
+                self._conn.commit()
+        except Exception as e:
+            logger.warning(f"Could not write cache entry {key}: {e}")
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute('DELETE FROM search_results WHERE key = ?', (key,))
+            self._conn.commit()
+
+    def purge_expired(self) -> int:
+        """Delete entries past their stale window, returns rows removed"""
+        with self._lock:
+            cursor = self._conn.execute(
+                'DELETE FROM search_results WHERE stale_until < ?', (time.time(),)
+            )
+            self._conn.commit()
+        return cursor.rowcount
+
+
+class ResultCache:
+    """
+    Memory LRU in front of the shared disk tier, with stale-while-revalidate
+    and negative caching.
+
+    Values must be JSON-serializable. Every read decodes a fresh copy, so
+    callers may mutate what they get back.
+    """
+
+    def __init__(self, memory_bytes: int = DEFAULT_MEMORY_BYTES, disk_path=None,
+                 use_disk: bool = True):
+        self.memory = LRUCache(memory_bytes)
+        self.disk = DiskCache(disk_path) if use_disk else None
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._stats = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'stale_hits': 0,
+            'negative_hits': 0,
+            'refreshes': 0,
+            'refresh_errors': 0,
+            'writes': 0,
+        }
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    def lookup(self, key: str) -> Optional[CacheEntry]:
+        """Return the entry for key from memory or disk, if still servable"""
+        now = time.time()
+        entry = self.memory.get(key)
+        if entry is not None and entry.state(now) == 'fresh':
+            self._count('memory_hits')
+            return entry
+
+        # Another worker (or the cache warmer) may have refreshed the disk tier
+        if self.disk is not None:
+            disk_entry = self.disk.get(key)
+            if (disk_entry is not None and disk_entry.state(now)
+                    and (entry is None or disk_entry.stored_at > entry.stored_at)):
+                self._count('disk_hits')
+                self.memory.set(key, disk_entry)
+                return disk_entry
+
+        if entry is not None and entry.state(now):
+            self._count('memory_hits')
+            return entry
+
+        self._count('misses')
+        return None
+
+    def peek(self, key: str) -> Optional[CacheEntry]:
+        """Return the newest entry for key (even if expired) without touching metrics"""
+        entry = self.memory.get(key)
+        if self.disk is not None:
+            disk_entry = self.disk.get(key)
+            if disk_entry is not None and (entry is None or disk_entry.stored_at > entry.stored_at):
+                entry = disk_entry
+        return entry
+
+    def get(self, key: str) -> Optional[Tuple[object, Dict]]:
+        """
+        Get a cached value.
+
+        Returns:
+            (value, meta) or None on a miss. meta has 'status' ('fresh' or
+            'stale'), 'stored_at' and 'negative'.
+        """
+        entry = self.lookup(key)
+        if entry is None:
+            return None
+        return json.loads(entry.blob), self._meta(key, entry)
+
+    def set(self, key: str, value, ttl: float = DEFAULT_TTL,
+            stale_ttl: float = DEFAULT_STALE_TTL, negative: bool = False) -> Dict:
+        """Store a value in both tiers, returns its meta"""
+        now = time.time()
+        entry = CacheEntry(
+            json.dumps(value, default=str).encode('utf-8'),
+            stored_at=now,
+            fresh_until=now + ttl,
+            stale_until=now + ttl + stale_ttl,
+            negative=negative,
+        )
+        self.memory.set(key, entry)
+        if self.disk is not None:
+            self.disk.set(key, entry)
+        self._count('writes')
+        return self._meta(key, entry, status='miss')
+
+    def delete(self, key: str):
+        self.memory.delete(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def get_or_fetch(self, key: str, fetch: Callable[[], object], ttl: float = DEFAULT_TTL,
+                     stale_ttl: float = DEFAULT_STALE_TTL,
+                     negative_ttl: float = DEFAULT_NEGATIVE_TTL,
+                     is_negative: Callable[[object], bool] = lambda value: not value) -> Tuple[object, Dict]:
+        """
+        Return a cached value, or fetch and cache it.
+
+        A stale entry is returned immediately and refreshed in the background.
+        Values for which is_negative(value) is true are kept for negative_ttl
+        only, with no stale window.
+
+        Returns:
+            (value, meta) where meta['status'] is 'fresh', 'stale' or 'miss'
+        """
+        entry = self.lookup(key)
+        if entry is not None:
+            state = entry.state(time.time())
+            if entry.negative:
+                self._count('negative_hits')
+            if state == 'stale':
+                self._count('stale_hits')
+                self._refresh_async(key, fetch, ttl, stale_ttl, negative_ttl, is_negative)
+            return json.loads(entry.blob), self._meta(key, entry)
+
+        value = fetch()
+        return value, self.store(key, value, ttl, stale_ttl, negative_ttl, is_negative)
+
+    def store(self, key: str, value, ttl: float = DEFAULT_TTL,
+              stale_ttl: float = DEFAULT_STALE_TTL,
+              negative_ttl: float = DEFAULT_NEGATIVE_TTL,
+              is_negative: Callable[[object], bool] = lambda value: not value) -> Dict:
+        """Store a freshly fetched value, using the negative TTL if it is empty"""
+        if is_negative(value):
+            return self.set(key, value, ttl=negative_ttl, stale_ttl=0, negative=True)
+        return self.set(key, value, ttl=ttl, stale_ttl=stale_ttl)
+
+    def _refresh_async(self, key, fetch, ttl, stale_ttl, negative_ttl, is_negative):
+        """Refresh key in the background unless a refresh is already running"""
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=REFRESH_WORKERS, thread_name_prefix='cache-refresh'
+                )
+
+        def refresh():
+            try:
+                # Someone is already being served the stale copy, so yield to live traffic
+                with background():
+                    value = fetch()
+                # Keep serving the stale value rather than replacing it with a failure
+                if is_negative(value):
+                    self._count('refresh_errors')
+                    return
+                self.set(key, value, ttl=ttl, stale_ttl=stale_ttl)
+                self._count('refreshes')
+            except Exception as e:
+                self._count('refresh_errors')
+                logger.warning(f"Background refresh of {key} failed: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        self._executor.submit(refresh)
+
+    def _meta(self, key: str, entry: CacheEntry, status: Optional[str] = None) -> Dict:
+        return {
+            'key': key,
+            'status': status or entry.state(time.time()) or 'expired',
+            'stored_at': entry.stored_at,
+            'negative': entry.negative,
+        }
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and tier sizes"""
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = round((lookups - stats['misses']) / lookups, 3) if lookups else 0.0
+        stats['memory_entries'] = len(self.memory)
+        stats['memory_bytes'] = self.memory.size
+        stats['evictions'] = self.memory.evictions
+        return stats
+
+
+_default_cache: Optional[ResultCache] = None
+_default_lock = threading.Lock()
+
+
+def get_result_cache() -> ResultCache:
+    """Return the process-wide result cache, creating it on first use"""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ResultCache()
+        return _default_cache
@@ -7,28 +7,60 @@ import requests
 from bs4 import BeautifulSoup
 import json
 import re
+import threading
 import time
+from types import SimpleNamespace
 from urllib.parse import quote, urljoin
 
-# Undetected Chrome imports (best for anti-bot bypass)
-try:
-    import undetected_chromedriver as uc
-    UNDETECTED_AVAILABLE = True
-except ImportError:
-    UNDETECTED_AVAILABLE = False
+from .admission import Overloaded, get_bulkhead
+from .cache import make_key
+from .politeness import get_scheduler
+from .product_index import record_products
+from .singleflight import create_flights
 
-# Regular Selenium imports as fallback
-try:
-    from selenium import webdriver
-    from selenium.webdriver.chrome.service import Service
-    from selenium.webdriver.chrome.options import Options
-    from selenium.webdriver.common.by import By
-    from selenium.webdriver.support.ui import WebDriverWait
-    from selenium.webdriver.support import expected_conditions as EC
-    from webdriver_manager.chrome import ChromeDriverManager
-    SELENIUM_AVAILABLE = True
-except ImportError:
-    SELENIUM_AVAILABLE = False
+# Browser automation libraries are slow to import and heavy, and most processes
+# (Jeevee-only workers, management commands) never start a browser. They are
+# imported the first time a driver is needed; see _browser_libs().
+_browser = None
+_browser_lock = threading.Lock()
+
+
+def _browser_libs():
+    """Import undetected-chromedriver / Selenium on first use and return them."""
+    global _browser
+    with _browser_lock:
+        if _browser is not None:
+            return _browser
+        libs = SimpleNamespace(UNDETECTED_AVAILABLE=False, SELENIUM_AVAILABLE=False)
+        
+        # Undetected Chrome (best for anti-bot bypass)
+        try:
+            import undetected_chromedriver as uc
+            libs.uc = uc
+            libs.UNDETECTED_AVAILABLE = True
+        except ImportError:
+            pass
+        
+        # Regular Selenium as fallback
+        try:
+            from selenium import webdriver
+            from selenium.webdriver.chrome.service import Service
+            from selenium.webdriver.chrome.options import Options
+            from webdriver_manager.chrome import ChromeDriverManager
+            libs.webdriver = webdriver
+            libs.Service = Service
+            libs.Options = Options
+            libs.ChromeDriverManager = ChromeDriverManager
+            libs.SELENIUM_AVAILABLE = True
+        except ImportError:
+            pass
+        
+        _browser = libs
+        return libs
+
+
+# Concurrent identical searches share one browser session
+_search_flights = create_flights()
 
 
 class DarazScraper:
@@ -65,10 +97,12 @@ class DarazScraper:
         if self.driver is not None:
             return self.driver
         
+        libs = _browser_libs()
+        
         # Try undetected-chromedriver first (best for anti-bot)
-        if UNDETECTED_AVAILABLE:
+        if libs.UNDETECTED_AVAILABLE:
             try:
-                options = uc.ChromeOptions()
+                options = libs.uc.ChromeOptions()
                 # Note: headless mode often gets detected by anti-bot
                 # Using headless=new with extra stealth settings
                 options.add_argument('--headless=new')
@@ -81,7 +115,7 @@ class DarazScraper:
                 options.add_argument('--disable-blink-features=AutomationControlled')
                 options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
                 
-                self.driver = uc.Chrome(options=options, use_subprocess=True)
+                self.driver = libs.uc.Chrome(options=options, use_subprocess=True)
                 # Set page load timeout
                 self.driver.set_page_load_timeout(45)
                 self.driver.implicitly_wait(10)
@@ -92,8 +126,8 @@ class DarazScraper:
                 # Continue to regular Selenium instead of trying non-headless
         
         # Fallback to regular Selenium
-        if SELENIUM_AVAILABLE:
-            options = Options()
+        if libs.SELENIUM_AVAILABLE:
+            options = libs.Options()
             options.add_argument('--headless=new')
             options.add_argument('--no-sandbox')
             options.add_argument('--disable-dev-shm-usage')
@@ -106,8 +140,8 @@ class DarazScraper:
             options.add_argument('--log-level=3')
             
             try:
-                service = Service(ChromeDriverManager().install())
-                self.driver = webdriver.Chrome(service=service, options=options)
+                service = libs.Service(libs.ChromeDriverManager().install())
+                self.driver = libs.webdriver.Chrome(service=service, options=options)
                 self.driver.set_page_load_timeout(30)
                 self.driver.implicitly_wait(10)
                 
@@ -133,14 +167,22 @@ class DarazScraper:
             finally:
                 self.driver = None
     
+    def close(self):
+        """Close the browser and HTTP session. The scraper can be reused afterwards."""
+        self._close_driver()
+        self.session.close()
+    
     def __del__(self):
-        """Cleanup driver on object destruction."""
+        """Last-resort cleanup; prefer close() or the pooled scrapers in scraper.runtime."""
         self._close_driver()
     
     def search(self, query, page=1, limit=40, sort='popularity'):
         """
         Search for products on Daraz using Selenium.
         
+        Concurrent calls with the same region, query, page, limit and sort
+        are coalesced into a single scrape.
+        
         Args:
             query: Search term
             page: Page number (1-indexed)
@@ -148,8 +190,14 @@ class DarazScraper:
             sort: Sort order - 'popularity', 'price_low', 'price_high', 'newest'
         
         Returns:
-            dict with products list and metadata
+            dict with products list and metadata (also added to the local
+            product index)
         """
+        key = make_key(f'daraz-{self.region}', query, page=page, limit=limit, sort=sort)
+        return _search_flights.do(key, lambda: record_products(self._search(query, page, limit, sort)))
+    
+    def _search(self, query, page=1, limit=40, sort='popularity'):
+        """Run the actual search (see search)."""
         sort_map = {
             'popularity': 'popularity',
             'price_low': 'priceasc',
@@ -158,7 +206,13 @@ class DarazScraper:
         }
         
         # Try Selenium method first (bypasses anti-bot)
-        products = self._fetch_via_selenium(query, page, sort_map.get(sort, 'popularity'))
+        try:
+            with get_bulkhead('daraz-browser').slot():
+                products = self._fetch_via_selenium(query, page, sort_map.get(sort, 'popularity'))
+        except Overloaded as e:
+            # Browser sessions are saturated, go straight to the HTTP fallback
+            print(f"[Daraz] {e}")
+            products = []
         
         if products:
             return {
@@ -172,8 +226,9 @@ class DarazScraper:
                 'region': self.region,
             }
         
-        # Fallback to requests (may be blocked)
-        result = self._fetch_via_requests(query, page, sort_map.get(sort, 'popularity'), limit)
+        # Fallback to requests (may be blocked); raises Overloaded if that is saturated too
+        with get_bulkhead('daraz-http').slot():
+            result = self._fetch_via_requests(query, page, sort_map.get(sort, 'popularity'), limit)
         
         # If anti-bot detected, return empty but graceful response
         if result.get('error') == 'Anti-bot protection detected':
@@ -194,11 +249,13 @@ class DarazScraper:
     def _fetch_via_selenium(self, query, page=1, sort='popularity'):
         """Fetch products using Selenium to bypass anti-bot."""
         products = []
+        url = f"{self.base_url}/catalog/?q={quote(query)}&page={page}&sort={sort}"
+        scheduler = get_scheduler()
+        scheduler.throttle(url)
         
         try:
             driver = self._init_driver()
             
-            url = f"{self.base_url}/catalog/?q={quote(query)}&page={page}&sort={sort}"
             print(f"[Daraz] Fetching: {url}")
             
             try:
@@ -223,7 +280,7 @@ class DarazScraper:
             found = False
             for selector in selectors:
                 try:
-                    elements = driver.find_elements(By.CSS_SELECTOR, selector)
+                    elements = driver.find_elements('css selector', selector)  # By.CSS_SELECTOR
                     if elements:
                         print(f"[Daraz] Found {len(elements)} items with selector: {selector}")
                         found = True
@@ -245,6 +302,8 @@ class DarazScraper:
             
             # Get page source
             html = driver.page_source
+            blocked = self._is_blocked(html)
+            scheduler.report(url, status=None if blocked else 200, blocked=blocked)
             
             # Try to extract from embedded JSON first
             products = self._extract_from_page_data(html)
@@ -264,16 +323,20 @@ class DarazScraper:
     def _fetch_via_requests(self, query, page=1, sort='popularity', limit=40):
         """Fallback: Fetch products using requests."""
         products = []
+        url = f"{self.base_url}/catalog/?q={quote(query)}&page={page}&sort={sort}"
+        scheduler = get_scheduler()
+        scheduler.throttle(url)
         
         try:
-            url = f"{self.base_url}/catalog/?q={quote(query)}&page={page}&sort={sort}"
             response = self.session.get(url, timeout=15)
+            blocked = response.status_code == 200 and self._is_blocked(response.text)
+            scheduler.report(url, status=response.status_code, blocked=blocked)
             
             if response.status_code == 200:
                 html = response.text
                 
                 # Check for anti-bot
-                if 'x5secdata' in html or 'captcha' in html.lower():
+                if blocked:
                     print("[Daraz] Anti-bot detected in requests fallback")
                     return {
                         'success': False,
@@ -301,6 +364,10 @@ class DarazScraper:
             'region': self.region,
         }
     
+    def _is_blocked(self, html):
+        """Whether Daraz served its anti-bot / captcha page instead of results."""
+        return 'x5secdata' in html or 'captcha' in html.lower()
+    
     def _extract_from_page_data(self, html):
         """Extract product data from embedded JavaScript."""
         products = []
@@ -506,11 +573,13 @@ class DarazScraper:
             product_url = f"{self.base_url}/products/{product_url}"
         
         try:
-            driver = self._init_driver()
-            driver.get(product_url)
-            time.sleep(2)
+            with get_bulkhead('daraz-browser').slot():
+                get_scheduler().throttle(product_url)
+                driver = self._init_driver()
+                driver.get(product_url)
+                time.sleep(2)
+                html = driver.page_source
             
-            html = driver.page_source
             soup = BeautifulSoup(html, 'html.parser')
             
             # Try JSON-LD first
@@ -524,6 +593,8 @@ class DarazScraper:
             
             return self._parse_product_html(soup, product_url)
             
+        except Overloaded:
+            raise
         except Exception as e:
             return {'error': str(e), 'url': product_url}
     
@@ -555,16 +626,11 @@ class DarazScraper:
             'url': url,
             'source': 'Daraz',
         }
-    
-    def __del__(self):
-        """Cleanup WebDriver on deletion."""
-        self._close_driver()
 
 
 # Convenience function
-def search_daraz(query, region='np', page=1, limit=40):
-    """Quick search function."""
-    scraper = DarazScraper(region=region)
-    result = scraper.search(query, page=page, limit=limit)
-    scraper._close_driver()
-    return result
+def search_daraz(query, region='np', page=1, limit=40, sort='popularity'):
+    """Quick search function, using a pooled scraper from the shared runtime."""
+    from .runtime import get_runtime
+    with get_runtime().daraz(region) as scraper:
+        return scraper.search(query, page=page, limit=limit, sort=sort)
@@ -0,0 +1,263 @@
+"""
+Result Faceting
+Filters a merged product list (get_lowest_prices runs it over every product
+the sources returned, before picking the top `limit`) by price and discount
+ranges and by source and brand, and summarizes it: per-source
+and per-brand counts, price/rating/discount ranges and a price histogram. The
+product fields are parsed once into columns, and every filter and count
+then runs over those columns (vectorized with NumPy when it is installed;
+plain Python otherwise, with the same results).
+
+Source and brand counts are disjunctive: each ignores its own filter, so
+the client can show how many products every other choice would give.
+
+    query = parse_facet_query({'min_price': '500', 'source': 'jeevee', 'facets': '1'})
+    data = comparer.get_lowest_prices('face wash', limit=20, facet_query=query)
+    data['products'], data['matched'], data['facets']['source']
+"""
+
+import math
+from typing import Dict, List, Optional, Sequence
+
+from .price_compare import parse_discount, parse_price, parse_rating
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+# Range filters: query parameter -> (column, comparison). Ratings are
+# already filtered upstream by min_rating (see Source.run).
+RANGE_FILTERS = {
+    'min_price': ('price', '>='),
+    'max_price': ('price', '<='),
+    'min_discount': ('discount', '>='),
+}
+DEFAULT_BINS = 10
+MAX_BINS = 50
+# Brands listed in facets['brand'], most common first
+BRAND_FACET_LIMIT = 20
+
+
+class FacetQuery:
+    """Filters and options parsed from request parameters"""
+
+    def __init__(self, ranges: Dict[str, float], sources: Sequence[str] = (),
+                 brands: Sequence[str] = (), facets: bool = False, bins: int = DEFAULT_BINS):
+        self.ranges = ranges  # RANGE_FILTERS key -> bound
+        self.sources = tuple(sources)  # lower-case
+        self.brands = tuple(brands)  # lower-case
+        self.facets = facets
+        self.bins = bins
+
+
+def _split(value) -> List[str]:
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(',')
+    return [str(v).strip().lower() for v in value if str(v).strip()]
+
+
+def parse_facet_query(params) -> Optional[FacetQuery]:
+    """
+    FacetQuery from request parameters (a QueryDict or JSON body): range
+    filters (min_price, max_price, min_discount), source and
+    brand (comma-separated), facets (true to add the summary) and bins.
+
+    Returns:
+        None when none of them were sent
+
+    Raises:
+        ValueError: a bound or bins is not a number
+    """
+    ranges = {}
+    for name in RANGE_FILTERS:
+        value = params.get(name)
+        if value in (None, ''):
+            continue
+        try:
+            ranges[name] = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f'{name} must be a number')
+
+    facets = str(params.get('facets', '')).lower() in ('1', 'true', 'yes')
+    sources, brands = _split(params.get('source')), _split(params.get('brand'))
+    if not (ranges or sources or brands or facets):
+        return None
+    try:
+        bins = min(MAX_BINS, max(1, int(params.get('bins') or DEFAULT_BINS)))
+    except (TypeError, ValueError):
+        raise ValueError('bins must be an integer')
+    return FacetQuery(ranges, sources, brands, facets, bins)
+
+
+class _Columns:
+    """Parsed numeric fields (NaN when missing) and coded source/brand of a product list"""
+
+    def __init__(self, products: List[Dict]):
+        self.price = [_number(parse_price(p.get('price'))) for p in products]
+        self.rating = [_number(parse_rating(p.get('rating'))) for p in products]
+        self.discount = [_number(parse_discount(p.get('discount'))) for p in products]
+        self.source_labels: List[str] = []
+        self.brand_labels: List[str] = []
+        self.source = _codes((p.get('source') for p in products), self.source_labels)
+        self.brand = _codes((p.get('brand') for p in products), self.brand_labels)
+
+
+def _number(value) -> float:
+    return math.nan if value is None else value
+
+
+def _codes(values, labels: List[str]) -> List[int]:
+    """Integer code per value (-1 when empty), grouping case-insensitively; fills labels"""
+    index: Dict[str, int] = {}
+    codes = []
+    for value in values:
+        value = str(value or '').strip()
+        if not value:
+            codes.append(-1)
+            continue
+        code = index.get(value.lower())
+        if code is None:
+            code = index[value.lower()] = len(labels)
+            labels.append(value)
+        codes.append(code)
+    return codes
+
+
+def _wanted(labels: List[str], wanted: Sequence[str]) -> List[int]:
+    return [code for code, label in enumerate(labels) if label.lower() in wanted]
+
+
+def _edges(low: float, high: float, bins: int) -> List[float]:
+    # np.histogram's equal-width bins, widened when every value is the same
+    if low == high:
+        low, high = low - 0.5, high + 0.5
+    return [low + (high - low) * i / bins for i in range(bins + 1)]
+
+
+def _facet_numpy(columns: _Columns, query: FacetQuery):
+    numeric = np.ones(len(columns.price), dtype=bool)
+    for name, bound in query.ranges.items():
+        column, op = RANGE_FILTERS[name]
+        values = np.asarray(getattr(columns, column), dtype=np.float64)
+        # NaN compares False, so products missing a filtered field drop out
+        numeric &= values >= bound if op == '>=' else values <= bound
+
+    source = np.asarray(columns.source, dtype=np.int64)
+    brand = np.asarray(columns.brand, dtype=np.int64)
+    everything = np.ones_like(numeric)
+    source_ok = np.isin(source, _wanted(columns.source_labels, query.sources)) if query.sources else everything
+    brand_ok = np.isin(brand, _wanted(columns.brand_labels, query.brands)) if query.brands else everything
+    matched = numeric & source_ok & brand_ok
+    indexes = np.flatnonzero(matched).tolist()
+    if not query.facets:
+        return indexes, None
+
+    source_counts = np.bincount(source[numeric & brand_ok & (source >= 0)], minlength=len(columns.source_labels))
+    brand_counts = np.bincount(brand[numeric & source_ok & (brand >= 0)], minlength=len(columns.brand_labels))
+    ranges = {}
+    for column in ('price', 'rating', 'discount'):
+        values = np.asarray(getattr(columns, column), dtype=np.float64)[matched]
+        ranges[column] = values[~np.isnan(values)]
+    histogram = None
+    if len(ranges['price']):
+        edges = _edges(float(ranges['price'].min()), float(ranges['price'].max()), query.bins)
+        counts, _ = np.histogram(ranges['price'], bins=edges)
+        histogram = (edges, counts.tolist())
+    return indexes, (
+        source_counts.tolist(),
+        brand_counts.tolist(),
+        {column: (float(v.min()), float(v.max())) if len(v) else None for column, v in ranges.items()},
+        histogram,
+    )
+
+
+def _facet_python(columns: _Columns, query: FacetQuery):
+    numeric = [True] * len(columns.price)
+    for name, bound in query.ranges.items():
+        column, op = RANGE_FILTERS[name]
+        values = getattr(columns, column)
+        # NaN compares False, so products missing a filtered field drop out
+        if op == '>=':
+            numeric = [ok and v >= bound for ok, v in zip(numeric, values)]
+        else:
+            numeric = [ok and v <= bound for ok, v in zip(numeric, values)]
+
+    sources = set(_wanted(columns.source_labels, query.sources))
+    brands = set(_wanted(columns.brand_labels, query.brands))
+    source_ok = [not query.sources or code in sources for code in columns.source]
+    brand_ok = [not query.brands or code in brands for code in columns.brand]
+    matched = [n and s and b for n, s, b in zip(numeric, source_ok, brand_ok)]
+    indexes = [i for i, ok in enumerate(matched) if ok]
+    if not query.facets:
+        return indexes, None
+
+    source_counts = [0] * len(columns.source_labels)
+    brand_counts = [0] * len(columns.brand_labels)
+    for i, ok in enumerate(numeric):
+        if ok and brand_ok[i] and columns.source[i] >= 0:
+            source_counts[columns.source[i]] += 1
+        if ok and source_ok[i] and columns.brand[i] >= 0:
+            brand_counts[columns.brand[i]] += 1
+    ranges = {}
+    for column in ('price', 'rating', 'discount'):
+        values = getattr(columns, column)
+        ranges[column] = [values[i] for i in indexes if not math.isnan(values[i])]
+    histogram = None
+    if ranges['price']:
+        edges = _edges(min(ranges['price']), max(ranges['price']), query.bins)
+        counts = [0] * query.bins
+        low, high = edges[0], edges[-1]
+        for value in ranges['price']:
+            # Last bin includes its right edge, as in np.histogram
+            counts[min(query.bins - 1, int((value - low) / (high - low) * query.bins))] += 1
+        histogram = (edges, counts)
+    return indexes, (
+        source_counts,
+        brand_counts,
+        {column: (min(v), max(v)) if v else None for column, v in ranges.items()},
+        histogram,
+    )
+
+
+def facet_products(products: List[Dict], query: FacetQuery) -> Dict:
+    """
+    Filter products and, if query.facets, summarize the result.
+
+    Args:
+        products: Product dicts (not modified)
+        query: From parse_facet_query
+
+    Returns:
+        {'products': matching products in their original order, 'matched':
+        their count, 'facets': summary or None}. The summary has 'source'
+        and 'brand' ({label: count}, brands most common first, at most
+        BRAND_FACET_LIMIT), 'price', 'rating' and 'discount' ({'min',
+        'max'} or None) and 'price_histogram' ({'edges', 'counts'} or None).
+    """
+    columns = _Columns(products)
+    run = _facet_numpy if NUMPY_AVAILABLE else _facet_python
+    indexes, summary = run(columns, query)
+    result = {'products': [products[i] for i in indexes], 'matched': len(indexes), 'facets': None}
+    if summary is None:
+        return result
+
+    source_counts, brand_counts, ranges, histogram = summary
+    brands = sorted(
+        ((label, count) for label, count in zip(columns.brand_labels, brand_counts) if count),
+        key=lambda item: -item[1],
+    )[:BRAND_FACET_LIMIT]
+    result['facets'] = {
+        'source': {label.lower(): count for label, count in zip(columns.source_labels, source_counts)},
+        'brand': dict(brands),
+        **{column: None if r is None else {'min': r[0], 'max': r[1]} for column, r in ranges.items()},
+        'price_histogram': None if histogram is None else {
+            'edges': [round(edge, 2) for edge in histogram[0]],
+            'counts': histogram[1],
+        },
+    }
+    return result
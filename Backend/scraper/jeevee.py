@@ -8,8 +8,17 @@ import logging
 from typing import Dict, List, Optional
 from urllib.parse import quote
 
+from .admission import get_bulkhead
+from .cache import make_key
+from .politeness import get_scheduler
+from .product_index import record_products
+from .singleflight import create_flights
+
 logger = logging.getLogger(__name__)
 
+# Concurrent identical searches share one API call
+_search_flights = create_flights()
+
 
 class JeeveeScraper:
     """Scraper for Jeevee.com - Nepal's health and lifestyle e-commerce platform"""
@@ -39,13 +48,20 @@ class JeeveeScraper:
             limit: Number of results per page (default 20)
             
         Returns:
-            Dictionary with products and metadata
+            Dictionary with products and metadata (also added to the local
+            product index)
         """
+        key = make_key('jeevee', query, page=page, limit=limit)
+        return _search_flights.do(key, lambda: record_products(self._search(query, page, limit)))
+    
+    def _search(self, query: str, page: int = 1, limit: int = 20) -> Dict:
+        """Run the actual search request (see search)"""
         try:
             encoded_query = quote(query)
             url = f"{self.BASE_URL}/products?search={encoded_query}&page={page}&limit={limit}"
             
-            response = self.session.get(url, timeout=30)
+            with get_bulkhead('jeevee').slot():
+                response = self._get(url)
             response.raise_for_status()
             
             data = response.json()
@@ -72,6 +88,18 @@ class JeeveeScraper:
                 'source': 'jeevee'
             }
     
+    def close(self):
+        """Close the HTTP session"""
+        self.session.close()
+    
+    def _get(self, url: str) -> requests.Response:
+        """GET paced by the outbound scheduler, reporting the status back to it"""
+        scheduler = get_scheduler()
+        scheduler.throttle(url)
+        response = self.session.get(url, timeout=30)
+        scheduler.report(url, status=response.status_code)
+        return response
+    
     def get_products(self, category: Optional[str] = None, page: int = 1, limit: int = 20) -> Dict:
         """
         Get products from Jeevee (optionally filtered by category)
@@ -89,20 +117,21 @@ class JeeveeScraper:
             if category:
                 url += f"&category={category}"
             
-            response = self.session.get(url, timeout=30)
+            with get_bulkhead('jeevee').slot():
+                response = self._get(url)
             response.raise_for_status()
             
             data = response.json()
             products = self._parse_products(data.get('data', []))
             
-            return {
+            return record_products({
                 'success': True,
                 'products': products,
                 'total': data.get('total_results', 0),
                 'page': data.get('page', page),
                 'total_pages': data.get('total_pages', 1),
                 'source': 'jeevee'
-            }
+            })
             
         except requests.RequestException as e:
             logger.error(f"Jeevee get_products error: {e}")
@@ -213,7 +242,8 @@ class JeeveeScraper:
         """Get available categories from Jeevee"""
         try:
             url = f"{self.BASE_URL}/categories"
-            response = self.session.get(url, timeout=30)
+            with get_bulkhead('jeevee').slot():
+                response = self._get(url)
             response.raise_for_status()
             
             data = response.json()
@@ -245,8 +275,8 @@ def search_jeevee(query: str, page: int = 1, limit: int = 20) -> Dict:
     Returns:
         Dictionary with products and metadata
     """
-    scraper = JeeveeScraper()
-    return scraper.search(query, page, limit)
+    from .runtime import get_runtime
+    return get_runtime().jeevee().search(query, page, limit)
 
 
 if __name__ == "__main__":
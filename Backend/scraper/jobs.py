@@ -0,0 +1,440 @@
+"""
+Durable Job Queue
+SQLite-backed queue for scrapes and comparisons that take longer than an HTTP
+request should: multi-page Daraz searches, product detail batches and the
+multi-site shoe search.
+
+The web process only submits jobs and reads their status. Separate worker
+processes (`python manage.py run_jobs`) claim jobs under a lease, so a job
+whose worker dies is picked up again once the lease expires. Failed jobs are
+retried with backoff (except for invalid params, which raise InvalidJobParams
+and fail at once), and finished results are kept for a limited time.
+
+    queue = get_job_queue()
+    job = queue.submit('daraz_pages', {'query': 'shoes', 'pages': 5})
+    queue.get(job['id'])  # {'status': 'queued' | 'running' | 'done' | 'failed', ...}
+"""
+
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from . import storage
+from .admission import Overloaded
+from .politeness import background
+from .price_compare import SORT_KEYS, parse_min_rating
+from .runtime import get_runtime
+
+logger = logging.getLogger(__name__)
+
+# Seconds a finished job's result is kept
+DEFAULT_RESULT_TTL = 24 * 3600
+# Seconds a worker may hold a job without a heartbeat
+DEFAULT_LEASE_TTL = 300.0
+
+JOB_STATUSES = ('queued', 'running', 'done', 'failed')
+
+
+class InvalidJobParams(ValueError):
+    """A job's params are invalid; the job fails the same way on every attempt, so it isn't retried"""
+
+
+def _required(params: Dict, name: str):
+    if not params.get(name):
+        raise InvalidJobParams(f'params.{name} is required')
+    return params[name]
+
+
+def run_daraz_pages(params: Dict) -> Dict:
+    """Search several Daraz result pages and merge them"""
+    query = _required(params, 'query')
+    try:
+        pages = max(1, min(int(params.get('pages', 3)), 20))
+    except (TypeError, ValueError):
+        raise InvalidJobParams('pages must be an integer')
+    products, errors = [], []
+    with get_runtime().daraz(params.get('region', 'np')) as scraper:
+        for page in range(1, pages + 1):
+            result = scraper.search(query, page=page, sort=params.get('sort', 'popularity'))
+            if result.get('error'):
+                errors.append({'page': page, 'error': result['error']})
+            if not result.get('products'):
+                break
+            products.extend(result['products'])
+    return {'query': query, 'pages': pages, 'products': products, 'count': len(products), 'errors': errors}
+
+
+def run_daraz_details(params: Dict) -> Dict:
+    """Fetch product details for a list of Daraz product URLs"""
+    urls = _required(params, 'urls')
+    if not isinstance(urls, list):
+        raise InvalidJobParams('urls must be a list')
+    urls = urls[:100]
+    with get_runtime().daraz(params.get('region', 'np')) as scraper:
+        details = [scraper.get_product_details(url) for url in urls]
+    return {'products': details, 'count': len(details)}
+
+
+def run_search_shoes(params: Dict) -> Dict:
+    return get_runtime().webscraper().search_shoes(_required(params, 'query'), params.get('site', 'all'))
+
+
+def comparison_params(params: Dict, sort: bool = False) -> Dict:
+    """
+    Validate compare/lowest_prices params with the same rules and defaults
+    as the comparison endpoints: a query, limit 20, min_rating 4.0 (0 turns
+    the filter off), sort price_asc and one of SORT_KEYS.
+
+    Returns:
+        params with limit an int, min_rating a float (0.0 for no filter)
+        and, if sort is set, sort
+
+    Raises:
+        InvalidJobParams: missing query or invalid limit, min_rating or sort
+    """
+    params = dict(params)
+    _required(params, 'query')
+    try:
+        params['limit'] = int(params.get('limit', 20))
+    except (TypeError, ValueError):
+        raise InvalidJobParams('limit must be an integer')
+    try:
+        params['min_rating'] = parse_min_rating(params.get('min_rating')) or 0.0
+    except ValueError as e:
+        raise InvalidJobParams(str(e))
+    if sort:
+        params['sort'] = params.get('sort', 'price_asc')
+        if params['sort'] not in SORT_KEYS:
+            raise InvalidJobParams(f"sort must be one of: {', '.join(SORT_KEYS)}")
+    return params
+
+
+def run_compare(params: Dict) -> Dict:
+    params = comparison_params(params)
+    return get_runtime().comparer().search_all(
+        params['query'], limit=params['limit'], min_rating=parse_min_rating(params['min_rating']),
+    )
+
+
+def run_lowest_prices(params: Dict) -> Dict:
+    params = comparison_params(params, sort=True)
+    return get_runtime().comparer().get_lowest_prices(
+        params['query'], limit=params['limit'], min_rating=parse_min_rating(params['min_rating']),
+        sort=params['sort'],
+    )
+
+
+# Job kind -> handler(params) -> JSON-serializable result
+JOB_HANDLERS: Dict[str, Callable[[Dict], Dict]] = {
+    'daraz_pages': run_daraz_pages,
+    'daraz_details': run_daraz_details,
+    'search_shoes': run_search_shoes,
+    'compare': run_compare,
+    'lowest_prices': run_lowest_prices,
+}
+
+
+class JobQueue:
+    """
+    Job table shared by web and worker processes.
+
+    Args:
+        path: SQLite file holding the jobs
+        result_ttl: Seconds finished jobs (and their results) are kept
+        retry_delay: Base delay before a failed job is retried; doubles per attempt
+    """
+
+    def __init__(self, path=None, result_ttl: float = DEFAULT_RESULT_TTL, retry_delay: float = 10.0):
+        self.path = path or storage.data_path('jobs.sqlite3')
+        self.result_ttl = result_ttl
+        self.retry_delay = retry_delay
+        self._lock = threading.Lock()
+        self._conn = storage.connect(self.path)
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                params TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL,
+                available_at REAL NOT NULL,
+                lease_owner TEXT,
+                lease_expires REAL,
+                result BLOB,
+                error TEXT,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL,
+                expires_at REAL
+            )
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, available_at)')
+        self._conn.commit()
+
+    def submit(self, kind: str, params: Dict, max_attempts: int = 3) -> Dict:
+        """
+        Queue a job.
+
+        Raises:
+            ValueError: unknown job kind
+        """
+        if kind not in JOB_HANDLERS:
+            raise ValueError(f"Unknown job kind '{kind}'. Use one of: {', '.join(JOB_HANDLERS)}")
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT INTO jobs (id, kind, params, status, max_attempts, available_at, created_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (job_id, kind, json.dumps(params), 'queued', max_attempts, now, now),
+            )
+            self._conn.commit()
+        return self.get(job_id)
+
+    def get(self, job_id: str, with_result: bool = False) -> Optional[Dict]:
+        """Job status (and result if asked), or None if unknown or expired"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT id, kind, params, status, attempts, max_attempts, error, created_at, '
+                'started_at, finished_at, expires_at, result FROM jobs WHERE id = ?',
+                (job_id,),
+            ).fetchone()
+        if row is None or (row[10] is not None and row[10] < time.time()):
+            return None
+        job = {
+            'id': row[0],
+            'kind': row[1],
+            'params': json.loads(row[2]),
+            'status': row[3],
+            'attempts': row[4],
+            'max_attempts': row[5],
+            'error': row[6],
+            'created_at': row[7],
+            'started_at': row[8],
+            'finished_at': row[9],
+            'expires_at': row[10],
+        }
+        if with_result:
+            job['result'] = json.loads(row[11]) if row[11] is not None else None
+        return job
+
+    def claim(self, owner: str, lease_ttl: float = DEFAULT_LEASE_TTL) -> Optional[Dict]:
+        """
+        Lease the next ready job: a queued job that is due, or a running job
+        whose worker stopped heartbeating.
+
+        Returns:
+            {'id', 'kind', 'params', 'attempts'} or None if nothing is ready
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._conn
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                row = conn.execute(
+                    "SELECT id, kind, params, attempts FROM jobs "
+                    "WHERE (status = 'queued' AND available_at <= ?) "
+                    "OR (status = 'running' AND lease_expires < ? AND attempts < max_attempts) "
+                    "ORDER BY available_at LIMIT 1",
+                    (now, now),
+                ).fetchone()
+                if row is None:
+                    conn.execute('COMMIT')
+                    return None
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', attempts = attempts + 1, lease_owner = ?, "
+                    "lease_expires = ?, started_at = ? WHERE id = ?",
+                    (owner, now + lease_ttl, now, row[0]),
+                )
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        return {'id': row[0], 'kind': row[1], 'params': json.loads(row[2]), 'attempts': row[3] + 1}
+
+    def heartbeat(self, job_id: str, owner: str, lease_ttl: float = DEFAULT_LEASE_TTL) -> bool:
+        """Extend the lease, returns False if the job is no longer ours"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET lease_expires = ? WHERE id = ? AND lease_owner = ? AND status = 'running'",
+                (time.time() + lease_ttl, job_id, owner),
+            )
+            self._conn.commit()
+        return cursor.rowcount == 1
+
+    def complete(self, job_id: str, owner: str, result) -> bool:
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = 'done', result = ?, error = NULL, finished_at = ?, "
+                "expires_at = ?, lease_owner = NULL WHERE id = ? AND lease_owner = ?",
+                (json.dumps(result, default=str), now, now + self.result_ttl, job_id, owner),
+            )
+            self._conn.commit()
+        return cursor.rowcount == 1
+
+    def fail(self, job_id: str, owner: str, error: str, retry_after: Optional[float] = None,
+             retry: bool = True) -> bool:
+        """
+        Record a failed attempt; the job is retried with backoff until
+        max_attempts, or failed at once if retry is False
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._conn
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                row = conn.execute(
+                    'SELECT attempts, max_attempts FROM jobs WHERE id = ? AND lease_owner = ?',
+                    (job_id, owner),
+                ).fetchone()
+                if row is None:
+                    conn.execute('COMMIT')
+                    return False
+                attempts, max_attempts = row
+                if retry and attempts < max_attempts:
+                    delay = max(retry_after or 0, self.retry_delay * 2 ** (attempts - 1))
+                    conn.execute(
+                        "UPDATE jobs SET status = 'queued', error = ?, available_at = ?, "
+                        "lease_owner = NULL, lease_expires = NULL WHERE id = ?",
+                        (error, now + delay, job_id),
+                    )
+                else:
+                    conn.execute(
+                        "UPDATE jobs SET status = 'failed', error = ?, finished_at = ?, expires_at = ?, "
+                        "lease_owner = NULL WHERE id = ?",
+                        (error, now, now + self.result_ttl, job_id),
+                    )
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        return True
+
+    def purge_expired(self) -> int:
+        """
+        Delete finished jobs past their result TTL and fail abandoned jobs
+        that are out of attempts. Returns rows removed.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'failed', error = COALESCE(error, 'Worker lost'), "
+                "finished_at = ?, expires_at = ?, lease_owner = NULL "
+                "WHERE status = 'running' AND lease_expires < ? AND attempts >= max_attempts",
+                (now, now + self.result_ttl, now),
+            )
+            cursor = self._conn.execute('DELETE FROM jobs WHERE expires_at < ?', (now,))
+            self._conn.commit()
+        return cursor.rowcount
+
+    def stats(self) -> Dict:
+        """Job counts per status"""
+        with self._lock:
+            rows = self._conn.execute('SELECT status, COUNT(*) FROM jobs GROUP BY status').fetchall()
+        counts = dict.fromkeys(JOB_STATUSES, 0)
+        counts.update(dict(rows))
+        return counts
+
+
+class JobWorker:
+    """
+    Claims and runs jobs until stopped.
+
+    Args:
+        queue: Job queue to process
+        concurrency: Jobs run at once by this worker
+        poll_interval: Seconds to sleep when no job is ready
+        lease_ttl: Lease length; renewed every lease_ttl / 3 while a job runs
+    """
+
+    def __init__(self, queue: Optional['JobQueue'] = None, concurrency: int = 1,
+                 poll_interval: float = 1.0, lease_ttl: float = DEFAULT_LEASE_TTL):
+        self.queue = queue or get_job_queue()
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.lease_ttl = lease_ttl
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._stop = threading.Event()
+
+    def run_job(self, job: Dict):
+        """Run one claimed job, heartbeating its lease until it finishes"""
+        done = threading.Event()
+
+        def heartbeat():
+            while not done.wait(self.lease_ttl / 3):
+                self.queue.heartbeat(job['id'], self.owner, self.lease_ttl)
+
+        beater = threading.Thread(target=heartbeat, name=f"job-heartbeat-{job['id'][:8]}", daemon=True)
+        beater.start()
+        try:
+            # Jobs are nobody's interactive request; let live traffic go first
+            with background():
+                result = JOB_HANDLERS[job['kind']](job['params'])
+            self.queue.complete(job['id'], self.owner, result)
+            logger.info(f"Job {job['id']} ({job['kind']}) done")
+        except Overloaded as e:
+            self.queue.fail(job['id'], self.owner, str(e), retry_after=e.retry_after)
+        except InvalidJobParams as e:
+            # Bad params fail the same way on every attempt
+            logger.warning(f"Job {job['id']} ({job['kind']}) rejected: {e}")
+            self.queue.fail(job['id'], self.owner, str(e), retry=False)
+        except Exception as e:
+            logger.warning(f"Job {job['id']} ({job['kind']}) failed: {e}")
+            self.queue.fail(job['id'], self.owner, str(e))
+        finally:
+            done.set()
+
+    def run_once(self) -> int:
+        """Claim and run up to `concurrency` ready jobs, returns how many ran"""
+        jobs: List[Dict] = []
+        while len(jobs) < self.concurrency:
+            job = self.queue.claim(self.owner, self.lease_ttl)
+            if job is None:
+                break
+            jobs.append(job)
+        if len(jobs) == 1:
+            self.run_job(jobs[0])
+        elif jobs:
+            with ThreadPoolExecutor(max_workers=len(jobs), thread_name_prefix='job') as pool:
+                list(pool.map(self.run_job, jobs))
+        return len(jobs)
+
+    def run_forever(self):
+        """Process jobs until stop() is called"""
+        purged_at = 0.0
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='job') as pool:
+            running = set()
+            while not self._stop.is_set():
+                running = {future for future in running if not future.done()}
+                job = self.queue.claim(self.owner, self.lease_ttl) if len(running) < self.concurrency else None
+                if job is None:
+                    if time.monotonic() - purged_at > 600:
+                        self.queue.purge_expired()
+                        purged_at = time.monotonic()
+                    self._stop.wait(self.poll_interval)
+                    continue
+                running.add(pool.submit(self.run_job, job))
+
+    def stop(self):
+        self._stop.set()
+
+
+_default_queue: Optional[JobQueue] = None
+_default_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """Return the process-wide job queue handle, creating it on first use"""
+    global _default_queue
+    with _default_lock:
+        if _default_queue is None:
+            _default_queue = JobQueue()
+        return _default_queue
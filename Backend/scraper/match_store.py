@@ -0,0 +1,123 @@
+"""
+Product Match Store
+Persists cross-source product links (e.g. Daraz itemId <-> Jeevee product_id)
+so repeated and overlapping comparisons can reuse earlier matches
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from . import storage
+
+logger = logging.getLogger(__name__)
+
+# Links older than this are ignored and recomputed
+DEFAULT_MAX_AGE = 7 * 24 * 3600
+
+
+def match_confidence(score: float) -> str:
+    """Bucket a 0-1 similarity score into a confidence label"""
+    if score >= 0.85:
+        return 'high'
+    if score >= 0.7:
+        return 'medium'
+    return 'low'
+
+
+class MatchStore:
+    """
+    SQLite-backed store of product links keyed by (source, id) pairs.
+    Each link records the similarity score, a confidence label and when
+    the match was made.
+    """
+
+    def __init__(self, path=None, max_age: float = DEFAULT_MAX_AGE):
+        self.path = path or storage.data_path('matches.sqlite3')
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._conn = storage.connect(self.path)
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS product_matches (
+                source_a TEXT NOT NULL,
+                id_a TEXT NOT NULL,
+                source_b TEXT NOT NULL,
+                id_b TEXT NOT NULL,
+                score REAL NOT NULL,
+                confidence TEXT NOT NULL,
+                matched_at REAL NOT NULL,
+                PRIMARY KEY (source_a, id_a, source_b)
+            )
+        ''')
+        self._conn.execute('''
+            CREATE INDEX IF NOT EXISTS product_matches_b
+            ON product_matches (source_b, id_b)
+        ''')
+        self._conn.commit()
+
+    def get_links(self, source_a: str, ids_a: Iterable[str], source_b: str) -> Dict[str, Tuple[str, float]]:
+        """
+        Look up known links for products of source_a.
+
+        Returns:
+            Dictionary of id_a -> (id_b, score) for links that have not expired
+        """
+        ids_a = [i for i in set(ids_a) if i]
+        if not ids_a:
+            return {}
+
+        cutoff = time.time() - self.max_age
+        placeholders = ','.join('?' * len(ids_a))
+        with self._lock:
+            rows = self._conn.execute(
+                f'''SELECT id_a, id_b, score FROM product_matches
+                    WHERE source_a = ? AND source_b = ? AND matched_at >= ?
+                    AND id_a IN ({placeholders})''',
+                [source_a, source_b, cutoff, *ids_a],
+            ).fetchall()
+        return {id_a: (id_b, score) for id_a, id_b, score in rows}
+
+    def save_links(self, source_a: str, source_b: str, links: List[Tuple[str, str, float]]):
+        """Store (id_a, id_b, score) links, replacing older links for id_a"""
+        if not links:
+            return
+        now = time.time()
+        rows = [
+            (source_a, id_a, source_b, id_b, score, match_confidence(score), now)
+            for id_a, id_b, score in links
+            if id_a and id_b
+        ]
+        try:
+            with self._lock:
+                self._conn.executemany(
+                    'INSERT OR REPLACE INTO product_matches VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    rows,
+                )
+                self._conn.commit()
+        except Exception as e:
+            # A failed write only costs a recomputation next time
+            logger.warning(f"Could not save product matches: {e}")
+
+    def purge_expired(self) -> int:
+        """Delete expired links, returns the number of rows removed"""
+        with self._lock:
+            cursor = self._conn.execute(
+                'DELETE FROM product_matches WHERE matched_at < ?',
+                (time.time() - self.max_age,),
+            )
+            self._conn.commit()
+        return cursor.rowcount
+
+
+_default_store: Optional[MatchStore] = None
+_default_lock = threading.Lock()
+
+
+def get_match_store() -> MatchStore:
+    """Return the process-wide match store, creating it on first use"""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = MatchStore()
+        return _default_store
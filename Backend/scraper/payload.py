@@ -0,0 +1,167 @@
+"""
+Compact Compare Payloads
+PriceComparer.search_all embeds every product up to three times: in its
+source's list, in all_products and in compared_products. These layouts send
+each product once and make the other sections point at it.
+
+- 'full': the search_all result unchanged (default)
+- 'refs': products in a table keyed by product key; source lists,
+  all_products and compared_products hold keys
+- 'columns': products as parallel arrays per field (one row per product)
+  with each row's key in product_keys; the other sections hold row
+  numbers, and compared_products is columnar too
+
+Any layout can also project products to a few fields (sparse fieldsets):
+
+    data = pack_compare(comparer.search_all('face wash'), 'refs', fields=('name', 'price'))
+    first = data['products'][data['all_products'][0]]
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+LAYOUTS = ('full', 'refs', 'columns')
+
+
+def project(products: List[Dict], fields: Optional[Sequence[str]]) -> List[Dict]:
+    """Copies of products with only `fields` (in that order); no fields returns products as is"""
+    if not fields:
+        return products
+    return [{field: product[field] for field in fields if field in product} for product in products]
+
+
+def product_key(product: Dict) -> str:
+    """Stable key for a product: '<source>:<id>', falling back to its URL or name"""
+    source = str(product.get('source') or '').lower()
+    ident = product.get('id') or product.get('url') or product.get('name') or ''
+    return f"{source}:{ident}"
+
+
+class _ProductTable:
+    """Collects distinct products in first-seen order"""
+
+    def __init__(self):
+        self.keys: List[str] = []
+        self.rows: List[Dict] = []
+        self._index: Dict[str, int] = {}
+        self._seen: Dict[int, int] = {}  # id(product) -> row, for the common shared-dict case
+
+    def add(self, product: Optional[Dict]) -> Optional[int]:
+        if product is None:
+            return None
+        row = self._seen.get(id(product))
+        if row is not None:
+            return row
+        base = key = product_key(product)
+        suffix = 1
+        # Two different products can share a key (e.g. no id and the same URL)
+        while key in self._index and self.rows[self._index[key]] != product:
+            suffix += 1
+            key = f"{base}#{suffix}"
+        row = self._index.get(key)
+        if row is None:
+            row = len(self.rows)
+            self._index[key] = row
+            self.keys.append(key)
+            self.rows.append(product)
+        self._seen[id(product)] = row
+        return row
+
+
+def _columnar(records: List[Dict]) -> Dict[str, List]:
+    """Parallel arrays per field; records missing a field get None"""
+    fields: Dict[str, None] = {}
+    for record in records:
+        fields.update(dict.fromkeys(record))
+    return {field: [record.get(field) for record in records] for field in fields}
+
+
+def _project_full(results: Dict, fields: Sequence[str]) -> Dict:
+    """search_all result with every product projected; shared products stay shared"""
+    projected: Dict[int, Dict] = {}
+
+    def one(product):
+        if product is None:
+            return None
+        copy = projected.get(id(product))
+        if copy is None:
+            copy = projected[id(product)] = project([product], fields)[0]
+        return copy
+
+    out = {}
+    for name, value in results.items():
+        if name == 'all_products':
+            value = [one(p) for p in value]
+        elif name == 'compared_products':
+            value = [
+                dict(entry, **{source: one(entry[source]) for source in ('daraz', 'jeevee') if source in entry})
+                for entry in value
+            ]
+        elif isinstance(value, dict) and isinstance(value.get('products'), list):
+            value = dict(value, products=[one(p) for p in value['products']])
+        out[name] = value
+    return out
+
+
+def pack_compare(results: Dict, layout: str = 'full', fields: Optional[Sequence[str]] = None) -> Dict:
+    """
+    Re-shape a PriceComparer.search_all result.
+
+    Args:
+        results: search_all output (not modified)
+        layout: One of LAYOUTS
+        fields: Product fields to keep; None keeps every field. Keys in
+            the refs/columns layouts still come from the full products.
+
+    Returns:
+        The payload in the requested layout, with 'layout' set; 'full'
+        without fields returns results as is
+
+    Raises:
+        ValueError: unknown layout
+    """
+    if layout not in LAYOUTS:
+        raise ValueError(f"layout must be one of: {', '.join(LAYOUTS)}")
+    if layout == 'full':
+        if not fields:
+            return results
+        packed = _project_full(results, fields)
+        packed['layout'] = layout
+        return packed
+
+    table = _ProductTable()
+    if layout == 'refs':
+        def ref(product):
+            row = table.add(product)
+            return None if row is None else table.keys[row]
+    else:
+        ref = table.add
+
+    packed = {}
+    for name, value in results.items():
+        if name in ('all_products', 'compared_products'):
+            continue
+        if isinstance(value, dict) and isinstance(value.get('products'), list):
+            # A source section, e.g. results['daraz']
+            value = dict(value, products=[ref(p) for p in value['products']])
+        packed[name] = value
+
+    packed['all_products'] = [ref(p) for p in results.get('all_products', [])]
+    compared = []
+    for comparison in results.get('compared_products', []):
+        entry = dict(comparison)
+        for source in ('daraz', 'jeevee'):
+            if source in entry:
+                entry[source] = ref(entry[source])
+        compared.append(entry)
+
+    packed['layout'] = layout
+    rows = project(table.rows, fields)
+    if layout == 'refs':
+        packed['compared_products'] = compared
+        packed['products'] = dict(zip(table.keys, rows))
+    else:
+        packed['compared_products'] = _columnar(compared)
+        packed['products'] = _columnar(rows)
+        # Beside the columns, so a product field named 'key' can't clash
+        packed['product_keys'] = table.keys
+    return packed
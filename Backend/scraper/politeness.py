@@ -0,0 +1,286 @@
+"""
+Outbound Politeness Scheduler
+Paces every request we send to a marketplace host, across all threads and
+worker processes, so user searches, the cache warmer and prefetches together
+stay under a per-domain rate instead of tripping anti-bot walls.
+
+Each domain has a token bucket kept in SQLite. Interactive requests reserve
+the next token and sleep until it is due; background requests (warmer,
+prefetch, stale refreshes) only take a token that is free right now and
+leave a reserve for interactive traffic. Rates adapt AIMD-style: a 429 or
+captcha halves the domain's rate and pauses it, successes creep it back up.
+
+    scheduler = get_scheduler()
+    scheduler.throttle(url)
+    response = session.get(url)
+    scheduler.report(url, status=response.status_code)
+
+    with background():
+        ...  # requests made here yield to interactive traffic
+"""
+
+import contextvars
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+from . import storage
+from .admission import Overloaded
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = 'interactive'
+BACKGROUND = 'background'
+
+# Requests per second and burst size per domain (without 'www.')
+DEFAULT_RATES = {
+    'daraz.com.np': {'rate': 0.5, 'burst': 3},
+    'api.jeevee.com': {'rate': 5.0, 'burst': 10},
+}
+DEFAULT_DOMAIN_RATE = {'rate': 1.0, 'burst': 3}
+
+# Longest a caller of each class waits for its turn before giving up
+MAX_WAIT = {INTERACTIVE: 15.0, BACKGROUND: 120.0}
+
+_priority = contextvars.ContextVar('outbound_priority', default=INTERACTIVE)
+
+
+@contextmanager
+def background():
+    """Mark outbound requests made inside the block as background work"""
+    token = _priority.set(BACKGROUND)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> str:
+    return _priority.get()
+
+
+def domain_of(url: str) -> str:
+    """Host of a URL without a leading 'www.'"""
+    host = (urlparse(url).hostname or url).lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+class OutboundScheduler:
+    """
+    Per-domain token buckets shared through SQLite, with priority classes
+    and AIMD rate adaptation.
+
+    Args:
+        path: SQLite file holding the bucket state
+        rates: domain -> {'rate': requests/sec, 'burst': tokens}
+        backoff: Seconds a domain is paused after a 429 or captcha
+        min_rate_ratio: The adapted rate never drops below this share of the
+            configured rate
+        increase_ratio: Share of the configured rate regained per success
+        background_reserve: Tokens background requests leave for interactive ones
+    """
+
+    def __init__(self, path=None, rates: Optional[Dict[str, Dict]] = None,
+                 backoff: float = 30.0, min_rate_ratio: float = 0.1,
+                 increase_ratio: float = 0.05, background_reserve: float = 1.0):
+        self.path = path or storage.data_path('outbound.sqlite3')
+        self.rates = dict(DEFAULT_RATES)
+        self.rates.update(rates or {})
+        self.backoff = backoff
+        self.min_rate_ratio = min_rate_ratio
+        self.increase_ratio = increase_ratio
+        self.background_reserve = background_reserve
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._conn = storage.connect(self.path)
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS outbound_buckets (
+                domain TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                rate REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        ''')
+        self._conn.commit()
+
+    def limits(self, domain: str) -> Dict:
+        return self.rates.get(domain, DEFAULT_DOMAIN_RATE)
+
+    def throttle(self, url: str, priority: Optional[str] = None) -> float:
+        """
+        Block until a request to url's domain may be sent.
+
+        Args:
+            url: Request URL (or bare domain)
+            priority: INTERACTIVE or BACKGROUND, defaults to the current
+                context (see background())
+
+        Returns:
+            Seconds spent waiting
+
+        Raises:
+            Overloaded: the domain could not be reached within MAX_WAIT
+        """
+        domain = domain_of(url)
+        priority = priority or current_priority()
+        max_wait = MAX_WAIT[priority]
+        started = time.monotonic()
+        while True:
+            reserved, delay = self._reserve(domain, priority, max_wait - (time.monotonic() - started))
+            if reserved:
+                if delay > 0:
+                    time.sleep(delay)
+                waited = time.monotonic() - started
+                self._count(domain, 'requests')
+                self._count(domain, f'{priority}_wait_seconds', waited)
+                return waited
+            remaining = max_wait - (time.monotonic() - started)
+            if priority == INTERACTIVE or remaining <= 0:
+                self._count(domain, f'{priority}_rejected')
+                raise Overloaded(domain, delay)
+            time.sleep(min(delay, remaining))
+
+    def has_capacity(self, url: str, priority: str = BACKGROUND) -> bool:
+        """
+        Whether a request of this priority to url's domain could go out now
+        without waiting. Reads the shared bucket (so it sees live traffic
+        from every worker process) and takes no token.
+        """
+        domain = domain_of(url)
+        with self._lock:
+            tokens, _, _ = self._load(domain, self.limits(domain))
+        needed = 1.0 + (self.background_reserve if priority == BACKGROUND else 0.0)
+        return tokens >= needed
+
+    def report(self, url: str, status: Optional[int] = None, blocked: bool = False):
+        """
+        Feed back a response: 429/503 or a captcha (blocked=True) halves the
+        domain's rate and pauses it for `backoff` seconds; a success raises
+        the rate a little, up to the configured rate.
+        """
+        domain = domain_of(url)
+        limits = self.limits(domain)
+        penalize = blocked or status in (429, 503)
+        if not penalize and (status is None or status >= 400):
+            return
+        try:
+            with self._lock:
+                conn = self._conn
+                conn.execute('BEGIN IMMEDIATE')
+                try:
+                    tokens, rate, now = self._load(domain, limits)
+                    if penalize:
+                        rate = max(limits['rate'] * self.min_rate_ratio, rate / 2)
+                        # Push every pending and future reservation past the pause
+                        tokens = min(tokens, 0.0) - self.backoff * rate
+                    else:
+                        rate = min(limits['rate'], rate + limits['rate'] * self.increase_ratio)
+                    self._save(domain, tokens, rate, now)
+                    conn.execute('COMMIT')
+                except Exception:
+                    conn.execute('ROLLBACK')
+                    raise
+        except Exception as e:
+            logger.warning(f"Could not record outbound feedback for {domain}: {e}")
+            return
+        if penalize:
+            self._count(domain, 'penalties')
+            logger.warning(f"{domain} pushed back ({'captcha' if blocked else status}), "
+                           f"slowing to {rate:.2f} req/s")
+
+    def _reserve(self, domain: str, priority: str, max_wait: float) -> Tuple[bool, float]:
+        """
+        Try to take a token.
+
+        Returns:
+            (True, seconds until the reserved slot) or (False, seconds until
+            a retry could succeed)
+        """
+        limits = self.limits(domain)
+        with self._lock:
+            conn = self._conn
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                tokens, rate, now = self._load(domain, limits)
+                if priority == BACKGROUND:
+                    needed = 1.0 + self.background_reserve
+                    if tokens < needed:
+                        conn.execute('COMMIT')
+                        return False, (needed - tokens) / rate
+                    delay = 0.0
+                else:
+                    delay = max(0.0, (1.0 - tokens) / rate)
+                    if delay > max_wait:
+                        conn.execute('COMMIT')
+                        return False, delay
+                self._save(domain, tokens - 1.0, rate, now)
+                conn.execute('COMMIT')
+                return True, delay
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+
+    def _load(self, domain: str, limits: Dict) -> Tuple[float, float, float]:
+        # Caller holds self._lock inside a transaction
+        now = time.time()
+        row = self._conn.execute(
+            'SELECT tokens, rate, updated_at FROM outbound_buckets WHERE domain = ?', (domain,)
+        ).fetchone()
+        if row is None:
+            return float(limits['burst']), float(limits['rate']), now
+        tokens, rate, updated_at = row
+        rate = min(rate, limits['rate'])
+        tokens = min(float(limits['burst']), tokens + max(0.0, now - updated_at) * rate)
+        return tokens, rate, now
+
+    def _save(self, domain: str, tokens: float, rate: float, now: float):
+        self._conn.execute(
+            'INSERT OR REPLACE INTO outbound_buckets VALUES (?, ?, ?, ?)',
+            (domain, tokens, rate, now),
+        )
+
+    def _count(self, domain: str, name: str, amount: float = 1):
+        with self._lock:
+            counters = self._stats.setdefault(domain, {})
+            counters[name] = counters.get(name, 0) + amount
+
+    def stats(self) -> Dict[str, Dict]:
+        """Per-domain counters from this process plus the shared bucket state"""
+        with self._lock:
+            stats = {domain: dict(counters) for domain, counters in self._stats.items()}
+            rows = self._conn.execute('SELECT domain, tokens, rate, updated_at FROM outbound_buckets').fetchall()
+        now = time.time()
+        for domain, tokens, rate, updated_at in rows:
+            limits = self.limits(domain)
+            entry = stats.setdefault(domain, {})
+            entry['rate'] = round(rate, 3)
+            entry['configured_rate'] = limits['rate']
+            entry['tokens'] = round(min(limits['burst'], tokens + (now - updated_at) * rate), 3)
+        for entry in stats.values():
+            for name in list(entry):
+                if name.endswith('_seconds'):
+                    entry[name] = round(entry[name], 3)
+        return stats
+
+
+_default_scheduler: Optional[OutboundScheduler] = None
+_default_lock = threading.Lock()
+
+
+def configure_outbound(rates: Optional[Dict[str, Dict]] = None):
+    """Set per-domain rates, e.g. from Django settings (replaces the process-wide scheduler)"""
+    global _default_scheduler
+    with _default_lock:
+        _default_scheduler = OutboundScheduler(rates=rates)
+
+
+def get_scheduler() -> OutboundScheduler:
+    """Return the process-wide outbound scheduler, creating it on first use"""
+    global _default_scheduler
+    with _default_lock:
+        if _default_scheduler is None:
+            _default_scheduler = OutboundScheduler()
+        return _default_scheduler
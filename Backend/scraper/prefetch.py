@@ -0,0 +1,170 @@
+"""
+Speculative Next-Page Prefetch
+After a results page is served, fetch the following page in the background
+and keep it briefly, so the usual "page 2" request is answered from memory.
+
+Prefetches run on a small dedicated pool and only while live traffic for the
+source is light; queued prefetches are dropped as soon as it picks up. They
+run as background work, so an upstream's bulkhead admits them only into its
+background share, without queueing (see scraper/admission.py), and a
+prefetch never takes a slot a live request is waiting for.
+
+Only lookups for pages a prefetch could have fetched (page > 1) should go
+through get(), so hit_rate in stats() is hits over those lookups. used_rate
+is hits over pages prefetched, the share of prefetch work that paid off.
+"""
+
+import json
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+from .admission import Overloaded
+from .cache import CacheEntry, LRUCache
+from .politeness import background
+
+logger = logging.getLogger(__name__)
+
+
+class Prefetcher:
+    """
+    Low-priority next-page fetcher with a short-lived result store.
+
+    Args:
+        enabled: source name -> bool; sources not listed are disabled
+        ttl: Seconds a prefetched page is kept
+        max_workers: Concurrent prefetches
+        max_pending: Queued prefetches before new ones are skipped
+        max_live: Live requests per source above which prefetching pauses
+    """
+
+    def __init__(self, enabled: Optional[Dict[str, bool]] = None, ttl: float = 60.0,
+                 max_workers: int = 2, max_pending: int = 8, max_live: int = 1,
+                 memory_bytes: int = 8 * 1024 * 1024):
+        self.enabled = dict(enabled or {})
+        self.ttl = ttl
+        self.max_pending = max_pending
+        self.max_live = max_live
+        self._store = LRUCache(memory_bytes)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='prefetch')
+        self._pending: Dict[str, Future] = {}
+        self._live: Dict[str, int] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def is_enabled(self, source: str) -> bool:
+        return bool(self.enabled.get(source))
+
+    def set_enabled(self, source: str, enabled: bool):
+        self.enabled[source] = enabled
+
+    @contextmanager
+    def live(self, source: str):
+        """Mark a live (user-facing) upstream request for source"""
+        with self._lock:
+            self._live[source] = self._live.get(source, 0) + 1
+            busy = self._live[source] > self.max_live
+        if busy:
+            self._cancel_pending(source)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._live[source] -= 1
+
+    def get(self, source: str, key: str) -> Optional[Dict]:
+        """Return a prefetched result for key, or None"""
+        entry = self._store.get(key)
+        if entry is None or entry.state(time.time()) != 'fresh':
+            self._count(source, 'misses')
+            return None
+        self._count(source, 'hits')
+        return json.loads(entry.blob)
+
+    def schedule(self, source: str, key: str, fetch: Callable[[], Dict]) -> bool:
+        """
+        Prefetch key in the background unless disabled, already cached,
+        already queued, or the source is busy.
+
+        Returns:
+            True if a prefetch was queued
+        """
+        if not self.is_enabled(source):
+            return False
+        entry = self._store.get(key)
+        if entry is not None and entry.state(time.time()) == 'fresh':
+            return False
+
+        with self._lock:
+            if key in self._pending:
+                return False
+            if len(self._pending) >= self.max_pending or self._live.get(source, 0) > self.max_live:
+                self._bump(source, 'skipped_busy')
+                return False
+            future = self._executor.submit(self._run, source, key, fetch)
+            self._pending[key] = future
+            future.source = source
+        return True
+
+    def _run(self, source: str, key: str, fetch: Callable[[], Dict]):
+        try:
+            with self._lock:
+                busy = self._live.get(source, 0) > self.max_live
+            if busy:
+                self._count(source, 'skipped_busy')
+                return
+            with background():
+                result = fetch()
+            if not result or not result.get('products'):
+                self._count(source, 'empty')
+                return
+            now = time.time()
+            blob = json.dumps(result, default=str).encode('utf-8')
+            self._store.set(key, CacheEntry(blob, now, now + self.ttl, now + self.ttl))
+            self._count(source, 'prefetched')
+        except Overloaded:
+            # No background room on the upstream: live traffic came first
+            self._count(source, 'skipped_busy')
+        except Exception as e:
+            self._count(source, 'errors')
+            logger.warning(f"Prefetch of {key} failed: {e}")
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    def _cancel_pending(self, source: str):
+        """Drop queued (not yet running) prefetches for source"""
+        with self._lock:
+            futures = [f for f in self._pending.values() if getattr(f, 'source', None) == source]
+        for future in futures:
+            if future.cancel():
+                self._count(source, 'cancelled')
+                with self._lock:
+                    for key, pending in list(self._pending.items()):
+                        if pending is future:
+                            self._pending.pop(key, None)
+
+    def _bump(self, source: str, name: str):
+        # Caller holds self._lock
+        counters = self._stats.setdefault(source, {})
+        counters[name] = counters.get(name, 0) + 1
+
+    def _count(self, source: str, name: str):
+        with self._lock:
+            self._bump(source, name)
+
+    def stats(self) -> Dict[str, Dict]:
+        """Per-source counters, hit_rate (hits / lookups) and used_rate (hits / pages prefetched)"""
+        with self._lock:
+            stats = {source: dict(counters) for source, counters in self._stats.items()}
+            pending = len(self._pending)
+        for source, counters in stats.items():
+            hits, prefetched = counters.get('hits', 0), counters.get('prefetched', 0)
+            lookups = hits + counters.get('misses', 0)
+            counters['hit_rate'] = round(hits / lookups, 3) if lookups else 0.0
+            counters['used_rate'] = round(hits / prefetched, 3) if prefetched else 0.0
+            counters['enabled'] = self.is_enabled(source)
+        return {'sources': stats, 'pending': pending}
@@ -3,13 +3,21 @@ Price Comparison Module
 Compares prices between Daraz and Jeevee to find the best deals
 """
 
+import heapq
 import logging
-from typing import Dict, List, Optional
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import math
+import re
+import time
+from itertools import chain
+from typing import Dict, Iterator, List, Optional, Tuple
+from concurrent.futures import FIRST_COMPLETED, wait
 from difflib import SequenceMatcher
 
-from .daraz import DarazScraper
-from .jeevee import JeeveeScraper
+from .admission import Overloaded
+from .cache import ResultCache, get_result_cache, make_key
+from .singleflight import create_flights
+from .sources import SourceRegistry, default_registry, get_executor
+from .match_store import MatchStore, get_match_store, match_confidence
 
 logger = logging.getLogger(__name__)
 
@@ -27,7 +35,6 @@ def parse_rating(rating_value) -> Optional[float]:
         # Handle string ratings like "4.5", "4.5/5", "4.5 out of 5"
         rating_str = str(rating_value).strip()
         # Extract first number
-        import re
         match = re.search(r'(\d+\.?\d*)', rating_str)
         if match:
             return float(match.group(1))
@@ -36,38 +43,148 @@ def parse_rating(rating_value) -> Optional[float]:
         return None
 
 
+def parse_price(price_value) -> Optional[float]:
+    """
+    Parse price from various formats ("Rs. 1,200", "1200", 1200.0) to float.
+    Returns None if price cannot be parsed.
+    """
+    if price_value is None:
+        return None
+    try:
+        price_str = str(price_value)
+        # Remove currency symbols and commas
+        price_str = price_str.replace(',', '').replace('Rs.', '').replace('NPR', '').strip()
+        return float(price_str)
+    except (ValueError, TypeError):
+        return None
+
+
+def parse_discount(discount_value) -> Optional[float]:
+    """
+    Parse discount percentage from formats like "20%", "-20%" or 20.
+    Returns None if discount cannot be parsed.
+    """
+    if discount_value is None:
+        return None
+    if isinstance(discount_value, (int, float)):
+        return abs(float(discount_value))
+    match = re.search(r'(\d+\.?\d*)', str(discount_value))
+    return float(match.group(1)) if match else None
+
+
+def parse_min_rating(value, default: float = 4.0) -> Optional[float]:
+    """
+    Minimum rating filter from request input: `default` when missing, None
+    (no filter) for 0 or empty.
+
+    Raises:
+        ValueError: value is not a number
+    """
+    value = default if value is None else value
+    try:
+        return float(value) if value and float(value) > 0 else None
+    except (TypeError, ValueError):
+        raise ValueError('min_rating must be a number')
+
+
+def parse_deadline(value, maximum: Optional[float] = None) -> Optional[float]:
+    """
+    Deadline in seconds from request input: None (no deadline) when missing
+    or empty, capped at maximum if given.
+
+    Raises:
+        ValueError: value is not a finite number greater than 0
+    """
+    if value is None or value == '':
+        return None
+    try:
+        deadline = float(value)
+    except (TypeError, ValueError):
+        raise ValueError('deadline must be a number of seconds')
+    if not math.isfinite(deadline) or deadline <= 0:
+        raise ValueError('deadline must be a positive number of seconds')
+    return deadline if maximum is None else min(deadline, maximum)
+
+
+# Sort keys supported by get_lowest_prices: name -> (key function, descending)
+SORT_KEYS = {
+    'price_asc': (lambda p: parse_price(p.get('price')), False),
+    'price_desc': (lambda p: parse_price(p.get('price')), True),
+    'rating': (lambda p: parse_rating(p.get('rating')), True),
+    'discount': (lambda p: parse_discount(p.get('discount')), True),
+}
+
+
+def top_k(products, limit: int, sort: str = 'price_asc') -> List[Dict]:
+    """
+    Select the best `limit` products for a sort key without sorting everything.
+
+    Uses a bounded heap, so cost is O(n log k) instead of O(n log n).
+    Products missing the sort value always come last.
+    
+    Args:
+        products: Iterable of product dictionaries (may be a generator)
+        limit: Number of products to keep
+        sort: One of SORT_KEYS
+        
+    Returns:
+        List of at most `limit` products in sorted order
+    """
+    key_func, descending = SORT_KEYS[sort]
+    if descending:
+        def key(product):
+            value = key_func(product)
+            return value if value is not None else float('-inf')
+        return heapq.nlargest(limit, products, key=key)
+
+    def key(product):
+        value = key_func(product)
+        return value if value is not None else float('inf')
+    return heapq.nsmallest(limit, products, key=key)
+
+
 def filter_by_rating(products: List[Dict], min_rating: float = 4.0) -> List[Dict]:
     """
     Filter products to only include those with rating >= min_rating.
     Products without ratings are excluded.
     
     Args:
-        products: List of product dictionaries
+        products: List of product dictionaries (not modified; they may be
+            shared with the result cache)
         min_rating: Minimum rating threshold (default 4.0)
         
     Returns:
-        Filtered list of products with rating >= min_rating
+        Copies of the products with rating >= min_rating, each with its
+        parsed_rating added
     """
     filtered = []
     for product in products:
         rating = parse_rating(product.get('rating'))
         if rating is not None and rating >= min_rating:
-            product['parsed_rating'] = rating  # Add parsed rating for convenience
-            filtered.append(product)
+            filtered.append(dict(product, parsed_rating=rating))
     return filtered
 
 
+# Concurrent identical comparisons share one search + match run
+_search_flights = create_flights()
+
+
 class PriceComparer:
     """
     Compare prices between multiple e-commerce platforms
-    Currently supports: Daraz (Nepal) and Jeevee
+    Searches every source in the registry (by default Daraz Nepal and Jeevee)
+    and matches Daraz products against Jeevee products
     """
     
-    def __init__(self):
-        self.daraz_scraper = DarazScraper(region='np')  # Nepal
-        self.jeevee_scraper = JeeveeScraper()
+    def __init__(self, match_store: Optional[MatchStore] = None,
+                 registry: Optional[SourceRegistry] = None,
+                 cache: Optional[ResultCache] = None, use_cache: bool = True):
+        self.registry = registry or default_registry
+        self.match_store = match_store or get_match_store()
+        self.cache = (cache or get_result_cache()) if use_cache else None
     
-    def search_all(self, query: str, limit: int = 20, min_rating: float = None) -> Dict:
+    def search_all(self, query: str, limit: int = 20, min_rating: float = None,
+                   deadline: float = None) -> Dict:
         """
         Search for products on all platforms simultaneously
         
@@ -75,10 +192,23 @@ class PriceComparer:
             query: Search term
             limit: Max results per platform
             min_rating: Minimum rating filter (e.g., 4.0 for 4+ stars). None = no filter
+            deadline: Seconds to wait overall. Sources that have not answered
+                by then are returned empty with status 'pending' or 'timed_out'
             
         Returns:
             Dictionary with products from all sources
         """
+        key = make_key('compare', query, limit=limit, min_rating=min_rating, deadline=deadline)
+        return _search_flights.do(
+            key,
+            lambda: self._search_all(query, limit, min_rating, deadline),
+            # Leave the leader time to finish matching after its deadline
+            timeout=None if deadline is None else deadline + 10,
+        )
+    
+    def _search_all(self, query: str, limit: int, min_rating: float = None,
+                    deadline: float = None) -> Dict:
+        """Run the actual search and matching (see search_all)"""
         results = {
             'query': query,
             'daraz': {'products': [], 'success': False},
@@ -88,30 +218,11 @@ class PriceComparer:
             'min_rating_filter': min_rating,
         }
         
-        # Search both platforms in parallel
-        with ThreadPoolExecutor(max_workers=2) as executor:
-            futures = {
-                executor.submit(self._search_daraz, query, limit): 'daraz',
-                executor.submit(self._search_jeevee, query, limit): 'jeevee',
-            }
-            
-            for future in as_completed(futures):
-                source = futures[future]
-                try:
-                    data = future.result()
-                    results[source] = data
-                    # Check for products - success may not always be set
-                    if data.get('products'):
-                        results['all_products'].extend(data['products'])
-                except Exception as e:
-                    logger.error(f"Error fetching from {source}: {e}")
-                    results[source] = {'products': [], 'success': False, 'error': str(e)}
-        
-        # Apply rating filter if specified
-        if min_rating is not None:
-            results['all_products'] = filter_by_rating(results['all_products'], min_rating)
-            results['daraz']['products'] = filter_by_rating(results['daraz'].get('products', []), min_rating)
-            results['jeevee']['products'] = filter_by_rating(results['jeevee'].get('products', []), min_rating)
+        sources = self._fetch_sources(query, limit, min_rating, deadline)
+        results.update(sources)
+        for data in sources.values():
+            results['all_products'].extend(data.get('products', []))
+        results['partial'] = any(data['status'] != 'done' for data in sources.values())
         
         # Sort all products by price
         results['all_products'] = self._sort_by_price(results['all_products'])
@@ -124,49 +235,150 @@ class PriceComparer:
         
         return results
     
-    def _search_daraz(self, query: str, limit: int) -> Dict:
-        """Search Daraz for products"""
-        try:
-            result = self.daraz_scraper.search(query)
-            products = result.get('products', [])[:limit]
-            
-            # Add source identifier to each product
-            for p in products:
-                p['source'] = 'Daraz'
-                p['currency'] = 'NPR'
-            
-            # Success is True if we got products
-            has_products = len(products) > 0
-            
-            return {
-                'success': has_products,
-                'products': products,
-                'total': result.get('total', len(products)),
-                'source': 'Daraz'
-            }
-        except Exception as e:
-            logger.error(f"Daraz search error: {e}")
-            return {'success': False, 'products': [], 'error': str(e)}
+    def iter_search(self, query: str, limit: int = 20, min_rating: float = None,
+                    deadline: float = None, batch_size: int = 10) -> Iterator[Dict]:
+        """
+        Search all platforms and yield events as results land.
+        
+        Events, in order:
+            {'event': 'source', 'source': name, ...source result}
+                one per source, as soon as it finishes
+            {'event': 'matches', 'items': [...]}
+                batches of compared_products once Daraz and Jeevee are both in
+            {'event': 'summary', ...}
+                per-source status and counts, always last
+        
+        Args:
+            query: Search term
+            limit: Max results per platform
+            min_rating: Minimum rating filter. None = no filter
+            deadline: Seconds to wait overall for sources
+            batch_size: Compared products per 'matches' event
+        """
+        sources = {}
+        for name, data in self._iter_sources(query, limit, min_rating, deadline):
+            sources[name] = data
+            yield {'event': 'source', **data, 'source': name}
+        
+        compared = 0
+        batch = []
+        for comparison in self._iter_comparisons(
+            sources.get('daraz', {}).get('products', []),
+            sources.get('jeevee', {}).get('products', []),
+        ):
+            batch.append(comparison)
+            if len(batch) >= batch_size:
+                compared += len(batch)
+                yield {'event': 'matches', 'items': batch}
+                batch = []
+        if batch:
+            compared += len(batch)
+            yield {'event': 'matches', 'items': batch}
+        
+        yield {
+            'event': 'summary',
+            'query': query,
+            'min_rating_filter': min_rating,
+            'total': sum(len(data.get('products', [])) for data in sources.values()),
+            'compared': compared,
+            'partial': any(data['status'] != 'done' for data in sources.values()),
+            'sources': {
+                name: {
+                    'success': data.get('success', False),
+                    'status': data['status'],
+                    'count': len(data.get('products', [])),
+                    'cache': data.get('cache'),
+                }
+                for name, data in sources.items()
+            },
+        }
     
-    def _search_jeevee(self, query: str, limit: int) -> Dict:
-        """Search Jeevee for products"""
-        try:
-            result = self.jeevee_scraper.search(query, limit=limit)
-            return result
-        except Exception as e:
-            logger.error(f"Jeevee search error: {e}")
-            return {'success': False, 'products': [], 'error': str(e)}
+    def _fetch_sources(self, query: str, limit: int, min_rating: float = None,
+                       deadline: float = None) -> Dict[str, Dict]:
+        """
+        Search every registered source and collect the results.
+        
+        Returns:
+            Dictionary of source name -> source result
+        
+        Raises:
+            Overloaded: every source rejected the search
+        """
+        sources = dict(self._iter_sources(query, limit, min_rating, deadline))
+        rejected = [data for data in sources.values() if data['status'] == 'rejected']
+        if rejected and len(rejected) == len(sources):
+            raise Overloaded('all sources', min(data['retry_after'] for data in rejected))
+        return sources
+    
+    def _iter_sources(self, query: str, limit: int, min_rating: float = None,
+                      deadline: float = None) -> Iterator[Tuple[str, Dict]]:
+        """
+        Search every registered source in parallel on the shared pool and
+        yield (source name, result) pairs in completion order.
+        
+        `limit` and `min_rating` are pushed down to each source, so every
+        source returns at most `limit` products that already pass the
+        rating filter. Each source is waited on for at most its own timeout,
+        and nothing is waited on past `deadline` seconds.
+        
+        Each result carries a 'status': 'done', 'failed', 'rejected' (the
+        source is overloaded and nothing was cached), 'timed_out' (the
+        source exceeded its own timeout) or 'pending' (cut off by deadline).
+        Unfinished sources are yielded last.
+        """
+        started = time.monotonic()
+        executor = get_executor()
+        futures = {
+            executor.submit(source.run, query, limit, min_rating, self.cache): source
+            for source in self.registry.sources()
+        }
+        
+        finished = set()
+        waiting = set(futures)
+        while waiting:
+            elapsed = time.monotonic() - started
+            # Stop waiting for sources that used up their own timeout
+            waiting = {f for f in waiting if futures[f].timeout > elapsed}
+            if not waiting:
+                break
+            budget = min(futures[f].timeout for f in waiting)
+            if deadline is not None:
+                budget = min(budget, deadline)
+            if budget <= elapsed:
+                break
+            done, waiting = wait(waiting, timeout=budget - elapsed, return_when=FIRST_COMPLETED)
+            for future in done:
+                source = futures[future]
+                try:
+                    data = future.result()
+                    if data.get('overloaded') and not data.get('products'):
+                        data['status'] = 'rejected'
+                    else:
+                        data['status'] = 'failed' if data.get('error') else 'done'
+                except Exception as e:
+                    logger.error(f"Error fetching from {source.name}: {e}")
+                    data = {'products': [], 'success': False, 'error': str(e), 'status': 'failed'}
+                finished.add(future)
+                yield source.name, data
+        
+        elapsed = time.monotonic() - started
+        for future, source in futures.items():
+            if future in finished:
+                continue
+            # Drop the search if it has not started yet; running ones finish in the background
+            future.cancel()
+            yield source.name, {
+                'products': [],
+                'success': False,
+                'source': source.label,
+                'status': 'timed_out' if elapsed >= source.timeout else 'pending',
+            }
     
     def _sort_by_price(self, products: List[Dict]) -> List[Dict]:
         """Sort products by price (lowest first)"""
         def get_price(product):
-            try:
-                price_str = str(product.get('price', '0'))
-                # Remove currency symbols and commas
-                price_str = price_str.replace(',', '').replace('Rs.', '').replace('NPR', '').strip()
-                return float(price_str)
-            except (ValueError, TypeError):
-                return float('inf')
+            price = parse_price(product.get('price'))
+            return price if price is not None else float('inf')
         
         return sorted(products, key=get_price)
     
@@ -175,55 +387,98 @@ class PriceComparer:
         Try to match similar products from both platforms
         Returns products with price comparison data
         """
-        compared = []
+        return list(self._iter_comparisons(daraz_products, jeevee_products))
+    
+    def _iter_comparisons(self, daraz_products: List[Dict], jeevee_products: List[Dict]) -> Iterator[Dict]:
+        """
+        Yield compared products one at a time: Daraz products in order
+        (matched or not), then unmatched Jeevee products.
+
+        Links already known to the match store are reused; similarity is
+        only computed for Daraz products without a usable stored link.
+        """
         used_jeevee = set()
+        matches = {}  # daraz index -> (jeevee index, score)
         
-        for daraz_product in daraz_products:
-            daraz_name = daraz_product.get('name', '').lower()
-            best_match = None
-            best_score = 0
-            best_idx = -1
-            
-            for idx, jeevee_product in enumerate(jeevee_products):
-                if idx in used_jeevee:
-                    continue
+        # Reuse stored links whose Jeevee product is part of this result set
+        jeevee_index = {}
+        for idx, jeevee_product in enumerate(jeevee_products):
+            jeevee_id = str(jeevee_product.get('id') or '')
+            if jeevee_id:
+                jeevee_index.setdefault(jeevee_id, idx)
+        
+        known_links = self.match_store.get_links(
+            'daraz', (str(p.get('id') or '') for p in daraz_products), 'jeevee'
+        )
+        for daraz_idx, daraz_product in enumerate(daraz_products):
+            link = known_links.get(str(daraz_product.get('id') or ''))
+            if not link:
+                continue
+            jeevee_idx = jeevee_index.get(link[0])
+            if jeevee_idx is not None and jeevee_idx not in used_jeevee:
+                used_jeevee.add(jeevee_idx)
+                matches[daraz_idx] = (jeevee_idx, link[1])
+        
+        # Compute similarity for the products we have not matched before
+        new_links = []
+        try:
+            for daraz_idx, daraz_product in enumerate(daraz_products):
+                if daraz_idx not in matches:
+                    daraz_name = (daraz_product.get('name') or '').lower()
+                    best_score = 0
+                    best_idx = -1
+                    
+                    for idx, jeevee_product in enumerate(jeevee_products):
+                        if idx in used_jeevee:
+                            continue
+                            
+                        jeevee_name = (jeevee_product.get('name') or '').lower()
+                        
+                        # Calculate similarity score
+                        score = self._similarity_score(daraz_name, jeevee_name)
+                        
+                        if score > best_score and score > 0.5:  # Minimum 50% similarity
+                            best_score = score
+                            best_idx = idx
                     
-                jeevee_name = jeevee_product.get('name', '').lower()
+                    if best_idx >= 0:
+                        used_jeevee.add(best_idx)
+                        matches[daraz_idx] = (best_idx, best_score)
+                        new_links.append((
+                            str(daraz_product.get('id') or ''),
+                            str(jeevee_products[best_idx].get('id') or ''),
+                            best_score,
+                        ))
                 
-                # Calculate similarity score
-                score = self._similarity_score(daraz_name, jeevee_name)
+                jeevee_idx, best_score = matches.get(daraz_idx, (-1, 0))
+                best_match = jeevee_products[jeevee_idx] if jeevee_idx >= 0 else None
                 
-                if score > best_score and score > 0.5:  # Minimum 50% similarity
-                    best_score = score
-                    best_match = jeevee_product
-                    best_idx = idx
-            
-            comparison = {
-                'daraz': daraz_product,
-                'jeevee': best_match,
-                'match_score': round(best_score * 100, 1),
-                'has_match': best_match is not None,
-            }
-            
-            if best_match:
-                used_jeevee.add(best_idx)
-                comparison['price_comparison'] = self._calculate_price_comparison(
-                    daraz_product, best_match
-                )
-            
-            compared.append(comparison)
+                comparison = {
+                    'daraz': daraz_product,
+                    'jeevee': best_match,
+                    'match_score': round(best_score * 100, 1),
+                    'has_match': best_match is not None,
+                }
+                
+                if best_match:
+                    comparison['match_confidence'] = match_confidence(best_score)
+                    comparison['price_comparison'] = self._calculate_price_comparison(
+                        daraz_product, best_match
+                    )
+                
+                yield comparison
+        finally:
+            self.match_store.save_links('daraz', 'jeevee', new_links)
         
         # Add unmatched Jeevee products
         for idx, jeevee_product in enumerate(jeevee_products):
             if idx not in used_jeevee:
-                compared.append({
+                yield {
                     'daraz': None,
                     'jeevee': jeevee_product,
                     'match_score': 0,
                     'has_match': False,
-                })
-        
-        return compared
+                }
     
     def _similarity_score(self, str1: str, str2: str) -> float:
         """Calculate similarity between two strings"""
@@ -235,16 +490,8 @@ class PriceComparer:
     
     def _calculate_price_comparison(self, product1: Dict, product2: Dict) -> Dict:
         """Calculate price comparison between two products"""
-        def parse_price(p):
-            try:
-                price_str = str(p.get('price', '0'))
-                price_str = price_str.replace(',', '').replace('Rs.', '').replace('NPR', '').strip()
-                return float(price_str)
-            except (ValueError, TypeError):
-                return None
-        
-        price1 = parse_price(product1)
-        price2 = parse_price(product2)
+        price1 = parse_price(product1.get('price'))
+        price2 = parse_price(product2.get('price'))
         
         result = {
             'daraz_price': price1,
@@ -270,39 +517,67 @@ class PriceComparer:
         
         return result
     
-    def get_lowest_prices(self, query: str, limit: int = 20, min_rating: float = None) -> Dict:
+    def get_lowest_prices(self, query: str, limit: int = 20, min_rating: float = None,
+                          sort: str = 'price_asc', deadline: float = None,
+                          facet_query=None) -> Dict:
         """
         Search all platforms and return products sorted by lowest price
         
+        Skips cross-source matching and picks the top `limit` products
+        with a bounded heap instead of sorting every result.
+        
         Args:
             query: Search term
             limit: Max results to return
             min_rating: Minimum rating filter (e.g., 4.0 for 4+ stars). None = no filter
+            sort: 'price_asc' (default), 'price_desc', 'rating' or 'discount'
+            deadline: Seconds to wait overall before answering with partial results
+            facet_query: facets.FacetQuery; its filters apply to every
+                product the sources returned before the top `limit` are
+                picked, and its facets summarize that same filtered set
             
         Returns:
-            Dictionary with sorted products by price
+            Dictionary with sorted products by price; with facet_query also
+            'matched' (products passing the filters) and, if asked,
+            'facets'
         """
-        results = self.search_all(query, limit, min_rating=min_rating)
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Unknown sort '{sort}'. Use one of: {', '.join(SORT_KEYS)}")
+        
+        sources = self._fetch_sources(query, limit, min_rating, deadline)
         
-        all_products = results['all_products'][:limit]
+        candidates = chain.from_iterable(data.get('products', []) for data in sources.values())
+        faceted = None
+        if facet_query is not None:
+            # Imported here to avoid a circular import (facets uses the parsers above)
+            from .facets import facet_products
+            faceted = facet_products(list(candidates), facet_query)
+            candidates = faceted['products']
+        all_products = top_k(candidates, limit, sort)
         
-        return {
+        result = {
             'query': query,
             'success': True,
             'products': all_products,
             'total': len(all_products),
             'min_rating_filter': min_rating,
+            'sort': sort,
+            'partial': any(data['status'] != 'done' for data in sources.values()),
             'sources': {
-                'daraz': {
-                    'success': results['daraz'].get('success', False),
-                    'count': len(results['daraz'].get('products', [])),
-                },
-                'jeevee': {
-                    'success': results['jeevee'].get('success', False),
-                    'count': len(results['jeevee'].get('products', [])),
-                },
+                name: {
+                    'success': data.get('success', False),
+                    'status': data['status'],
+                    'count': len(data.get('products', [])),
+                    'cache': data.get('cache'),
+                }
+                for name, data in sources.items()
             }
         }
+        if faceted is not None:
+            result['matched'] = faceted['matched']
+            if faceted['facets'] is not None:
+                result['facets'] = faceted['facets']
+        return result
 
 
 def compare_prices(query: str, limit: int = 20, min_rating: float = None) -> Dict:
@@ -317,11 +592,12 @@ def compare_prices(query: str, limit: int = 20, min_rating: float = None) -> Dic
     Returns:
         Dictionary with comparison results
     """
-    comparer = PriceComparer()
-    return comparer.search_all(query, limit, min_rating=min_rating)
+    from .runtime import get_runtime
+    return get_runtime().comparer().search_all(query, limit, min_rating=min_rating)
 
 
-def get_lowest_prices(query: str, limit: int = 20, min_rating: float = None) -> Dict:
+def get_lowest_prices(query: str, limit: int = 20, min_rating: float = None,
+                      sort: str = 'price_asc') -> Dict:
     """
     Get products sorted by lowest price across all platforms
     
@@ -329,12 +605,13 @@ def get_lowest_prices(query: str, limit: int = 20, min_rating: float = None) ->
         query: Search term
         limit: Max results
         min_rating: Minimum rating filter (e.g., 4.0 for 4+ stars)
+        sort: 'price_asc' (default), 'price_desc', 'rating' or 'discount'
         
     Returns:
         Dictionary with products sorted by price
     """
-    comparer = PriceComparer()
-    return comparer.get_lowest_prices(query, limit, min_rating=min_rating)
+    from .runtime import get_runtime
+    return get_runtime().comparer().get_lowest_prices(query, limit, min_rating=min_rating, sort=sort)
 
 
 if __name__ == "__main__":
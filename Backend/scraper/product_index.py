@@ -0,0 +1,296 @@
+"""
+Local Product Index
+Every product the scrapers return is kept in a local SQLite store with an
+FTS5 index on name, brand and manufacturer. Products we have already seen
+can then be searched instantly, ranked by BM25, and a source that is down
+or rate-limited can still answer from them (see Source.run).
+
+Products are buffered in memory and written in batches, keyed by
+product_key(), so a product scraped again is updated in place. Searches
+that found products are counted per query alongside (record_query), for
+typeahead suggestions (see scraper/suggest.py).
+
+    index = get_product_index()
+    index.add(result['products'])
+    hits = index.search('face wash', max_price=900, min_rating=4, limit=20)
+"""
+
+import json
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from . import storage
+from .cache import normalize_query
+from .payload import product_key
+
+logger = logging.getLogger(__name__)
+
+# At most this many query words go into the FTS5 MATCH expression
+MAX_QUERY_TERMS = 10
+# BM25 column weights: name, brand, manufacturer
+BM25_WEIGHTS = (10.0, 4.0, 2.0)
+
+_WORD = re.compile(r'\w+')
+
+
+def match_expression(query: str) -> Optional[str]:
+    """
+    FTS5 MATCH expression for a user query: every word as a quoted prefix
+    ("face"* "wash"*), so partial words match and FTS5 syntax in the query
+    is never interpreted. None if the query has no words.
+    """
+    words = _WORD.findall(query.lower())[:MAX_QUERY_TERMS]
+    return ' '.join(f'"{word}"*' for word in words) or None
+
+
+class ProductIndex:
+    """
+    Scraped products in SQLite with an external-content FTS5 table, shared
+    by every worker on the host. Triggers keep the FTS table in step with
+    the products table.
+    """
+
+    def __init__(self, path=None, flush_every: int = 200, flush_interval: float = 5.0):
+        self.path = path or storage.data_path('products.sqlite3')
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self._pending: Dict[str, tuple] = {}
+        self._pending_queries: Counter = Counter()
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._conn = storage.connect(self.path)
+        self._conn.executescript('''
+            CREATE TABLE IF NOT EXISTS products (
+                key TEXT PRIMARY KEY,
+                source TEXT NOT NULL,
+                name TEXT NOT NULL,
+                brand TEXT NOT NULL,
+                manufacturer TEXT NOT NULL,
+                price REAL,
+                rating REAL,
+                data TEXT NOT NULL,
+                seen_at REAL NOT NULL
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+                name, brand, manufacturer,
+                content='products', content_rowid='rowid',
+                tokenize='unicode61 remove_diacritics 2'
+            );
+            CREATE TRIGGER IF NOT EXISTS products_ai AFTER INSERT ON products BEGIN
+                INSERT INTO products_fts (rowid, name, brand, manufacturer)
+                VALUES (new.rowid, new.name, new.brand, new.manufacturer);
+            END;
+            CREATE TRIGGER IF NOT EXISTS products_ad AFTER DELETE ON products BEGIN
+                INSERT INTO products_fts (products_fts, rowid, name, brand, manufacturer)
+                VALUES ('delete', old.rowid, old.name, old.brand, old.manufacturer);
+            END;
+            -- Re-scrapes mostly change price and rating; only re-index changed text
+            CREATE TRIGGER IF NOT EXISTS products_au AFTER UPDATE ON products
+            WHEN old.name IS NOT new.name OR old.brand IS NOT new.brand
+                OR old.manufacturer IS NOT new.manufacturer
+            BEGIN
+                INSERT INTO products_fts (products_fts, rowid, name, brand, manufacturer)
+                VALUES ('delete', old.rowid, old.name, old.brand, old.manufacturer);
+                INSERT INTO products_fts (rowid, name, brand, manufacturer)
+                VALUES (new.rowid, new.name, new.brand, new.manufacturer);
+            END;
+            CREATE TABLE IF NOT EXISTS queries (
+                query TEXT PRIMARY KEY,
+                hits INTEGER NOT NULL,
+                updated_at REAL NOT NULL,
+                seq INTEGER NOT NULL DEFAULT 0
+            );
+        ''')
+        columns = {row[1] for row in self._conn.execute('PRAGMA table_info(queries)')}
+        if 'seq' not in columns:
+            # Indexes written before queries had a sequence number
+            self._conn.execute('ALTER TABLE queries ADD COLUMN seq INTEGER NOT NULL DEFAULT 0')
+            self._conn.execute('UPDATE queries SET seq = rowid')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS queries_seq_idx ON queries (seq)')
+        self._conn.commit()
+
+    def add(self, products: List[Dict], source: Optional[str] = None):
+        """
+        Queue products for the index; they are written once flush_every are
+        pending or flush_interval has passed.
+
+        Args:
+            products: Normalized product dicts (not modified)
+            source: Source for products that don't carry their own
+        """
+        rows = [row for row in (self._row(p, source) for p in products) if row is not None]
+        if not rows:
+            return
+        with self._lock:
+            for row in rows:
+                self._pending[row[0]] = row
+        self._flush_if_due()
+
+    def record_query(self, query: str):
+        """Count one search for query that found products"""
+        query = normalize_query(query)
+        if not query:
+            return
+        with self._lock:
+            self._pending_queries[query] += 1
+        self._flush_if_due()
+
+    def _flush_if_due(self):
+        with self._lock:
+            due = (len(self._pending) + len(self._pending_queries) >= self.flush_every
+                   or time.monotonic() - self._last_flush >= self.flush_interval)
+        if due:
+            self.flush()
+
+    def _row(self, product: Dict, source: Optional[str]) -> Optional[tuple]:
+        # Imported here to avoid a circular import (price_compare -> sources -> runtime -> scrapers)
+        from .price_compare import parse_price, parse_rating
+
+        name = str(product.get('name') or '').strip()
+        if not name:
+            return None
+        if not product.get('source') and source:
+            product = dict(product, source=source)
+        return (
+            product_key(product),
+            str(product.get('source') or '').lower(),
+            name,
+            str(product.get('brand') or ''),
+            str(product.get('manufacturer') or ''),
+            parse_price(product.get('price')),
+            parse_rating(product.get('rating')),
+            json.dumps(product, default=str),
+            time.time(),
+        )
+
+    def flush(self):
+        """Write queued products and query counts in one transaction"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            queries, self._pending_queries = self._pending_queries, Counter()
+            self._last_flush = time.monotonic()
+            if not pending and not queries:
+                return
+            try:
+                self._conn.executemany('''
+                    INSERT INTO products (key, source, name, brand, manufacturer, price, rating, data, seen_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (key) DO UPDATE SET
+                        source = excluded.source, name = excluded.name, brand = excluded.brand,
+                        manufacturer = excluded.manufacturer, price = excluded.price,
+                        rating = excluded.rating, data = excluded.data, seen_at = excluded.seen_at
+                ''', list(pending.values()))
+                now = time.time()
+                # Every write takes the next sequence number inside the write
+                # transaction, so readers see them committed in order on
+                # every worker whatever their clocks say
+                self._conn.executemany('''
+                    INSERT INTO queries (query, hits, updated_at, seq)
+                    VALUES (?, ?, ?, (SELECT COALESCE(MAX(seq), 0) + 1 FROM queries))
+                    ON CONFLICT (query) DO UPDATE SET
+                        hits = hits + excluded.hits, updated_at = excluded.updated_at, seq = excluded.seq
+                ''', [(query, hits, now) for query, hits in queries.items()])
+                self._conn.commit()
+            except Exception as e:
+                self._conn.rollback()
+                logger.warning(f"Could not write {len(pending)} products and {len(queries)} queries to the index: {e}")
+
+    def search(self, query: str, limit: int = 20, offset: int = 0,
+               min_price: Optional[float] = None, max_price: Optional[float] = None,
+               min_rating: Optional[float] = None, source: Optional[str] = None) -> List[Dict]:
+        """
+        Products matching every word of query (as prefixes), best BM25
+        match first.
+
+        Args:
+            query: Search words
+            limit: Max products to return
+            offset: Products to skip, for paging
+            min_price, max_price, min_rating: Bounds; products missing the
+                value are excluded when a bound is set
+            source: Only this source (e.g. 'jeevee'), case-insensitive
+
+        Returns:
+            Product dicts as scraped, plus 'score' (higher is better) and
+            'seen_at' (when the product was last scraped)
+        """
+        expression = match_expression(query)
+        if expression is None:
+            return []
+        self.flush()
+
+        sql = '''
+            SELECT p.data, p.seen_at, bm25(products_fts, ?, ?, ?) AS rank
+            FROM products_fts JOIN products p ON p.rowid = products_fts.rowid
+            WHERE products_fts MATCH ?
+        '''
+        params: list = [*BM25_WEIGHTS, expression]
+        for column, op, value in (('price', '>=', min_price), ('price', '<=', max_price),
+                                  ('rating', '>=', min_rating)):
+            if value is not None:
+                sql += f' AND p.{column} {op} ?'
+                params.append(value)
+        if source:
+            sql += ' AND p.source = ?'
+            params.append(source.lower())
+        sql += ' ORDER BY rank LIMIT ? OFFSET ?'
+        params += [limit, offset]
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        products = []
+        for data, seen_at, rank in rows:
+            product = json.loads(data)
+            product['score'] = round(-rank, 3)
+            product['seen_at'] = seen_at
+            products.append(product)
+        return products
+
+    def products_since(self, rowid: int, limit: int = 5000) -> List[Tuple[int, str, str]]:
+        """(rowid, name, brand) of products first indexed after rowid, oldest first"""
+        with self._lock:
+            return self._conn.execute(
+                'SELECT rowid, name, brand FROM products WHERE rowid > ? ORDER BY rowid LIMIT ?', (rowid, limit),
+            ).fetchall()
+
+    def queries_since(self, seq: int) -> List[Tuple[str, int, int]]:
+        """(query, total hits, seq) of successful queries counted after sequence number seq, oldest first"""
+        with self._lock:
+            return self._conn.execute(
+                'SELECT query, hits, seq FROM queries WHERE seq > ? ORDER BY seq', (seq,),
+            ).fetchall()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            count = self._conn.execute('SELECT COUNT(*) FROM products').fetchone()[0]
+            return {'products': count, 'pending': len(self._pending), 'path': str(self.path)}
+
+
+_default_index: Optional[ProductIndex] = None
+_default_lock = threading.Lock()
+
+
+def get_product_index() -> ProductIndex:
+    """Return the process-wide product index, creating it on first use"""
+    global _default_index
+    with _default_lock:
+        if _default_index is None:
+            _default_index = ProductIndex()
+        return _default_index
+
+
+def record_products(result: Dict) -> Dict:
+    """
+    Queue a scraper result's products for the index and return the result
+    unchanged. Index errors are logged, never raised into the scrape.
+    """
+    try:
+        if isinstance(result, dict) and result.get('products'):
+            get_product_index().add(result['products'], source=result.get('source'))
+    except Exception as e:
+        logger.warning(f"Could not index products: {e}")
+    return result
@@ -0,0 +1,258 @@
+"""
+Scraper Runtime
+Long-lived scraper and comparer instances shared by every request in a
+process, instead of building (and throwing away) sessions and browsers per
+call.
+
+- Jeevee, WebScraper and PriceComparer are plain singletons; their HTTP
+  sessions and connection pools are safe to share between threads.
+- DarazScraper owns a browser, which only one thread may drive at a time, so
+  Daraz scrapers are checked out of a small per-region pool and returned
+  with their browser still running.
+
+    runtime = get_runtime()
+    with runtime.daraz('np') as scraper:
+        scraper.search('shoes')
+    runtime.jeevee().search('face wash')
+
+The Django app creates the runtime at startup (api/apps.py) and shuts it down
+at process exit.
+"""
+
+import atexit
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ScraperPool:
+    """
+    Idle scrapers (with their browsers) ready for reuse.
+
+    Args:
+        factory: Creates a new scraper
+        max_idle: Scrapers kept when not in use; extra ones are closed
+        max_uses: Searches before a scraper's browser is recycled
+        max_idle_time: Seconds an idle scraper is kept before being closed
+    """
+
+    def __init__(self, factory: Callable, max_idle: int = 2, max_uses: int = 50,
+                 max_idle_time: float = 300.0):
+        self.factory = factory
+        self.max_idle = max_idle
+        self.max_uses = max_uses
+        self.max_idle_time = max_idle_time
+        self._idle: List[Tuple[object, int, float]] = []  # (scraper, uses, returned_at)
+        self._lock = threading.Lock()
+        self._closed = False
+        self._stats = {'created': 0, 'reused': 0, 'recycled': 0}
+
+    @contextmanager
+    def checkout(self):
+        """Borrow a scraper for the duration of the block"""
+        scraper, uses = self._take()
+        healthy = False
+        try:
+            yield scraper
+            healthy = True
+        finally:
+            self._give_back(scraper, uses + 1, healthy)
+
+    def _take(self):
+        now = time.monotonic()
+        expired = []
+        with self._lock:
+            while self._idle:
+                scraper, uses, returned_at = self._idle.pop()
+                if now - returned_at > self.max_idle_time:
+                    expired.append(scraper)
+                    continue
+                self._stats['reused'] += 1
+                break
+            else:
+                scraper, uses = None, 0
+        for stale in expired:
+            self._close(stale)
+        if scraper is None:
+            scraper = self.factory()
+            with self._lock:
+                self._stats['created'] += 1
+        return scraper, uses
+
+    def _give_back(self, scraper, uses: int, healthy: bool):
+        with self._lock:
+            keep = (healthy and not self._closed and uses < self.max_uses
+                    and len(self._idle) < self.max_idle)
+            if keep:
+                self._idle.append((scraper, uses, time.monotonic()))
+            elif uses >= self.max_uses:
+                self._stats['recycled'] += 1
+        if not keep:
+            self._close(scraper)
+
+    def warm(self, count: int):
+        """Start up to `count` scrapers (and their browsers) ahead of traffic"""
+        for _ in range(min(count, self.max_idle)):
+            scraper = self.factory()
+            try:
+                scraper._init_driver()
+            except Exception as e:
+                logger.warning(f"Could not pre-warm browser: {e}")
+                self._close(scraper)
+                return
+            with self._lock:
+                self._stats['created'] += 1
+                self._idle.append((scraper, 0, time.monotonic()))
+
+    def close(self):
+        """Close every idle scraper; scrapers in use are closed when returned"""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for scraper, _, _ in idle:
+            self._close(scraper)
+
+    def _close(self, scraper):
+        try:
+            scraper.close()
+        except Exception as e:
+            logger.warning(f"Error closing scraper: {e}")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['idle'] = len(self._idle)
+        return stats
+
+
+class ScraperRuntime:
+    """
+    Process-wide scraper instances with an explicit lifecycle.
+
+    Args:
+        daraz_pool_size: Idle Daraz browsers kept per region
+        driver_max_uses: Searches before a Daraz browser is restarted
+    """
+
+    def __init__(self, daraz_pool_size: int = 2, driver_max_uses: int = 50):
+        self.daraz_pool_size = daraz_pool_size
+        self.driver_max_uses = driver_max_uses
+        self._daraz_pools: Dict[str, ScraperPool] = {}
+        self._jeevee = None
+        self._webscraper = None
+        self._comparer = None
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def daraz(self, region: str = 'np'):
+        """Context manager lending a DarazScraper for `region` from the pool"""
+        with self._lock:
+            pool = self._daraz_pools.get(region)
+            if pool is None:
+                from .daraz import DarazScraper
+                pool = ScraperPool(
+                    lambda: DarazScraper(region=region),
+                    max_idle=self.daraz_pool_size,
+                    max_uses=self.driver_max_uses,
+                )
+                self._daraz_pools[region] = pool
+        return pool.checkout()
+
+    def jeevee(self):
+        """Shared JeeveeScraper"""
+        with self._lock:
+            if self._jeevee is None:
+                from .jeevee import JeeveeScraper
+                self._jeevee = JeeveeScraper()
+            return self._jeevee
+
+    def webscraper(self):
+        """Shared WebScraper"""
+        with self._lock:
+            if self._webscraper is None:
+                from .webscraper import WebScraper
+                self._webscraper = WebScraper()
+            return self._webscraper
+
+    def comparer(self):
+        """Shared PriceComparer"""
+        with self._lock:
+            if self._comparer is None:
+                from .price_compare import PriceComparer
+                self._comparer = PriceComparer()
+            return self._comparer
+
+    def warm(self, browsers: int = 0, regions: Tuple[str, ...] = ('np',)):
+        """
+        Create the shared instances (and their caches and stores) now rather
+        than on the first request, and optionally start Daraz browsers.
+        """
+        self.jeevee()
+        self.webscraper()
+        self.comparer()
+        if browsers:
+            for region in regions:
+                self.daraz(region)  # creates the pool
+                self._daraz_pools[region].warm(browsers)
+        logger.info(f"Scraper runtime warmed ({browsers} browser(s) per region)")
+
+    def shutdown(self):
+        """Close browsers and sessions and flush buffered state; safe to call twice"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            pools = list(self._daraz_pools.values())
+            jeevee = self._jeevee
+        for pool in pools:
+            pool.close()
+        if jeevee is not None:
+            jeevee.close()
+        try:
+            from .warmer import get_query_tracker
+            get_query_tracker().flush()
+        except Exception as e:
+            logger.warning(f"Could not flush query stats on shutdown: {e}")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            pools = dict(self._daraz_pools)
+        return {'daraz_pools': {region: pool.stats() for region, pool in pools.items()}}
+
+
+_default_runtime: Optional[ScraperRuntime] = None
+_default_lock = threading.Lock()
+
+
+def configure_runtime(**options) -> ScraperRuntime:
+    """Create the process-wide runtime with the given options (see ScraperRuntime)"""
+    global _default_runtime
+    with _default_lock:
+        if _default_runtime is not None:
+            _default_runtime.shutdown()
+        _default_runtime = ScraperRuntime(**options)
+        return _default_runtime
+
+
+def get_runtime() -> ScraperRuntime:
+    """Return the process-wide runtime, creating it on first use"""
+    global _default_runtime
+    with _default_lock:
+        if _default_runtime is None:
+            _default_runtime = ScraperRuntime()
+        return _default_runtime
+
+
+def shutdown_runtime():
+    """Shut down the process-wide runtime, if it was created"""
+    with _default_lock:
+        runtime = _default_runtime
+    if runtime is not None:
+        runtime.shutdown()
+
+
+atexit.register(shutdown_runtime)
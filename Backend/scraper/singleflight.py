@@ -0,0 +1,277 @@
+"""
+Single-Flight Request Coalescing
+Concurrent callers asking for the same key share one upstream execution.
+
+Within a process, the first caller (the leader) runs the function and the
+others wait for its result. With a FlightStore, leaders in different worker
+processes also coordinate through a SQLite lease, and the result is shared
+through the same table for a few seconds after it lands. A leader's
+Overloaded is re-raised as Overloaded (with its Retry-After) in the other
+processes too; other errors become RemoteFlightError.
+
+    flights = SingleFlight()
+    result = flights.do(key, lambda: scraper.search(query))
+"""
+
+import copy
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Callable, Dict, Optional
+
+from . import storage
+from .admission import Overloaded
+
+logger = logging.getLogger(__name__)
+
+# Set SCRAPER_CROSS_PROCESS_FLIGHTS=1 to coalesce across worker processes too
+CROSS_PROCESS = os.environ.get('SCRAPER_CROSS_PROCESS_FLIGHTS') == '1'
+
+DEFAULT_WAIT = 120.0
+
+
+class SingleFlightTimeout(TimeoutError):
+    """Raised when a follower gives up waiting for the leader"""
+
+
+class RemoteFlightError(RuntimeError):
+    """Raised when the leader in another process failed"""
+
+
+def encode_error(error: Exception) -> str:
+    """JSON form of a leader's exception for the flights table"""
+    encoded = {'message': str(error)}
+    if isinstance(error, Overloaded):
+        encoded['overloaded'] = {'upstream': error.upstream, 'retry_after': error.retry_after}
+    return json.dumps(encoded)
+
+
+def decode_error(error: str) -> Exception:
+    """The exception a follower raises for an encode_error() string"""
+    try:
+        encoded = json.loads(error)
+        message = encoded['message']
+    except (ValueError, TypeError, KeyError):
+        # Plain message written before errors were encoded
+        return RemoteFlightError(error)
+    overloaded = encoded.get('overloaded')
+    if overloaded:
+        return Overloaded(overloaded['upstream'], overloaded['retry_after'])
+    return RemoteFlightError(message)
+
+
+class _Call:
+    __slots__ = ('event', 'result', 'error', 'followers')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.followers = 0
+
+
+class FlightStore:
+    """
+    SQLite lease table shared by worker processes.
+
+    A row per key records the owning leader and lease expiry. When the leader
+    finishes, it stores the JSON result (or error) so waiting processes can
+    pick it up instead of repeating the work. Errors are stored as
+    encode_error() JSON.
+    """
+
+    def __init__(self, path=None, lease_ttl: float = 180.0, share_window: float = 5.0,
+                 poll_interval: float = 0.25):
+        self.path = path or storage.data_path('flights.sqlite3')
+        self.lease_ttl = lease_ttl
+        self.share_window = share_window
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._conn = storage.connect(self.path)
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS flights (
+                key TEXT PRIMARY KEY,
+                owner TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                done INTEGER NOT NULL DEFAULT 0,
+                result BLOB,
+                error TEXT,
+                finished_at REAL
+            )
+        ''')
+        self._conn.commit()
+
+    def try_lead(self, key: str, owner: str) -> Dict:
+        """
+        Try to take the lease for key.
+
+        Returns:
+            {'state': 'lead'} if this caller should run the work,
+            {'state': 'done', 'result': ..., 'error': ...} if another process
+            just finished it, or {'state': 'wait'} while another process runs it
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._conn
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                row = conn.execute(
+                    'SELECT owner, expires_at, done, result, error, finished_at FROM flights WHERE key = ?',
+                    (key,),
+                ).fetchone()
+                if row is not None:
+                    _, expires_at, done, result, error, finished_at = row
+                    if done and finished_at + self.share_window > now:
+                        conn.execute('COMMIT')
+                        return {
+                            'state': 'done',
+                            'result': json.loads(result) if result is not None else None,
+                            'error': error,
+                        }
+                    if not done and expires_at > now:
+                        conn.execute('COMMIT')
+                        return {'state': 'wait'}
+                conn.execute(
+                    'INSERT OR REPLACE INTO flights (key, owner, expires_at, done) VALUES (?, ?, ?, 0)',
+                    (key, owner, now + self.lease_ttl),
+                )
+                conn.execute('COMMIT')
+                return {'state': 'lead'}
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+
+    def finish(self, key: str, owner: str, result=None, error: Optional[str] = None):
+        """Publish the leader's outcome (error from encode_error) and release the lease"""
+        blob = None
+        if error is None:
+            try:
+                blob = json.dumps(result, default=str)
+            except (TypeError, ValueError):
+                # Not shareable; other processes will simply run it themselves
+                blob = None
+        try:
+            with self._lock:
+                if blob is None and error is None:
+                    self._conn.execute('DELETE FROM flights WHERE key = ? AND owner = ?', (key, owner))
+                else:
+                    self._conn.execute(
+                        'UPDATE flights SET done = 1, result = ?, error = ?, finished_at = ? '
+                        'WHERE key = ? AND owner = ?',
+                        (blob, error, time.time(), key, owner),
+                    )
+                self._conn.commit()
+        except Exception as e:
+            logger.warning(f"Could not publish flight result for {key}: {e}")
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key.
+
+    Every caller gets its own deep copy of the result, so callers may mutate
+    what they receive. Exceptions raised by the leader are re-raised in every
+    waiting caller.
+    """
+
+    def __init__(self, store: Optional[FlightStore] = None, wait_timeout: float = DEFAULT_WAIT):
+        self.store = store
+        self.wait_timeout = wait_timeout
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+        self._stats = {'executions': 0, 'shared': 0, 'remote_shared': 0, 'timeouts': 0}
+
+    def do(self, key: str, fn: Callable[[], object], timeout: Optional[float] = None):
+        """
+        Run fn once for all concurrent callers of key.
+
+        Args:
+            key: Normalized request key
+            fn: Zero-argument function doing the upstream work
+            timeout: Seconds a follower waits for the leader (default wait_timeout)
+
+        Raises:
+            SingleFlightTimeout: The wait for another caller's result ran out
+        """
+        timeout = self.wait_timeout if timeout is None else timeout
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.followers += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                leader = True
+
+        if not leader:
+            if not call.event.wait(timeout):
+                self._count('timeouts')
+                raise SingleFlightTimeout(f"Timed out after {timeout}s waiting for in-flight '{key}'")
+            self._count('shared')
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        try:
+            if self.store is not None:
+                call.result = self._run_across_processes(key, fn, timeout)
+            else:
+                call.result = fn()
+                self._count('executions')
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+        return copy.deepcopy(call.result)
+
+    def _run_across_processes(self, key: str, fn: Callable[[], object], timeout: float):
+        owner = f"{os.getpid()}:{uuid.uuid4().hex}"
+        give_up_at = time.monotonic() + timeout
+        while True:
+            outcome = self.store.try_lead(key, owner)
+            if outcome['state'] == 'lead':
+                break
+            if outcome['state'] == 'done':
+                self._count('remote_shared')
+                if outcome['error']:
+                    raise decode_error(outcome['error'])
+                return outcome['result']
+            if time.monotonic() >= give_up_at:
+                self._count('timeouts')
+                raise SingleFlightTimeout(f"Timed out after {timeout}s waiting for '{key}' in another worker")
+            time.sleep(self.store.poll_interval)
+
+        try:
+            result = fn()
+        except Exception as e:
+            self.store.finish(key, owner, error=encode_error(e))
+            raise
+        self._count('executions')
+        self.store.finish(key, owner, result=result)
+        return result
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['in_flight'] = len(self._calls)
+        return stats
+
+
+def create_flights(cross_process: Optional[bool] = None) -> SingleFlight:
+    """
+    Build a SingleFlight, backed by the shared FlightStore when
+    cross-process coalescing is enabled (SCRAPER_CROSS_PROCESS_FLIGHTS=1).
+    """
+    if cross_process is None:
+        cross_process = CROSS_PROCESS
+    return SingleFlight(store=FlightStore() if cross_process else None)
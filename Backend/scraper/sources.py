@@ -0,0 +1,281 @@
+"""
+Marketplace Source Registry
+Each marketplace the comparer searches is a Source plugin with its own
+timeout, priority and concurrency limit. All sources run on one shared,
+long-lived thread pool.
+
+Adding a marketplace:
+
+    class MySource(Source):
+        name = 'mystore'
+        label = 'MyStore'
+        timeout = 10
+
+        def search(self, query, limit):
+            return {'success': True, 'products': [...]}
+
+    default_registry.register(MySource())
+"""
+
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from .admission import Overloaded
+from .cache import ResultCache, make_key
+from .product_index import get_product_index
+from .runtime import get_runtime
+
+logger = logging.getLogger(__name__)
+
+# Size of the shared pool that runs source searches
+SOURCE_WORKERS = 16
+
+
+class Source:
+    """
+    Base class for a marketplace plugin.
+
+    Attributes:
+        name: Key used in comparer results (e.g. 'daraz')
+        label: Display name stamped on products (e.g. 'Daraz')
+        domain: Host the outbound scheduler paces this source's requests
+            under (e.g. 'daraz.com.np'), if any
+        timeout: Seconds the comparer waits for this source
+        priority: Lower values are submitted first
+        max_concurrency: Searches allowed to run at once for this source
+        cache_ttl: Seconds a cached result is fresh
+        stale_ttl: Seconds after that it is still served while refreshing
+        negative_ttl: Seconds an empty or failed result is cached
+    """
+
+    name = ''
+    label = ''
+    domain = ''
+    timeout = 30.0
+    priority = 100
+    max_concurrency = 4
+    cache_ttl = 600
+    stale_ttl = 3600
+    negative_ttl = 60
+
+    def __init__(self):
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._in_flight = 0
+        self._in_flight_lock = threading.Lock()
+
+    @property
+    def in_flight(self) -> int:
+        """Searches currently running or waiting for a slot"""
+        return self._in_flight
+
+    def search(self, query: str, limit: int) -> Dict:
+        """Search the marketplace, returns {'success': bool, 'products': [...], ...}"""
+        raise NotImplementedError
+
+    def fetch(self, query: str, limit: int) -> Dict:
+        """
+        Search within this source's concurrency limit.
+
+        Errors are returned as a failed result, except Overloaded (the
+        upstream's bulkhead rejected the call), which is raised.
+        """
+        with self._in_flight_lock:
+            self._in_flight += 1
+        try:
+            with self._slots:
+                result = self.search(query, limit)
+        except Overloaded:
+            raise
+        except Exception as e:
+            logger.error(f"{self.label} search error: {e}")
+            return {'success': False, 'products': [], 'error': str(e), 'source': self.label}
+        finally:
+            with self._in_flight_lock:
+                self._in_flight -= 1
+
+        result['products'] = result.get('products', [])[:limit]
+        return result
+
+    def run(self, query: str, limit: int, min_rating: float = None,
+            cache: Optional[ResultCache] = None) -> Dict:
+        """
+        Search (or serve from cache) and apply the rating filter.
+
+        Results are cached per (source, normalized query, limit) before
+        rating filtering, so one entry serves every min_rating.
+
+        If the upstream is overloaded, the last cached result is served
+        whatever its age; without one the result is a failure carrying
+        'overloaded' and 'retry_after'. A failed search is answered from
+        the local product index when it has matches ('fallback': 'index').
+        """
+        # Imported here to avoid a circular import with price_compare
+        from .price_compare import filter_by_rating
+
+        try:
+            if cache is None:
+                result = self.fetch(query, limit)
+            else:
+                result, meta = cache.get_or_fetch(
+                    self.cache_key(query, limit),
+                    lambda: self.fetch(query, limit),
+                    ttl=self.cache_ttl,
+                    stale_ttl=self.stale_ttl,
+                    negative_ttl=self.negative_ttl,
+                    is_negative=lambda value: not value.get('products'),
+                )
+                result['cache'] = meta
+        except Overloaded as e:
+            result = self._overloaded(query, limit, cache, e)
+
+        if not result.get('products') and (result.get('error') or result.get('overloaded')):
+            result = self._from_index(query, limit, result)
+        elif result.get('products'):
+            get_product_index().record_query(query)
+        if min_rating is not None:
+            result['products'] = filter_by_rating(result.get('products', []), min_rating)
+        return result
+
+    def _overloaded(self, query: str, limit: int, cache: Optional[ResultCache],
+                    error: Overloaded) -> Dict:
+        """Fallback result when the upstream rejected the search"""
+        entry = cache.peek(self.cache_key(query, limit)) if cache is not None else None
+        if entry is not None and not entry.negative:
+            result = json.loads(entry.blob)
+            result['cache'] = {
+                'key': self.cache_key(query, limit),
+                'status': 'stale',
+                'stored_at': entry.stored_at,
+                'negative': False,
+                'overloaded': True,
+            }
+            return result
+        return {
+            'success': False,
+            'products': [],
+            'error': str(error),
+            'source': self.label,
+            'overloaded': True,
+            'retry_after': error.retry_after,
+        }
+
+    def _from_index(self, query: str, limit: int, result: Dict) -> Dict:
+        """result with this source's indexed products for query, if there are any"""
+        try:
+            products = get_product_index().search(query, limit=limit, source=self.label)
+        except Exception as e:
+            logger.warning(f"{self.label} index fallback failed: {e}")
+            return result
+        if not products:
+            return result
+        return dict(result, products=products, fallback='index')
+
+    def refresh(self, query: str, limit: int, cache: ResultCache) -> Dict:
+        """Fetch and overwrite the cached result, returns the new cache meta"""
+        return cache.store(
+            self.cache_key(query, limit),
+            self.fetch(query, limit),
+            ttl=self.cache_ttl,
+            stale_ttl=self.stale_ttl,
+            negative_ttl=self.negative_ttl,
+            is_negative=lambda value: not value.get('products'),
+        )
+
+    def cache_key(self, query: str, limit: int) -> str:
+        return make_key(self.name, query, limit=limit)
+
+
+class DarazSource(Source):
+    """Daraz Nepal via the Selenium-backed DarazScraper"""
+
+    name = 'daraz'
+    label = 'Daraz'
+    domain = 'daraz.com.np'
+    timeout = 60.0
+    priority = 20
+    max_concurrency = 2
+    cache_ttl = 1800  # Browser scrapes are expensive
+
+    def search(self, query: str, limit: int) -> Dict:
+        with get_runtime().daraz('np') as scraper:  # Nepal
+            result = scraper.search(query, limit=limit)
+
+        products = result.get('products', [])[:limit]
+
+        # Add source identifier to each product
+        for p in products:
+            p['source'] = self.label
+            p['currency'] = 'NPR'
+
+        return {
+            # Success is True if we got products
+            'success': len(products) > 0,
+            'products': products,
+            'total': result.get('total', len(products)),
+            'source': self.label,
+        }
+
+
+class JeeveeSource(Source):
+    """Jeevee via its public JSON API"""
+
+    name = 'jeevee'
+    label = 'Jeevee'
+    domain = 'api.jeevee.com'
+    timeout = 30.0
+    priority = 10
+    max_concurrency = 8
+
+    def search(self, query: str, limit: int) -> Dict:
+        return get_runtime().jeevee().search(query, limit=limit)
+
+
+class SourceRegistry:
+    """Ordered collection of Source plugins"""
+
+    def __init__(self, sources: Optional[List[Source]] = None):
+        self._sources: Dict[str, Source] = {}
+        self._lock = threading.Lock()
+        for source in sources or []:
+            self.register(source)
+
+    def register(self, source: Source) -> Source:
+        """Add (or replace) a source, keyed by its name"""
+        if not source.name:
+            raise ValueError('Source must define a name')
+        with self._lock:
+            self._sources[source.name] = source
+        return source
+
+    def unregister(self, name: str):
+        with self._lock:
+            self._sources.pop(name, None)
+
+    def get(self, name: str) -> Optional[Source]:
+        return self._sources.get(name)
+
+    def sources(self) -> List[Source]:
+        """All registered sources, highest priority first"""
+        with self._lock:
+            return sorted(self._sources.values(), key=lambda s: s.priority)
+
+    def names(self) -> List[str]:
+        return [source.name for source in self.sources()]
+
+
+default_registry = SourceRegistry([JeeveeSource(), DarazSource()])
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Return the shared pool used to run source searches"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=SOURCE_WORKERS, thread_name_prefix='source')
+        return _executor
@@ -0,0 +1,33 @@
+"""
+Local Storage Helpers
+Shared on-disk location and SQLite connections for scraper state
+"""
+
+import os
+import sqlite3
+from pathlib import Path
+
+# All workers on a host share this directory (override with SCRAPER_DATA_DIR)
+DATA_DIR = Path(os.environ.get(
+    'SCRAPER_DATA_DIR',
+    Path(__file__).resolve().parent.parent / '.scraper_data',
+))
+
+
+def data_path(filename: str) -> Path:
+    """Return the path of a file inside the scraper data directory"""
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    return DATA_DIR / filename
+
+
+def connect(path) -> sqlite3.Connection:
+    """
+    Open a SQLite connection that can be shared between threads.
+
+    WAL mode lets several worker processes read while one writes.
+    Callers are responsible for serializing access to the connection.
+    """
+    conn = sqlite3.connect(str(path), timeout=30, check_same_thread=False)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    return conn
@@ -0,0 +1,245 @@
+"""
+Typeahead Suggestions
+An in-memory prefix index over the local product index: scraped product
+names, brands and searches that found products, ranked by popularity.
+Every search for a query adds QUERY_WEIGHT to its score, every indexed
+product adds BRAND_WEIGHT to its brand, and a product name scores
+NAME_WEIGHT.
+
+Terms are kept in one sorted list, so the terms starting with a prefix
+are a contiguous run found with bisect. For prefixes with more than
+SCAN_LIMIT terms the best MAX_SUGGESTIONS are memoized and kept current
+as scores change, so no lookup scans more than SCAN_LIMIT terms.
+
+The index is rebuilt incrementally: each refresh folds in only the
+products and query counts written since the previous one (tracked by
+product rowid and query sequence number), and is swapped in whole. The
+first lookup builds the index before answering; after that lookups never
+wait on a refresh and start one in the background once refresh_interval
+has passed.
+
+    index = get_suggest_index()
+    index.suggest('face w')  # [{'text': 'face wash', 'type': 'query', 'score': 35.0}, ...]
+"""
+
+import bisect
+import heapq
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .product_index import get_product_index
+
+logger = logging.getLogger(__name__)
+
+QUERY_WEIGHT = 5.0
+BRAND_WEIGHT = 1.0
+NAME_WEIGHT = 0.5
+# When one term is several kinds, the first of these is shown
+KINDS = ('query', 'brand', 'product')
+MAX_SUGGESTIONS = 10
+# Prefixes matching more terms than this get their best terms memoized
+SCAN_LIMIT = 256
+# Longer names are cut to this many characters
+MAX_TERM_LENGTH = 100
+# Refreshes adding more new terms than this re-sort instead of inserting
+RESORT_THRESHOLD = 1000
+
+_UPPER = '\U0010ffff'
+
+
+def normalize_prefix(prefix: str) -> str:
+    """Lower-case prefix with single spaces, keeping one trailing space so 'face ' completes the next word"""
+    text = ' '.join(str(prefix).lower().split())
+    if text and str(prefix)[-1:].isspace():
+        text += ' '
+    return text
+
+
+class _Snapshot:
+    """Immutable state of a SuggestIndex; a refresh builds a new one"""
+
+    def __init__(self, keys: List[str], terms: Dict[str, Tuple[float, str, str]], top: Dict[str, List[str]]):
+        self.keys = keys  # sorted lower-case terms
+        self.terms = terms  # key -> (score, display text, kind)
+        self.top = top  # prefix -> best keys, for prefixes matching more than SCAN_LIMIT keys
+
+    def rank(self, key: str) -> Tuple[float, int]:
+        # Higher score first, then shorter
+        return self.terms[key][0], -len(key)
+
+
+class SuggestIndex:
+    """Sorted-array prefix index over names, brands and successful queries"""
+
+    def __init__(self, product_index=None, refresh_interval: float = 30.0):
+        self.product_index = product_index
+        self.refresh_interval = refresh_interval
+        self._snapshot = _Snapshot([], {}, {})
+        self._product_rowid = 0
+        self._query_seq = 0
+        self._query_hits: Dict[str, int] = {}  # hits already counted, so refreshes add only the increase
+        self._refreshed_at: Optional[float] = None
+        self._built = False
+        self._refresh_lock = threading.Lock()
+        self._memo_lock = threading.Lock()
+
+    def suggest(self, prefix: str, limit: int = MAX_SUGGESTIONS) -> List[Dict]:
+        """
+        Most popular terms starting with prefix.
+
+        Returns:
+            Up to limit (at most MAX_SUGGESTIONS) dicts with 'text', 'type'
+            ('query', 'brand' or 'product') and 'score', best first
+        """
+        self._maybe_refresh()
+        prefix = normalize_prefix(prefix)
+        if not prefix:
+            return []
+        snapshot = self._snapshot
+        keys = snapshot.top.get(prefix)
+        if keys is None:
+            keys = self._best(snapshot, prefix)
+        suggestions = []
+        for key in keys[:max(0, min(limit, MAX_SUGGESTIONS))]:
+            score, text, kind = snapshot.terms[key]
+            suggestions.append({'text': text, 'type': kind, 'score': round(score, 2)})
+        return suggestions
+
+    def _best(self, snapshot: _Snapshot, prefix: str) -> List[str]:
+        lo = bisect.bisect_left(snapshot.keys, prefix)
+        hi = bisect.bisect_left(snapshot.keys, prefix + _UPPER, lo)
+        best = heapq.nlargest(MAX_SUGGESTIONS, snapshot.keys[lo:hi], key=snapshot.rank)
+        if hi - lo > SCAN_LIMIT:
+            # Memoized in place: the entry is exact for this snapshot, and
+            # refreshes carry it forward
+            with self._memo_lock:
+                snapshot.top[prefix] = best
+        return best
+
+    def _maybe_refresh(self):
+        if not self._built:
+            # Answer the first lookups from the product index rather than
+            # an empty snapshot; callers arriving meanwhile wait on the lock
+            self._try_refresh()
+            return
+        now = time.monotonic()
+        if self._refreshed_at is not None and now - self._refreshed_at < self.refresh_interval:
+            return
+        if self._refresh_lock.locked():
+            return
+        self._refreshed_at = now
+        threading.Thread(target=self._try_refresh, name='suggest-refresh', daemon=True).start()
+
+    def _try_refresh(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            logger.warning(f"Suggest index refresh failed: {e}")
+        finally:
+            self._built = True
+
+    def refresh(self) -> int:
+        """
+        Fold products and query counts written to the product index since
+        the last refresh into the index.
+
+        Returns:
+            Number of terms added or rescored
+        """
+        with self._refresh_lock:
+            self._refreshed_at = time.monotonic()
+            index = self.product_index or get_product_index()
+            index.flush()
+            updates: Dict[str, Tuple[float, str, str]] = {}
+
+            while True:
+                rows = index.products_since(self._product_rowid)
+                if not rows:
+                    break
+                for rowid, name, brand in rows:
+                    _bump(updates, name, 'product', NAME_WEIGHT)
+                    if brand:
+                        _bump(updates, brand, 'brand', BRAND_WEIGHT)
+                self._product_rowid = rows[-1][0]
+
+            for query, hits, seq in index.queries_since(self._query_seq):
+                increase = hits - self._query_hits.get(query, 0)
+                self._query_hits[query] = hits
+                if increase > 0:
+                    _bump(updates, query, 'query', QUERY_WEIGHT * increase)
+                self._query_seq = seq
+
+            if updates:
+                self._apply(updates)
+            return len(updates)
+
+    def _apply(self, updates: Dict[str, Tuple[float, str, str]]):
+        """Build the next snapshot with updates' scores added and swap it in"""
+        old = self._snapshot
+        terms = dict(old.terms)
+        new_keys = []
+        for key, (weight, text, kind) in updates.items():
+            current = terms.get(key)
+            if current is None:
+                new_keys.append(key)
+                terms[key] = (weight, text, kind)
+            else:
+                score, shown, shown_kind = current
+                if KINDS.index(kind) < KINDS.index(shown_kind):
+                    shown, shown_kind = text, kind
+                terms[key] = (score + weight, shown, shown_kind)
+
+        if len(new_keys) > RESORT_THRESHOLD:
+            snapshot = _Snapshot(sorted(old.keys + new_keys), terms, {})
+        else:
+            keys = list(old.keys)
+            for key in new_keys:
+                bisect.insort(keys, key)
+            with self._memo_lock:
+                top = dict(old.top)
+            snapshot = _Snapshot(keys, terms, top)
+            # Scores only grow, so a memoized list changes only by taking in
+            # keys whose score rose
+            for key in updates:
+                for end in range(1, len(key) + 1):
+                    best = top.get(key[:end])
+                    if best is not None and (key in best or snapshot.rank(key) > snapshot.rank(best[-1])):
+                        best = set(best)
+                        best.add(key)
+                        top[key[:end]] = heapq.nlargest(MAX_SUGGESTIONS, best, key=snapshot.rank)
+        self._snapshot = snapshot
+
+    def stats(self) -> Dict:
+        snapshot = self._snapshot
+        return {
+            'terms': len(snapshot.keys),
+            'memoized_prefixes': len(snapshot.top),
+            'products_seen': self._product_rowid,
+            'queries_seen': len(self._query_hits),
+        }
+
+
+def _bump(updates: Dict[str, Tuple[float, str, str]], text: str, kind: str, weight: float):
+    text = ' '.join(str(text).split())[:MAX_TERM_LENGTH].strip()
+    key = text.lower()
+    if not key:
+        return
+    score, shown, shown_kind = updates.get(key, (0.0, text, kind))
+    if KINDS.index(kind) < KINDS.index(shown_kind):
+        shown, shown_kind = text, kind
+    updates[key] = (score + weight, shown, shown_kind)
+
+
+_default_index: Optional[SuggestIndex] = None
+_default_lock = threading.Lock()
+
+
+def get_suggest_index() -> SuggestIndex:
+    """Return the process-wide suggest index, creating it on first use"""
+    global _default_index
+    with _default_lock:
+        if _default_index is None:
+            _default_index = SuggestIndex()
+        return _default_index
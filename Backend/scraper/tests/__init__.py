@@ -0,0 +1,19 @@
+"""
+Tests for the scraper package. Run from Backend/ with `python manage.py test`.
+
+Importing this package points scraper storage at a temporary directory, so
+tests never touch the real SCRAPER_DATA_DIR. The outbound scheduler the app
+created at startup is replaced by one stored there too.
+"""
+
+import atexit
+import shutil
+import tempfile
+from pathlib import Path
+
+from scraper import storage
+from scraper.politeness import configure_outbound
+
+storage.DATA_DIR = Path(tempfile.mkdtemp(prefix='scraper-tests-'))
+atexit.register(shutil.rmtree, storage.DATA_DIR, ignore_errors=True)
+configure_outbound()
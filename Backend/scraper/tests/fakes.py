@@ -0,0 +1,109 @@
+"""Stand-ins for marketplaces, so tests never reach a real upstream"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+from scraper.price_compare import PriceComparer
+from scraper.runtime import get_runtime
+from scraper.sources import Source, SourceRegistry
+
+
+class FakeSource(Source):
+    """
+    Source answering from a fixed product list.
+
+    Args:
+        name: Source name; the label is its title case
+        products: Returned (as copies) by every search
+        delay: Seconds each search takes
+        error: Exception raised by every search instead
+    """
+
+    def __init__(self, name, products=(), delay=0.0, error=None, timeout=5.0, priority=100):
+        self.name = name
+        self.label = name.title()
+        self.timeout = timeout
+        self.priority = priority
+        super().__init__()
+        self.products = list(products)
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        self._calls_lock = threading.Lock()
+
+    def search(self, query, limit):
+        with self._calls_lock:
+            self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return {
+            'success': bool(self.products),
+            'products': [dict(p, source=self.label) for p in self.products],
+            'source': self.label,
+        }
+
+
+@contextmanager
+def runtime_comparer(*sources, **options):
+    """
+    Make the runtime's shared PriceComparer search only `sources` (and
+    skip the result cache unless cache= is given) for the block.
+    """
+    runtime = get_runtime()
+    options.setdefault('use_cache', 'cache' in options)
+    comparer = PriceComparer(registry=SourceRegistry(list(sources)), **options)
+    previous, runtime._comparer = runtime._comparer, comparer
+    try:
+        yield comparer
+    finally:
+        runtime._comparer = previous
+
+
+class FakeJeevee:
+    """
+    Jeevee scraper whose search page N holds products 'N-0', 'N-1', ...
+    with has_next until the last page.
+
+    Args:
+        per_page: Products on every page
+        pages: Number of pages
+    """
+
+    def __init__(self, per_page=2, pages=3):
+        self.per_page = per_page
+        self.pages = pages
+        self.calls = []  # page of each search
+        self.closed = False
+
+    def search(self, query, page=1, limit=20):
+        self.calls.append(page)
+        return {
+            'success': True,
+            'products': [{'id': f'{page}-{i}', 'name': query, 'price': i} for i in range(self.per_page)],
+            'has_next': page < self.pages,
+        }
+
+    def close(self):
+        self.closed = True
+
+
+@contextmanager
+def runtime_jeevee(prefetcher, jeevee=None):
+    """
+    Make the runtime's Jeevee scraper `jeevee` (a new FakeJeevee by default)
+    for the block, with prefetcher's Jeevee next-page prefetch off so no
+    background fetch outlives the fake.
+    """
+    runtime = get_runtime()
+    jeevee = FakeJeevee() if jeevee is None else jeevee
+    previous, runtime._jeevee = runtime._jeevee, jeevee
+    enabled = dict(prefetcher.enabled)
+    prefetcher.set_enabled('jeevee', False)
+    try:
+        yield jeevee
+    finally:
+        runtime._jeevee = previous
+        prefetcher.enabled = enabled
@@ -0,0 +1,110 @@
+import threading
+import time
+import unittest
+
+from scraper import admission
+from scraper.admission import Bulkhead, Overloaded, configure_bulkheads, get_bulkhead
+
+
+class BulkheadTests(unittest.TestCase):
+    def test_queued_caller_gets_the_freed_slot(self):
+        bulkhead = Bulkhead('test', max_concurrent=1, max_queue=1, max_wait=5.0, service_time=0.1)
+        waits = []
+
+        def waiter():
+            with bulkhead.slot() as queue_time:
+                waits.append(queue_time)
+
+        with bulkhead.slot():
+            thread = threading.Thread(target=waiter)
+            thread.start()
+            while not bulkhead.queued:
+                time.sleep(0.005)
+            self.assertEqual(bulkhead.stats()['queued_now'], 1)
+            time.sleep(0.05)
+        thread.join(timeout=5)
+        self.assertEqual(len(waits), 1)
+        self.assertGreater(waits[0], 0.0)
+        self.assertEqual(bulkhead.stats()['queued'], 1)
+
+    def test_full_queue_is_rejected_at_once(self):
+        bulkhead = Bulkhead('test', max_concurrent=1, max_queue=0, max_wait=5.0, service_time=2.0)
+        with bulkhead.slot():
+            started = time.monotonic()
+            with self.assertRaises(Overloaded) as caught:
+                with bulkhead.slot():
+                    pass
+            self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual(caught.exception.upstream, 'test')
+        self.assertEqual(caught.exception.retry_after, 2)
+        self.assertEqual(bulkhead.stats()['rejected'], 1)
+
+    def test_long_estimated_wait_is_rejected(self):
+        bulkhead = Bulkhead('test', max_concurrent=1, max_queue=5, max_wait=1.0, service_time=3.0)
+        with bulkhead.slot():
+            self.assertEqual(bulkhead.estimate_wait(), 3.0)
+            with self.assertRaises(Overloaded):
+                with bulkhead.slot():
+                    pass
+
+    def test_estimate_counts_whole_rounds_of_slots(self):
+        bulkhead = Bulkhead('test', max_concurrent=2, service_time=1.5)
+        self.assertEqual(bulkhead.estimate_wait(), 0.0)
+        bulkhead.active, bulkhead.queued = 2, 2
+        # Two ahead in the queue plus this caller need two more rounds
+        self.assertEqual(bulkhead.estimate_wait(), 3.0)
+
+    def test_wait_times_out(self):
+        bulkhead = Bulkhead('test', max_concurrent=1, max_queue=1, max_wait=0.1, service_time=0.05)
+        with bulkhead.slot():
+            with self.assertRaises(Overloaded):
+                with bulkhead.slot():
+                    pass
+        stats = bulkhead.stats()
+        self.assertEqual(stats['timed_out'], 1)
+        self.assertEqual(stats['queued_now'], 0)
+
+    def test_slot_is_released_when_the_call_fails(self):
+        bulkhead = Bulkhead('test', max_concurrent=1)
+        with self.assertRaises(RuntimeError):
+            with bulkhead.slot():
+                raise RuntimeError('upstream failed')
+        self.assertEqual(bulkhead.active, 0)
+
+    def test_service_time_follows_recent_calls(self):
+        bulkhead = Bulkhead('test', service_time=10.0)
+        with bulkhead.slot():
+            pass
+        self.assertAlmostEqual(bulkhead.service_time, 8.0, places=1)
+
+    def test_stats(self):
+        bulkhead = Bulkhead('test', max_concurrent=4)
+        with bulkhead.slot():
+            stats = bulkhead.stats()
+        self.assertEqual(stats['active'], 1)
+        self.assertEqual(stats['admitted'], 1)
+        self.assertEqual(stats['background_limit'], 2)
+        self.assertEqual(stats['avg_queue_time'], 0.0)
+
+    def test_background_limit_leaves_a_live_slot(self):
+        self.assertEqual(Bulkhead('test', max_concurrent=1).background_limit, 0)
+        self.assertEqual(Bulkhead('test', max_concurrent=2, background_share=1.0).background_limit, 1)
+
+
+class RegistryTests(unittest.TestCase):
+    def setUp(self):
+        saved = dict(admission._bulkheads)
+        self.addCleanup(lambda: (admission._bulkheads.clear(), admission._bulkheads.update(saved)))
+
+    def test_get_bulkhead_uses_defaults(self):
+        admission._bulkheads.pop('jeevee', None)
+        bulkhead = get_bulkhead('jeevee')
+        self.assertIs(get_bulkhead('jeevee'), bulkhead)
+        self.assertEqual(bulkhead.max_concurrent, admission.DEFAULT_BULKHEADS['jeevee']['max_concurrent'])
+
+    def test_configure_overrides_only_given_keys(self):
+        configure_bulkheads({'jeevee': {'max_concurrent': 3}})
+        bulkhead = get_bulkhead('jeevee')
+        self.assertEqual(bulkhead.max_concurrent, 3)
+        self.assertEqual(bulkhead.max_queue, admission.DEFAULT_BULKHEADS['jeevee']['max_queue'])
+        self.assertIn('jeevee', admission.bulkhead_stats())
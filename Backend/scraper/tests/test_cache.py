@@ -0,0 +1,115 @@
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from scraper.cache import CacheEntry, LRUCache, ResultCache, make_key
+
+from .fakes import FakeSource
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError('condition not met in time')
+        time.sleep(0.01)
+
+
+class MakeKeyTests(unittest.TestCase):
+    def test_normalizes_query_and_sorts_params(self):
+        self.assertEqual(make_key('daraz', ' Face  Wash', limit=20, page=2), 'daraz|face wash|limit=20|page=2')
+
+
+class LRUCacheTests(unittest.TestCase):
+    def entry(self, size):
+        return CacheEntry(b'x' * size, 0, 0, 0)
+
+    def test_evicts_least_recently_used_by_size(self):
+        lru = LRUCache(max_bytes=30)
+        lru.set('a', self.entry(10))
+        lru.set('b', self.entry(10))
+        lru.set('c', self.entry(10))
+        lru.get('a')
+        lru.set('d', self.entry(10))
+        self.assertIsNone(lru.get('b'))
+        self.assertIsNotNone(lru.get('a'))
+        self.assertEqual((lru.size, lru.evictions), (30, 1))
+
+    def test_oversized_entries_are_not_kept(self):
+        lru = LRUCache(max_bytes=5)
+        lru.set('a', self.entry(10))
+        self.assertEqual(len(lru), 0)
+
+
+class ResultCacheTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = Path(tmp.name) / 'results.sqlite3'
+        self.cache = ResultCache(disk_path=self.path)
+
+    def test_miss_then_fresh_hit(self):
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            return {'products': [1]}
+
+        value, meta = self.cache.get_or_fetch('k', fetch)
+        self.assertEqual((value, meta['status']), ({'products': [1]}, 'miss'))
+        value, meta = self.cache.get_or_fetch('k', fetch)
+        self.assertEqual((value, meta['status']), ({'products': [1]}, 'fresh'))
+        self.assertEqual(len(calls), 1)
+
+    def test_reads_are_copies(self):
+        self.cache.set('k', {'products': [1]})
+        value, _ = self.cache.get('k')
+        value['products'].append(2)
+        self.assertEqual(self.cache.get('k')[0], {'products': [1]})
+
+    def test_stale_is_served_while_refreshing(self):
+        self.cache.set('k', {'v': 'old'}, ttl=0, stale_ttl=60)
+        value, meta = self.cache.get_or_fetch('k', lambda: {'v': 'new'})
+        self.assertEqual((value, meta['status']), ({'v': 'old'}, 'stale'))
+        wait_for(lambda: self.cache.stats()['refreshes'] == 1)
+        value, meta = self.cache.get('k')
+        self.assertEqual((value, meta['status']), ({'v': 'new'}, 'fresh'))
+
+    def test_failed_refresh_keeps_stale_value(self):
+        self.cache.set('k', {'v': 'old'}, ttl=0, stale_ttl=60)
+        self.cache.get_or_fetch('k', lambda: {})
+        wait_for(lambda: self.cache.stats()['refresh_errors'] == 1)
+        self.assertEqual(self.cache.get('k')[0], {'v': 'old'})
+
+    def test_empty_results_are_negative(self):
+        _, meta = self.cache.get_or_fetch('k', lambda: {}, negative_ttl=60)
+        self.assertTrue(meta['negative'])
+        value, meta = self.cache.get_or_fetch('k', lambda: {'v': 1})
+        self.assertEqual((value, meta['status'], meta['negative']), ({}, 'fresh', True))
+        self.assertEqual(self.cache.stats()['negative_hits'], 1)
+
+    def test_expired_entries_are_misses(self):
+        self.cache.set('k', {'v': 1}, ttl=0, stale_ttl=0)
+        self.assertIsNone(self.cache.get('k'))
+        self.assertIsNotNone(self.cache.peek('k'))
+        self.assertEqual(self.cache.disk.purge_expired(), 1)
+
+    def test_disk_tier_is_shared(self):
+        self.cache.set('k', {'v': 1}, ttl=0, stale_ttl=60)
+        other = ResultCache(disk_path=self.path)
+        self.assertEqual(other.get('k')[0], {'v': 1})
+        self.assertEqual(other.stats()['disk_hits'], 1)
+        # Another worker's refresh replaces this worker's stale memory copy
+        other.set('k', {'v': 2})
+        value, meta = self.cache.get('k')
+        self.assertEqual((value, meta['status']), ({'v': 2}, 'fresh'))
+
+    def test_source_results_are_cached_before_rating_filter(self):
+        source = FakeSource('shop', [{'id': 1, 'name': 'a', 'rating': 5}, {'id': 2, 'name': 'b', 'rating': 3}])
+        first = source.run('cached soap', 10, min_rating=4, cache=self.cache)
+        second = source.run('Cached  Soap', 10, min_rating=None, cache=self.cache)
+        self.assertEqual(source.calls, 1)
+        self.assertEqual(len(first['products']), 1)
+        self.assertEqual(len(second['products']), 2)
+        self.assertEqual(second['cache']['status'], 'fresh')
@@ -0,0 +1,140 @@
+import random
+import unittest
+
+from scraper import facets
+from scraper.facets import _Columns, _facet_numpy, _facet_python, facet_products, parse_facet_query
+from scraper.tests.fakes import FakeSource, runtime_comparer
+
+
+def make_products(count, seed=11):
+    rng = random.Random(seed)
+    products = []
+    for i in range(count):
+        products.append({
+            'id': i,
+            'price': rng.choice([str(rng.randint(50, 3000)), rng.randint(50, 3000), None, 'n/a']),
+            'rating': rng.choice([rng.randint(0, 50) / 10, None]),
+            'discount': rng.choice([f'-{rng.randint(0, 70)}%', None]),
+            'source': rng.choice(['Jeevee', 'Daraz', 'jeevee', '']),
+            'brand': rng.choice(['Cetaphil', 'CeraVe', 'cerave', None, 'Simple']),
+        })
+    return products
+
+
+class ParseFacetQueryTests(unittest.TestCase):
+    def test_nothing_sent(self):
+        self.assertIsNone(parse_facet_query({'q': 'toner'}))
+
+    def test_parses_filters(self):
+        query = parse_facet_query({'min_price': '100', 'source': 'Jeevee, daraz', 'bins': '500'})
+        self.assertEqual(query.ranges, {'min_price': 100.0})
+        self.assertEqual(query.sources, ('jeevee', 'daraz'))
+        self.assertFalse(query.facets)
+        self.assertEqual(query.bins, facets.MAX_BINS)
+
+    def test_rejects_bad_numbers(self):
+        with self.assertRaises(ValueError):
+            parse_facet_query({'max_price': 'cheap'})
+        with self.assertRaises(ValueError):
+            parse_facet_query({'facets': 'true', 'bins': 'many'})
+
+
+class FacetProductsTests(unittest.TestCase):
+    def test_filters_keep_order_and_drop_missing_values(self):
+        products = [{'price': '300'}, {'price': None}, {'price': '100'}, {'price': '900'}]
+        result = facet_products(products, parse_facet_query({'max_price': '500'}))
+        self.assertEqual(result['products'], [products[0], products[2]])
+        self.assertEqual(result['matched'], 2)
+        self.assertIsNone(result['facets'])
+
+    def test_counts_ignore_their_own_filter(self):
+        products = [
+            {'price': '100', 'source': 'Jeevee', 'brand': 'CeraVe'},
+            {'price': '200', 'source': 'Daraz', 'brand': 'cerave'},
+            {'price': '300', 'source': 'Daraz', 'brand': 'Simple'},
+        ]
+        result = facet_products(products, parse_facet_query({'source': 'daraz', 'facets': 'true'}))
+        self.assertEqual(result['matched'], 2)
+        self.assertEqual(result['facets']['source'], {'jeevee': 1, 'daraz': 2})
+        self.assertEqual(result['facets']['brand'], {'CeraVe': 1, 'Simple': 1})
+        self.assertEqual(result['facets']['price'], {'min': 200.0, 'max': 300.0})
+
+    def test_nothing_matches(self):
+        result = facet_products([{'price': '10'}], parse_facet_query({'min_price': '50', 'facets': '1'}))
+        self.assertEqual(result['matched'], 0)
+        self.assertIsNone(result['facets']['price'])
+        self.assertIsNone(result['facets']['price_histogram'])
+
+
+@unittest.skipUnless(facets.NUMPY_AVAILABLE, 'numpy is not installed')
+class NumpyParityTests(unittest.TestCase):
+    def assertSameSummary(self, products, params):
+        columns = _Columns(products)
+        query = parse_facet_query(params)
+        vectorized, plain = _facet_numpy(columns, query), _facet_python(columns, query)
+        self.assertEqual(vectorized[0], plain[0])
+        if plain[1] is None:
+            self.assertIsNone(vectorized[1])
+            return
+        (v_sources, v_brands, v_ranges, v_histogram), (sources, brands, ranges, histogram) = vectorized[1], plain[1]
+        self.assertEqual(v_sources, sources)
+        self.assertEqual(v_brands, brands)
+        self.assertEqual(v_ranges, ranges)
+        if histogram is None:
+            self.assertIsNone(v_histogram)
+        else:
+            self.assertEqual([round(e, 6) for e in v_histogram[0]], [round(e, 6) for e in histogram[0]])
+            self.assertEqual(v_histogram[1], histogram[1])
+
+    def test_same_results_on_mixed_fields(self):
+        products = make_products(400)
+        for params in (
+            {'facets': '1'},
+            {'facets': '1', 'min_price': '500', 'max_price': '2000'},
+            {'facets': '1', 'min_discount': '20', 'brand': 'cerave,simple', 'bins': '7'},
+            {'source': 'jeevee', 'max_price': '1000'},
+        ):
+            with self.subTest(params=params):
+                self.assertSameSummary(products, params)
+
+    def test_same_results_when_every_field_is_missing(self):
+        products = [{'price': None, 'rating': 'n/a', 'discount': None} for _ in range(5)]
+        self.assertSameSummary(products, {'facets': '1'})
+        self.assertSameSummary(products, {'facets': '1', 'min_price': '1'})
+
+    def test_same_results_when_every_price_is_equal(self):
+        products = [{'price': '250', 'source': 'Jeevee'} for _ in range(6)] + [{'price': None}]
+        self.assertSameSummary(products, {'facets': '1', 'bins': '4'})
+
+
+def toners(prefix, prices):
+    return [{'id': f'{prefix}{i}', 'name': f'{prefix} toner {i}', 'price': str(price), 'rating': 4.5}
+            for i, price in enumerate(prices)]
+
+
+class LowestPricesFacetTests(unittest.TestCase):
+    def test_filters_apply_before_the_top_products_are_picked(self):
+        sources = (FakeSource('jeevee', toners('j', [500, 600, 700])),
+                   FakeSource('daraz', toners('d', [100, 200, 300])))
+        with runtime_comparer(*sources) as comparer:
+            by_source = comparer.get_lowest_prices('facet toner', limit=2, min_rating=None,
+                                                   facet_query=parse_facet_query({'source': 'jeevee',
+                                                                                  'facets': 'true'}))
+            by_price = comparer.get_lowest_prices('facet toner', limit=2, min_rating=None,
+                                                  facet_query=parse_facet_query({'min_price': '150'}))
+        # Each source returns its first `limit` products; the filters see all of them
+        self.assertEqual([p['price'] for p in by_source['products']], ['500', '600'])
+        self.assertEqual(by_source['matched'], 2)
+        self.assertEqual(by_source['facets']['source'], {'jeevee': 2, 'daraz': 2})
+        self.assertEqual(by_source['facets']['price'], {'min': 500.0, 'max': 600.0})
+        self.assertEqual([p['price'] for p in by_price['products']], ['200', '500'])
+        self.assertEqual(by_price['total'], 2)
+        self.assertEqual(by_price['matched'], 3)
+        self.assertNotIn('facets', by_price)
+
+    def test_no_facet_query_leaves_the_result_unchanged(self):
+        with runtime_comparer(FakeSource('jeevee', toners('j', [300, 100]))) as comparer:
+            data = comparer.get_lowest_prices('plain toner', limit=5, min_rating=None)
+        self.assertNotIn('matched', data)
+        self.assertNotIn('facets', data)
+        self.assertEqual([p['price'] for p in data['products']], ['100', '300'])
@@ -0,0 +1,139 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from scraper.jobs import InvalidJobParams, JobQueue, JobWorker, comparison_params
+from scraper.tests.fakes import FakeSource, runtime_comparer
+
+
+class JobQueueTests(unittest.TestCase):
+    def setUp(self):
+        self.dir = Path(tempfile.mkdtemp(prefix='jobs-'))
+        self.addCleanup(shutil.rmtree, self.dir, True)
+        self.queue = JobQueue(self.dir / 'jobs.sqlite3', retry_delay=0.0)
+        self.addCleanup(self.queue._conn.close)
+
+    def test_unknown_kind(self):
+        with self.assertRaises(ValueError):
+            self.queue.submit('mine_bitcoin', {})
+
+    def test_claim_and_complete(self):
+        job = self.queue.submit('compare', {'query': 'soap'})
+        self.assertEqual(job['status'], 'queued')
+        claimed = self.queue.claim('w1')
+        self.assertEqual((claimed['id'], claimed['attempts']), (job['id'], 1))
+        self.assertIsNone(self.queue.claim('w2'))
+        self.assertFalse(self.queue.complete(job['id'], 'w2', {'ok': False}))
+        self.assertTrue(self.queue.complete(job['id'], 'w1', {'ok': True}))
+        done = self.queue.get(job['id'], with_result=True)
+        self.assertEqual((done['status'], done['result']), ('done', {'ok': True}))
+        self.assertEqual(self.queue.stats()['done'], 1)
+
+    def test_failures_retry_until_max_attempts(self):
+        job = self.queue.submit('compare', {'query': 'soap'}, max_attempts=2)
+        self.queue.fail(self.queue.claim('w')['id'], 'w', 'boom')
+        self.assertEqual(self.queue.get(job['id'])['status'], 'queued')
+        self.queue.fail(self.queue.claim('w')['id'], 'w', 'boom again')
+        failed = self.queue.get(job['id'])
+        self.assertEqual((failed['status'], failed['error'], failed['attempts']), ('failed', 'boom again', 2))
+
+    def test_fail_without_retry(self):
+        job = self.queue.submit('compare', {'query': 'soap'})
+        self.queue.fail(self.queue.claim('w')['id'], 'w', 'bad params', retry=False)
+        self.assertEqual(self.queue.get(job['id'])['status'], 'failed')
+
+    def test_expired_lease_is_claimed_again(self):
+        job = self.queue.submit('compare', {'query': 'soap'})
+        self.queue.claim('dead', lease_ttl=-1)
+        reclaimed = self.queue.claim('alive')
+        self.assertEqual((reclaimed['id'], reclaimed['attempts']), (job['id'], 2))
+        self.assertFalse(self.queue.heartbeat(job['id'], 'dead'))
+        self.assertTrue(self.queue.heartbeat(job['id'], 'alive'))
+
+    def test_purge_expired(self):
+        self.queue.result_ttl = -1
+        job = self.queue.submit('compare', {'query': 'soap'})
+        self.queue.complete(self.queue.claim('w')['id'], 'w', {})
+        self.assertIsNone(self.queue.get(job['id']))
+        self.assertEqual(self.queue.purge_expired(), 1)
+
+
+class ComparisonParamsTests(unittest.TestCase):
+    def test_defaults_match_the_endpoints(self):
+        params = comparison_params({'query': 'soap'}, sort=True)
+        self.assertEqual(params, {'query': 'soap', 'limit': 20, 'min_rating': 4.0, 'sort': 'price_asc'})
+
+    def test_coercion(self):
+        params = comparison_params({'query': 'soap', 'limit': '5', 'min_rating': '0'})
+        self.assertEqual((params['limit'], params['min_rating']), (5, 0.0))
+        self.assertNotIn('sort', params)
+        # Normalized params stay the same when checked again in the worker
+        self.assertEqual(comparison_params(params), params)
+
+    def test_invalid(self):
+        for params in ({'limit': 'ten'}, {'limit': None}, {'min_rating': 'high'}, {'min_rating': [4]},
+                       {'sort': 'cheapest'}):
+            with self.subTest(params=params), self.assertRaises(InvalidJobParams):
+                comparison_params(dict(params, query='soap'), sort=True)
+        with self.assertRaises(InvalidJobParams):
+            comparison_params({'limit': 5})
+
+
+class JobWorkerTests(unittest.TestCase):
+    def setUp(self):
+        self.dir = Path(tempfile.mkdtemp(prefix='jobs-'))
+        self.addCleanup(shutil.rmtree, self.dir, True)
+        self.queue = JobQueue(self.dir / 'jobs.sqlite3', retry_delay=60.0)
+        self.addCleanup(self.queue._conn.close)
+        self.worker = JobWorker(self.queue, concurrency=2)
+
+    def test_runs_lowest_prices(self):
+        products = [{'id': 'a', 'name': 'soap', 'price': '90', 'rating': '3.5'},
+                    {'id': 'b', 'name': 'soap bar', 'price': '80', 'rating': 4.5}]
+        job = self.queue.submit('lowest_prices', {'query': 'job soap', 'limit': '10', 'min_rating': '4'})
+        with runtime_comparer(FakeSource('jeevee', products)):
+            self.assertEqual(self.worker.run_once(), 1)
+        result = self.queue.get(job['id'], with_result=True)
+        self.assertEqual(result['status'], 'done')
+        self.assertEqual([p['id'] for p in result['result']['products']], ['b'])
+
+    def test_bad_params_are_not_retried(self):
+        job = self.queue.submit('lowest_prices', {'query': 'job soap', 'sort': 'cheapest'})
+        with self.assertLogs('scraper.jobs', 'WARNING'):
+            self.worker.run_once()
+        failed = self.queue.get(job['id'])
+        self.assertEqual((failed['status'], failed['attempts']), ('failed', 1))
+        self.assertIn('sort must be one of', failed['error'])
+
+    def test_missing_params_are_not_retried(self):
+        jobs = [self.queue.submit('compare', {}), self.queue.submit('daraz_pages', {'query': 'x', 'pages': 'all'})]
+        with self.assertLogs('scraper.jobs', 'WARNING'):
+            self.worker.run_once()
+        for job in jobs:
+            failed = self.queue.get(job['id'])
+            self.assertEqual((failed['status'], failed['attempts']), ('failed', 1))
+
+    def test_value_errors_while_scraping_are_retried(self):
+        job = self.queue.submit('compare', {'query': 'job soap'})
+        def search_all(*args, **kwargs):
+            raise ValueError('Expecting value: line 1 column 1 (char 0)')
+
+        with runtime_comparer() as comparer:
+            comparer.search_all = search_all
+            with self.assertLogs('scraper.jobs', 'WARNING'):
+                self.worker.run_once()
+        self.assertEqual(self.queue.get(job['id'])['status'], 'queued')
+
+    def test_other_errors_are_retried(self):
+        job = self.queue.submit('compare', {'query': 'job soap'})
+        def search_all(*args, **kwargs):
+            raise RuntimeError('down')
+
+        with runtime_comparer() as comparer:
+            comparer.search_all = search_all
+            with self.assertLogs('scraper.jobs', 'WARNING'):
+                self.worker.run_once()
+        retried = self.queue.get(job['id'])
+        self.assertEqual(retried['status'], 'queued')
+        self.assertEqual(retried['error'], 'down')
@@ -0,0 +1,42 @@
+import os
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+from import_budget import DJANGO_BOOT, FORBIDDEN
+from scraper import daraz, storage
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+LOADED = (
+    "import sys; "
+    "print(' '.join(sorted({name.split('.')[0] for name in sys.modules} & set(sys.argv[1:]))))"
+)
+
+
+def loaded_browser_modules(code):
+    """Browser libraries in sys.modules after running code in a fresh interpreter"""
+    result = subprocess.run(
+        [sys.executable, '-c', f'{code}; {LOADED}', *FORBIDDEN],
+        cwd=BACKEND_DIR, capture_output=True, text=True, timeout=60,
+        # Django boot opens the outbound scheduler's SQLite file
+        env=dict(os.environ, SCRAPER_DATA_DIR=str(storage.DATA_DIR)),
+    )
+    if result.returncode != 0:
+        raise AssertionError(result.stderr)
+    return result.stdout.split()
+
+
+class LazyImportTests(unittest.TestCase):
+    def test_scraper_package_skips_browser_libraries(self):
+        self.assertEqual(loaded_browser_modules('import scraper, scraper.daraz, scraper.runtime'), [])
+
+    def test_web_worker_boot_skips_browser_libraries(self):
+        self.assertEqual(loaded_browser_modules(DJANGO_BOOT), [])
+
+    def test_browser_libs_are_loaded_once(self):
+        libs = daraz._browser_libs()
+        self.assertIs(daraz._browser_libs(), libs)
+        self.assertIsInstance(libs.UNDETECTED_AVAILABLE, bool)
+        self.assertIsInstance(libs.SELENIUM_AVAILABLE, bool)
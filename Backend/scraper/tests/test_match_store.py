@@ -0,0 +1,73 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from scraper.match_store import MatchStore, match_confidence
+from scraper.price_compare import PriceComparer
+
+
+class MatchStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.store = MatchStore(Path(self.tmp.name) / 'matches.sqlite3')
+
+    def test_confidence_buckets(self):
+        self.assertEqual(match_confidence(0.9), 'high')
+        self.assertEqual(match_confidence(0.85), 'high')
+        self.assertEqual(match_confidence(0.7), 'medium')
+        self.assertEqual(match_confidence(0.6), 'low')
+
+    def test_links_round_trip(self):
+        self.store.save_links('daraz', 'jeevee', [('d1', 'j1', 0.9), ('d2', 'j2', 0.6), ('', 'j3', 1.0)])
+        links = self.store.get_links('daraz', ['d1', 'd2', 'd3', ''], 'jeevee')
+        self.assertEqual(links, {'d1': ('j1', 0.9), 'd2': ('j2', 0.6)})
+        self.assertEqual(self.store.get_links('daraz', ['d1'], 'other'), {})
+        self.assertEqual(self.store.get_links('daraz', [], 'jeevee'), {})
+
+    def test_newer_link_replaces_older(self):
+        self.store.save_links('daraz', 'jeevee', [('d1', 'j1', 0.6)])
+        self.store.save_links('daraz', 'jeevee', [('d1', 'j9', 0.95)])
+        self.assertEqual(self.store.get_links('daraz', ['d1'], 'jeevee'), {'d1': ('j9', 0.95)})
+
+    def test_expired_links_are_ignored_and_purged(self):
+        store = MatchStore(self.store.path, max_age=-1)
+        store.save_links('daraz', 'jeevee', [('d1', 'j1', 0.9)])
+        self.assertEqual(store.get_links('daraz', ['d1'], 'jeevee'), {})
+        self.assertEqual(store.purge_expired(), 1)
+
+
+class StoredMatchReuseTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.store = MatchStore(Path(self.tmp.name) / 'matches.sqlite3')
+        self.comparer = PriceComparer(match_store=self.store, use_cache=False)
+
+    def test_new_matches_are_saved(self):
+        daraz = [{'id': 'd1', 'name': 'Himalaya Neem Face Wash 150ml', 'price': '300'}]
+        jeevee = [{'id': 'j1', 'name': 'Himalaya Neem Face Wash 150 ml', 'price': '250'}]
+        compared = self.comparer._compare_products(daraz, jeevee)
+        self.assertTrue(compared[0]['has_match'])
+        self.assertEqual(compared[0]['price_comparison']['cheaper_source'], 'jeevee')
+        self.assertEqual(self.store.get_links('daraz', ['d1'], 'jeevee')['d1'][0], 'j1')
+
+    def test_stored_link_wins_over_similarity(self):
+        # Names share nothing, so only the stored link can pair them
+        self.store.save_links('daraz', 'jeevee', [('d1', 'j2', 0.8)])
+        daraz = [{'id': 'd1', 'name': 'aaaa', 'price': '100'}]
+        jeevee = [{'id': 'j1', 'name': 'aaab', 'price': '90'}, {'id': 'j2', 'name': 'zzzz', 'price': '80'}]
+        compared = self.comparer._compare_products(daraz, jeevee)
+        self.assertEqual(compared[0]['jeevee']['id'], 'j2')
+        self.assertEqual(compared[0]['match_score'], 80.0)
+        self.assertEqual(compared[0]['match_confidence'], 'medium')
+        # The other Jeevee product is listed unmatched
+        self.assertEqual([c['jeevee']['id'] for c in compared[1:]], ['j1'])
+
+    def test_stale_link_to_missing_product_is_recomputed(self):
+        self.store.save_links('daraz', 'jeevee', [('d1', 'gone', 0.9)])
+        daraz = [{'id': 'd1', 'name': 'dove soap 100g'}]
+        jeevee = [{'id': 'j1', 'name': 'dove soap 100 g'}]
+        compared = self.comparer._compare_products(daraz, jeevee)
+        self.assertEqual(compared[0]['jeevee']['id'], 'j1')
+        self.assertEqual(self.store.get_links('daraz', ['d1'], 'jeevee')['d1'][0], 'j1')
@@ -0,0 +1,115 @@
+import copy
+import unittest
+
+from scraper.payload import pack_compare, product_key, project
+from scraper.price_compare import PriceComparer
+from scraper.sources import SourceRegistry
+from scraper.tests.fakes import FakeSource
+
+DARAZ = [{'id': 'd1', 'name': 'Aloe Face Wash 100ml', 'price': '350', 'rating': 4.5},
+         {'id': 'd2', 'name': 'Neem Face Wash', 'price': '280', 'rating': 4.1}]
+JEEVEE = [{'id': 'j1', 'name': 'Aloe Face Wash 100 ml', 'price': '330', 'rating': 4.6},
+          {'id': 'j2', 'name': 'Charcoal Face Wash', 'price': '410', 'rating': 4.2}]
+
+
+def search_all():
+    registry = SourceRegistry([FakeSource('daraz', DARAZ), FakeSource('jeevee', JEEVEE)])
+    return PriceComparer(registry=registry, use_cache=False).search_all('payload face wash', min_rating=None)
+
+
+def unpack(packed):
+    """Rebuild the full layout from refs or columns"""
+    if packed['layout'] == 'refs':
+        def lookup(ref):
+            return None if ref is None else packed['products'][ref]
+        compared = packed['compared_products']
+    else:
+        columns = packed['products']
+        fields = list(columns)
+
+        def lookup(row):
+            if row is None:
+                return None
+            return {field: columns[field][row] for field in fields if columns[field][row] is not None}
+        table = packed['compared_products']
+        count = len(next(iter(table.values()), []))
+        compared = [{name: values[i] for name, values in table.items()} for i in range(count)]
+    full = {}
+    for name, value in packed.items():
+        if name in ('layout', 'products', 'product_keys', 'compared_products'):
+            continue
+        if isinstance(value, dict) and isinstance(value.get('products'), list):
+            value = dict(value, products=[lookup(ref) for ref in value['products']])
+        elif name == 'all_products':
+            value = [lookup(ref) for ref in value]
+        full[name] = value
+    full['compared_products'] = [
+        dict(entry, **{source: lookup(entry[source]) for source in ('daraz', 'jeevee') if source in entry})
+        for entry in compared
+    ]
+    return full
+
+
+class PackCompareTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.results = search_all()
+
+    def test_full_is_unchanged(self):
+        self.assertIs(pack_compare(self.results), self.results)
+
+    def test_layouts_round_trip(self):
+        before = copy.deepcopy(self.results)
+        self.assertTrue(self.results['compared_products'])
+        for layout in ('refs', 'columns'):
+            with self.subTest(layout=layout):
+                packed = pack_compare(self.results, layout)
+                self.assertEqual(packed['layout'], layout)
+                self.assertEqual(unpack(packed), self.results)
+        # The input is not modified
+        self.assertEqual(self.results, before)
+
+    def test_each_product_is_sent_once(self):
+        refs = pack_compare(self.results, 'refs')
+        self.assertEqual(len(refs['products']), len(DARAZ) + len(JEEVEE))
+        self.assertIn('daraz:d1', refs['products'])
+        columns = pack_compare(self.results, 'columns')
+        self.assertEqual(len(columns['product_keys']), len(DARAZ) + len(JEEVEE))
+        self.assertEqual(columns['product_keys'], list(refs['products']))
+
+    def test_fields(self):
+        refs = pack_compare(self.results, 'refs', fields=('name', 'price'))
+        self.assertEqual(refs['products']['jeevee:j2'], {'name': 'Charcoal Face Wash', 'price': '410'})
+        full = pack_compare(self.results, 'full', fields=('price',))
+        self.assertEqual(full['layout'], 'full')
+        self.assertEqual(set(full['all_products'][0]), {'price'})
+        # A product shared by several sections is projected once
+        first = full['compared_products'][0]['jeevee']
+        self.assertTrue(any(p is first for p in full['all_products']))
+
+    def test_colliding_keys_get_a_suffix(self):
+        results = {'all_products': [{'source': 'Shop', 'name': 'Soap', 'price': '1'},
+                                    {'source': 'Shop', 'name': 'Soap', 'price': '2'}]}
+        packed = pack_compare(results, 'refs')
+        self.assertEqual(packed['all_products'], ['shop:Soap', 'shop:Soap#2'])
+        self.assertEqual(packed['products']['shop:Soap#2']['price'], '2')
+
+    def test_product_field_named_key_survives_columns(self):
+        packed = pack_compare({'all_products': [{'source': 'Shop', 'id': 1, 'key': 'sku-9'}]}, 'columns')
+        self.assertEqual(packed['products']['key'], ['sku-9'])
+        self.assertEqual(packed['product_keys'], ['shop:1'])
+
+    def test_unknown_layout(self):
+        with self.assertRaises(ValueError):
+            pack_compare(self.results, 'xml')
+
+
+class HelperTests(unittest.TestCase):
+    def test_product_key(self):
+        self.assertEqual(product_key({'source': 'Jeevee', 'id': 7}), 'jeevee:7')
+        self.assertEqual(product_key({'source': 'Daraz', 'url': 'https://d/p'}), 'daraz:https://d/p')
+
+    def test_project(self):
+        products = [{'name': 'a', 'price': 1, 'rating': 4}]
+        self.assertIs(project(products, None), products)
+        self.assertEqual(project(products, ('price', 'missing', 'name')), [{'price': 1, 'name': 'a'}])
@@ -0,0 +1,88 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from scraper.admission import Overloaded
+from scraper.politeness import (
+    BACKGROUND, INTERACTIVE, OutboundScheduler, background, current_priority, domain_of,
+)
+
+URL = 'https://www.shop.test/search?q=soap'
+
+
+class PolitenessTests(unittest.TestCase):
+    def setUp(self):
+        self.dir = Path(tempfile.mkdtemp(prefix='outbound-'))
+        self.addCleanup(shutil.rmtree, self.dir, True)
+
+    def scheduler(self, rate=0.01, burst=2, **options):
+        scheduler = OutboundScheduler(self.dir / 'outbound.sqlite3', rates={'shop.test': {'rate': rate, 'burst': burst}},
+                                      **options)
+        self.addCleanup(scheduler._conn.close)
+        return scheduler
+
+    def test_domain_of(self):
+        self.assertEqual(domain_of(URL), 'shop.test')
+        self.assertEqual(domain_of('api.jeevee.com'), 'api.jeevee.com')
+
+    def test_background_context(self):
+        self.assertEqual(current_priority(), INTERACTIVE)
+        with background():
+            self.assertEqual(current_priority(), BACKGROUND)
+        self.assertEqual(current_priority(), INTERACTIVE)
+
+    def test_interactive_waits_for_the_next_token(self):
+        scheduler = self.scheduler(rate=50.0, burst=1)
+        self.assertLess(scheduler.throttle(URL), 0.01)
+        self.assertGreater(scheduler.throttle(URL), 0.01)
+        self.assertEqual(scheduler.stats()['shop.test']['requests'], 2)
+
+    def test_interactive_gives_up_past_max_wait(self):
+        scheduler = self.scheduler(burst=1)
+        scheduler.throttle(URL)
+        # The next token is 100 s away
+        with self.assertRaises(Overloaded) as caught:
+            scheduler.throttle(URL)
+        self.assertEqual(caught.exception.upstream, 'shop.test')
+        self.assertEqual(scheduler.stats()['shop.test']['interactive_rejected'], 1)
+
+    def test_background_leaves_a_reserve(self):
+        scheduler = self.scheduler(burst=2, background_reserve=1.0)
+        self.assertTrue(scheduler.has_capacity(URL))
+        self.assertTrue(scheduler._reserve('shop.test', BACKGROUND, 1.0)[0])
+        self.assertFalse(scheduler.has_capacity(URL))
+        self.assertTrue(scheduler.has_capacity(URL, priority=INTERACTIVE))
+        self.assertFalse(scheduler._reserve('shop.test', BACKGROUND, 1.0)[0])
+        self.assertLess(scheduler.throttle(URL, priority=INTERACTIVE), 0.01)
+
+    def test_pushback_halves_the_rate_and_pauses(self):
+        scheduler = self.scheduler(rate=4.0, burst=2, backoff=30.0)
+        with self.assertLogs('scraper.politeness', 'WARNING'):
+            scheduler.report(URL, status=429)
+        stats = scheduler.stats()['shop.test']
+        self.assertEqual(stats['rate'], 2.0)
+        self.assertLess(stats['tokens'], 0)
+        self.assertEqual(stats['penalties'], 1)
+        self.assertFalse(scheduler.has_capacity(URL, priority=INTERACTIVE))
+
+    def test_rate_has_a_floor_and_recovers(self):
+        scheduler = self.scheduler(rate=4.0, min_rate_ratio=0.25, increase_ratio=0.5)
+        with self.assertLogs('scraper.politeness', 'WARNING'):
+            for _ in range(5):
+                scheduler.report(URL, blocked=True)
+        self.assertEqual(scheduler.stats()['shop.test']['rate'], 1.0)
+        scheduler.report(URL, status=200)
+        self.assertEqual(scheduler.stats()['shop.test']['rate'], 3.0)
+        scheduler.report(URL, status=200)
+        self.assertEqual(scheduler.stats()['shop.test']['rate'], 4.0)
+
+    def test_other_errors_are_ignored(self):
+        scheduler = self.scheduler()
+        scheduler.report(URL, status=404)
+        self.assertNotIn('shop.test', scheduler.stats())
+
+    def test_bucket_is_shared_between_schedulers(self):
+        first, second = self.scheduler(burst=1), self.scheduler(burst=1)
+        first.throttle(URL)
+        self.assertFalse(second.has_capacity(URL, priority=INTERACTIVE))
@@ -0,0 +1,100 @@
+import threading
+import time
+import unittest
+from contextlib import ExitStack
+
+from scraper.admission import Bulkhead, Overloaded
+from scraper.politeness import background
+from scraper.prefetch import Prefetcher
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError('condition not met in time')
+        time.sleep(0.01)
+
+
+class PrefetcherTests(unittest.TestCase):
+    def prefetcher(self, **options):
+        prefetcher = Prefetcher(enabled={'shop': True}, **options)
+        self.addCleanup(prefetcher._executor.shutdown)
+        return prefetcher
+
+    def counters(self, prefetcher):
+        return prefetcher.stats()['sources'].get('shop', {})
+
+    def test_prefetched_page_is_served(self):
+        prefetcher = self.prefetcher()
+        self.assertTrue(prefetcher.schedule('shop', 'p2', lambda: {'products': [1]}))
+        wait_for(lambda: self.counters(prefetcher).get('prefetched') == 1)
+        self.assertEqual(prefetcher.get('shop', 'p2'), {'products': [1]})
+        self.assertIsNone(prefetcher.get('shop', 'p3'))
+        counters = self.counters(prefetcher)
+        self.assertEqual((counters['hits'], counters['misses']), (1, 1))
+        self.assertEqual((counters['hit_rate'], counters['used_rate']), (0.5, 1.0))
+        # Already held: not fetched again
+        self.assertFalse(prefetcher.schedule('shop', 'p2', lambda: {'products': [2]}))
+
+    def test_disabled_sources_are_not_prefetched(self):
+        self.assertFalse(self.prefetcher().schedule('other', 'p2', lambda: {'products': [1]}))
+
+    def test_empty_pages_are_not_kept(self):
+        prefetcher = self.prefetcher()
+        prefetcher.schedule('shop', 'p9', lambda: {'products': []})
+        wait_for(lambda: self.counters(prefetcher).get('empty') == 1)
+        self.assertIsNone(prefetcher.get('shop', 'p9'))
+
+    def test_live_traffic_pauses_and_cancels_prefetch(self):
+        prefetcher = self.prefetcher(max_workers=1, max_live=0)
+        release = threading.Event()
+        prefetcher.schedule('shop', 'slow', lambda: release.wait(2) and {'products': [1]})
+        prefetcher.schedule('shop', 'queued', lambda: {'products': [1]})
+        with prefetcher.live('shop'):
+            # Queued work is dropped and nothing new is scheduled
+            self.assertFalse(prefetcher.schedule('shop', 'new', lambda: {'products': [1]}))
+            release.set()
+        wait_for(lambda: prefetcher.stats()['pending'] == 0)
+        counters = self.counters(prefetcher)
+        self.assertEqual(counters['cancelled'], 1)
+        self.assertEqual(counters['skipped_busy'], 1)
+
+    def test_rejected_by_the_bulkhead_counts_as_busy(self):
+        prefetcher = self.prefetcher()
+
+        def fetch():
+            raise Overloaded('daraz-browser', 5)
+
+        prefetcher.schedule('shop', 'p2', fetch)
+        wait_for(lambda: self.counters(prefetcher).get('skipped_busy') == 1)
+        self.assertNotIn('errors', self.counters(prefetcher))
+
+
+class BackgroundAdmissionTests(unittest.TestCase):
+    def test_background_work_only_uses_its_share(self):
+        bulkhead = Bulkhead('browser', max_concurrent=2, max_queue=4, max_wait=5)
+        self.assertEqual(bulkhead.background_limit, 1)
+        with ExitStack() as held:
+            with background():
+                held.enter_context(bulkhead.slot())
+            # A second background call is turned away at once, without queueing
+            with self.assertRaises(Overloaded), background(), bulkhead.slot():
+                pass
+            # A live call still gets the slot left for it
+            with bulkhead.slot():
+                pass
+        self.assertEqual(bulkhead.stats()['background_rejected'], 1)
+
+    def test_background_never_waits_behind_live_calls(self):
+        bulkhead = Bulkhead('browser', max_concurrent=2, max_queue=4, max_wait=5)
+        with bulkhead.slot():
+            started = time.monotonic()
+            with self.assertRaises(Overloaded), background(), bulkhead.slot():
+                pass
+            self.assertLess(time.monotonic() - started, 0.1)
+
+    def test_single_slot_bulkheads_run_no_background_work(self):
+        bulkhead = Bulkhead('tiny', max_concurrent=1)
+        with self.assertRaises(Overloaded), background(), bulkhead.slot():
+            pass
@@ -0,0 +1,116 @@
+import random
+import tempfile
+import unittest
+from pathlib import Path
+
+from scraper.price_compare import (SORT_KEYS, filter_by_rating, parse_deadline, parse_discount, parse_min_rating,
+                                   parse_price, parse_rating, top_k)
+
+
+def make_products(count, seed=7):
+    rng = random.Random(seed)
+    products = []
+    for i in range(count):
+        products.append({
+            'id': i,
+            'price': rng.choice([f'Rs. {rng.randint(50, 5000):,}', rng.randint(50, 5000), None, 'n/a']),
+            'rating': rng.choice([rng.randint(0, 50) / 10, f'{rng.randint(0, 50) / 10}/5', None]),
+            'discount': rng.choice([f'-{rng.randint(0, 70)}%', rng.randint(0, 70), None]),
+        })
+    return products
+
+
+class ParseTests(unittest.TestCase):
+    def test_parsers(self):
+        self.assertEqual(parse_price('Rs. 1,200'), 1200.0)
+        self.assertEqual(parse_price('NPR 99.5'), 99.5)
+        self.assertIsNone(parse_price('free'))
+        self.assertEqual(parse_rating('4.5 out of 5'), 4.5)
+        self.assertIsNone(parse_rating('none'))
+        self.assertEqual(parse_discount('-20%'), 20.0)
+        self.assertEqual(parse_discount(-15), 15.0)
+
+    def test_parse_min_rating(self):
+        self.assertEqual(parse_min_rating(None), 4.0)
+        self.assertEqual(parse_min_rating('3.5'), 3.5)
+        self.assertIsNone(parse_min_rating('0'))
+        self.assertIsNone(parse_min_rating(''))
+        for value in ('abc', [4]):
+            with self.subTest(value=value), self.assertRaises(ValueError):
+                parse_min_rating(value)
+
+    def test_parse_deadline(self):
+        self.assertIsNone(parse_deadline(None))
+        self.assertIsNone(parse_deadline(''))
+        self.assertEqual(parse_deadline('2.5'), 2.5)
+        self.assertEqual(parse_deadline(1e9, maximum=60), 60)
+        for value in ('abc', 0, -1, 'nan', 'inf', [1]):
+            with self.subTest(value=value), self.assertRaises(ValueError):
+                parse_deadline(value)
+
+
+class TopKTests(unittest.TestCase):
+    def test_matches_full_sort_for_every_key(self):
+        products = make_products(500)
+        for sort, (key_func, descending) in SORT_KEYS.items():
+            missing = float('-inf') if descending else float('inf')
+            expected = sorted(
+                products,
+                key=lambda p: missing if key_func(p) is None else key_func(p),
+                reverse=descending,
+            )[:25]
+            with self.subTest(sort=sort):
+                got = top_k(iter(products), 25, sort)
+                self.assertEqual([key_func(p) for p in got], [key_func(p) for p in expected])
+
+    def test_missing_values_come_last(self):
+        products = [{'price': None}, {'price': '20'}, {'price': 'n/a'}, {'price': '10'}]
+        self.assertEqual([p['price'] for p in top_k(products, 3)], ['10', '20', None])
+        self.assertEqual([p['price'] for p in top_k(products, 2, 'price_desc')], ['20', '10'])
+
+    def test_limit_larger_than_input(self):
+        self.assertEqual(len(top_k(make_products(5), 50)), 5)
+
+    def test_unknown_sort(self):
+        with self.assertRaises(KeyError):
+            top_k([], 5, 'newest')
+
+
+class FilterByRatingTests(unittest.TestCase):
+    def test_keeps_rated_products_at_or_above_threshold(self):
+        products = [{'rating': '4.5/5'}, {'rating': 3.9}, {'rating': None}, {'rating': 4}]
+        filtered = filter_by_rating(products, 4.0)
+        self.assertEqual([p['rating'] for p in filtered], ['4.5/5', 4])
+        self.assertEqual([p['parsed_rating'] for p in filtered], [4.5, 4.0])
+
+    def test_leaves_the_input_untouched(self):
+        products = [{'rating': '4.5/5'}, {'rating': 3.9}]
+        filter_by_rating(products, 4.0)
+        self.assertEqual(products, [{'rating': '4.5/5'}, {'rating': 3.9}])
+
+
+class IterSearchTests(unittest.TestCase):
+    def test_events_in_order(self):
+        from scraper.match_store import MatchStore
+        from scraper.sources import SourceRegistry
+        from scraper.price_compare import PriceComparer
+        from .fakes import FakeSource
+
+        daraz = [{'id': f'd{i}', 'name': f'brand soap {i}', 'price': '100', 'rating': 5} for i in range(3)]
+        jeevee = [{'id': 'j0', 'name': 'brand soap 0', 'price': '90', 'rating': 5}]
+        registry = SourceRegistry([FakeSource('jeevee', jeevee, priority=10),
+                                   FakeSource('daraz', daraz, delay=0.05, priority=20)])
+        with tempfile.TemporaryDirectory() as tmp:
+            comparer = PriceComparer(MatchStore(Path(tmp) / 'm.sqlite3'), registry, use_cache=False)
+            events = list(comparer.iter_search('iter search soap', limit=10, batch_size=2))
+
+        kinds = [event['event'] for event in events]
+        self.assertEqual(kinds, ['source', 'source', 'matches', 'matches', 'summary'])
+        # The faster source is streamed first
+        self.assertEqual([event['source'] for event in events[:2]], ['jeevee', 'daraz'])
+        self.assertEqual([len(event['items']) for event in events[2:4]], [2, 1])
+        summary = events[-1]
+        self.assertEqual(summary['total'], 4)
+        self.assertEqual(summary['compared'], 3)
+        self.assertFalse(summary['partial'])
+        self.assertEqual(summary['sources']['daraz']['count'], 3)
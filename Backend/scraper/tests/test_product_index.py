@@ -0,0 +1,166 @@
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+from scraper import product_index
+from scraper.product_index import ProductIndex, match_expression, record_products
+from scraper.tests.fakes import FakeSource
+
+
+def product(ident, name, price=None, rating=None, brand='', source='Jeevee', **extra):
+    return dict(id=ident, name=name, price=price, rating=rating, brand=brand, source=source, **extra)
+
+
+class MatchExpressionTests(unittest.TestCase):
+    def test_words_become_quoted_prefixes(self):
+        self.assertEqual(match_expression('Face WASH'), '"face"* "wash"*')
+
+    def test_fts_syntax_is_not_interpreted(self):
+        self.assertEqual(match_expression('serum OR "toner" NEAR(x'), '"serum"* "or"* "toner"* "near"* "x"*')
+        self.assertIsNone(match_expression('*** ""'))
+
+    def test_query_words_are_capped(self):
+        expression = match_expression(' '.join(f'w{i}' for i in range(30)))
+        self.assertEqual(expression.count('*'), product_index.MAX_QUERY_TERMS)
+
+
+class ProductIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.index = ProductIndex(Path(self.tmp.name) / 'products.sqlite3', flush_every=1000, flush_interval=3600)
+
+    def test_products_are_buffered_until_flushed(self):
+        self.index.add([product('j1', 'Gentle Face Wash')])
+        self.assertEqual(self.index.stats()['products'], 0)
+        self.assertEqual(self.index.stats()['pending'], 1)
+        self.index.flush()
+        self.assertEqual(self.index.stats(), {'products': 1, 'pending': 0, 'path': str(self.index.path)})
+
+    def test_flushes_once_enough_are_pending(self):
+        index = ProductIndex(self.index.path, flush_every=2, flush_interval=3600)
+        index.add([product('j1', 'Face Wash'), product('j2', 'Face Serum')])
+        self.assertEqual(index.stats()['pending'], 0)
+        self.assertEqual(index.stats()['products'], 2)
+
+    def test_search_matches_prefixes_best_first(self):
+        self.index.add([
+            product('j1', 'Gentle Face Wash'),
+            product('j2', 'Hand Cream', brand='Facecare'),
+            # Unrelated products give the search words a positive IDF
+            *(product(f'x{i}', f'Body Lotion {i}') for i in range(5)),
+        ])
+        hits = self.index.search('fac')
+        self.assertEqual([hit['id'] for hit in hits], ['j1', 'j2'])
+        self.assertGreater(hits[0]['score'], hits[1]['score'])
+        self.assertIn('seen_at', hits[0])
+        self.assertEqual(self.index.search('face wa')[0]['id'], 'j1')
+        self.assertEqual(self.index.search('!!'), [])
+
+    def test_search_filters(self):
+        self.index.add([
+            product('j1', 'Rose Toner', price='Rs. 450', rating=4.6),
+            product('j2', 'Rose Toner Mist', price='1,200', rating=3.9),
+            product('d1', 'Rose Toner', price=300, source='Daraz'),
+        ])
+        ids = lambda **bounds: sorted(hit['id'] for hit in self.index.search('rose', **bounds))
+        self.assertEqual(ids(max_price=500), ['d1', 'j1'])
+        self.assertEqual(ids(min_price=400, max_price=1000), ['j1'])
+        # Products without a rating are excluded once a bound is set
+        self.assertEqual(ids(min_rating=4), ['j1'])
+        self.assertEqual(ids(source='DARAZ'), ['d1'])
+
+    def test_search_pages(self):
+        self.index.add([product(f'j{i}', f'Clay Mask {i}') for i in range(5)])
+        first = self.index.search('clay', limit=3)
+        rest = self.index.search('clay', limit=3, offset=3)
+        self.assertEqual(len(first), 3)
+        self.assertEqual(len(rest), 2)
+        self.assertFalse({hit['id'] for hit in first} & {hit['id'] for hit in rest})
+
+    def test_rescrape_updates_in_place(self):
+        self.index.add([product('j1', 'Sunscreen SPF 30', price=900)])
+        self.index.flush()
+        self.index.add([product('j1', 'Sunblock SPF 50', price=800)])
+        self.index.flush()
+        self.assertEqual(self.index.stats()['products'], 1)
+        self.assertEqual(self.index.search('sunscreen'), [])
+        hit, = self.index.search('sunblock')
+        self.assertEqual(hit['price'], 800)
+
+    def test_source_applies_to_products_without_one(self):
+        products = [product('x1', 'Lip Balm', source=None)]
+        self.index.add(products, source='Daraz')
+        self.assertEqual(self.index.search('balm', source='daraz')[0]['source'], 'Daraz')
+        self.assertIsNone(products[0]['source'])
+
+    def test_products_without_a_name_are_skipped(self):
+        self.index.add([product('j1', ''), product('j2', '   ')])
+        self.index.flush()
+        self.assertEqual(self.index.stats()['products'], 0)
+
+    def test_products_since(self):
+        self.index.add([product('j1', 'Face Wash'), product('j2', 'Hand Wash', brand='Dettol')])
+        self.index.flush()
+        rows = self.index.products_since(0)
+        self.assertEqual([(name, brand) for _, name, brand in rows], [('Face Wash', ''), ('Hand Wash', 'Dettol')])
+        self.assertEqual(self.index.products_since(rows[0][0]), rows[1:])
+        self.assertEqual(self.index.products_since(0, limit=1), rows[:1])
+
+    def test_record_query_counts_normalized_queries(self):
+        self.index.record_query('Face  Wash')
+        self.index.record_query('face wash')
+        self.index.record_query('   ')
+        self.index.flush()
+        (query, hits, _), = self.index.queries_since(0)
+        self.assertEqual((query, hits), ('face wash', 2))
+
+    def test_query_writes_take_increasing_sequence_numbers(self):
+        self.index.record_query('toner')
+        self.index.record_query('serum')
+        self.index.flush()
+        self.assertEqual(self.index.queries_since(0), [('toner', 1, 1), ('serum', 1, 2)])
+        self.index.record_query('toner')
+        self.index.flush()
+        self.assertEqual(self.index.queries_since(2), [('toner', 2, 3)])
+
+    def test_older_query_tables_get_sequence_numbers(self):
+        path = Path(self.tmp.name) / 'old.sqlite3'
+        conn = sqlite3.connect(path)
+        conn.execute('CREATE TABLE queries (query TEXT PRIMARY KEY, hits INTEGER NOT NULL, updated_at REAL NOT NULL)')
+        conn.executemany('INSERT INTO queries VALUES (?, ?, ?)', [('toner', 3, 9e9), ('serum', 1, 1.0)])
+        conn.commit()
+        conn.close()
+        index = ProductIndex(path)
+        self.assertEqual(index.queries_since(0), [('toner', 3, 1), ('serum', 1, 2)])
+        index.record_query('serum')
+        index.flush()
+        self.assertEqual(index.queries_since(2), [('serum', 2, 3)])
+
+
+class IndexFallbackTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.index = ProductIndex(Path(tmp.name) / 'products.sqlite3', flush_every=1000, flush_interval=3600)
+        previous, product_index._default_index = product_index._default_index, self.index
+        self.addCleanup(setattr, product_index, '_default_index', previous)
+
+    def test_record_products_indexes_a_result(self):
+        result = {'products': [{'id': 'j1', 'name': 'Aloe Gel'}], 'source': 'Jeevee'}
+        self.assertIs(record_products(result), result)
+        self.assertEqual(self.index.search('aloe', source='jeevee')[0]['id'], 'j1')
+        self.assertIs(record_products(None), None)
+
+    def test_failed_search_is_answered_from_the_index(self):
+        self.index.add([product('j1', 'Aloe Gel', rating=4.5), product('d1', 'Aloe Gel', source='Daraz')])
+        with self.assertLogs('scraper', level='WARNING'):
+            result = FakeSource('jeevee', error=RuntimeError('down')).run('aloe', 10)
+        self.assertEqual(result['fallback'], 'index')
+        self.assertEqual([p['id'] for p in result['products']], ['j1'])
+
+    def test_successful_search_counts_the_query(self):
+        FakeSource('jeevee', [{'id': 'j1', 'name': 'Aloe Gel'}]).run('Aloe gel', 10)
+        self.index.flush()
+        self.assertEqual([row[:2] for row in self.index.queries_since(0)], [('aloe gel', 1)])
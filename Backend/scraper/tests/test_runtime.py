@@ -0,0 +1,114 @@
+import itertools
+import unittest
+
+from scraper.runtime import ScraperPool, ScraperRuntime
+from scraper.tests.fakes import FakeJeevee
+
+
+class FakeScraper:
+    ids = itertools.count(1)
+
+    def __init__(self, fail_init=False):
+        self.id = next(self.ids)
+        self.fail_init = fail_init
+        self.closed = False
+        self.driver_started = False
+
+    def _init_driver(self):
+        if self.fail_init:
+            raise RuntimeError('no chrome')
+        self.driver_started = True
+
+    def close(self):
+        self.closed = True
+
+
+class ScraperPoolTests(unittest.TestCase):
+    def test_scrapers_are_reused(self):
+        pool = ScraperPool(FakeScraper, max_idle=2)
+        with pool.checkout() as first:
+            pass
+        with pool.checkout() as second:
+            pass
+        self.assertIs(first, second)
+        self.assertFalse(first.closed)
+        self.assertEqual(pool.stats(), {'created': 1, 'reused': 1, 'recycled': 0, 'idle': 1})
+
+    def test_concurrent_checkouts_get_their_own_scraper(self):
+        pool = ScraperPool(FakeScraper, max_idle=1)
+        with pool.checkout() as first, pool.checkout() as second:
+            self.assertIsNot(first, second)
+        # Only max_idle are kept
+        self.assertEqual(pool.stats()['idle'], 1)
+        self.assertTrue(first.closed or second.closed)
+
+    def test_failed_scraper_is_closed(self):
+        pool = ScraperPool(FakeScraper)
+        with self.assertRaises(RuntimeError):
+            with pool.checkout() as scraper:
+                raise RuntimeError('browser crashed')
+        self.assertTrue(scraper.closed)
+        self.assertEqual(pool.stats()['idle'], 0)
+
+    def test_recycled_after_max_uses(self):
+        pool = ScraperPool(FakeScraper, max_uses=2)
+        for _ in range(2):
+            with pool.checkout() as scraper:
+                pass
+        self.assertTrue(scraper.closed)
+        self.assertEqual(pool.stats()['recycled'], 1)
+        with pool.checkout() as fresh:
+            self.assertIsNot(fresh, scraper)
+
+    def test_idle_scrapers_expire(self):
+        pool = ScraperPool(FakeScraper, max_idle_time=-1)
+        with pool.checkout() as scraper:
+            pass
+        with pool.checkout() as fresh:
+            self.assertIsNot(fresh, scraper)
+        self.assertTrue(scraper.closed)
+
+    def test_warm_starts_browsers(self):
+        pool = ScraperPool(FakeScraper, max_idle=2)
+        pool.warm(5)
+        self.assertEqual(pool.stats()['idle'], 2)
+        with pool.checkout() as scraper:
+            self.assertTrue(scraper.driver_started)
+
+    def test_warm_gives_up_on_error(self):
+        pool = ScraperPool(lambda: FakeScraper(fail_init=True))
+        with self.assertLogs('scraper.runtime', 'WARNING'):
+            pool.warm(2)
+        self.assertEqual(pool.stats()['idle'], 0)
+
+    def test_close(self):
+        pool = ScraperPool(FakeScraper)
+        with pool.checkout() as busy:
+            with pool.checkout() as idle:
+                pass
+            pool.close()
+            self.assertTrue(idle.closed)
+            self.assertFalse(busy.closed)
+        # Closed when returned
+        self.assertTrue(busy.closed)
+        self.assertEqual(pool.stats()['idle'], 0)
+
+
+class ScraperRuntimeTests(unittest.TestCase):
+    def test_daraz_checks_out_of_the_region_pool(self):
+        runtime = ScraperRuntime()
+        runtime._daraz_pools['np'] = ScraperPool(FakeScraper)
+        with runtime.daraz('np') as scraper:
+            self.assertIsInstance(scraper, FakeScraper)
+        self.assertEqual(runtime.stats()['daraz_pools']['np']['idle'], 1)
+
+    def test_shutdown_closes_everything_once(self):
+        runtime = ScraperRuntime()
+        runtime._daraz_pools['np'] = ScraperPool(FakeScraper)
+        with runtime.daraz('np') as scraper:
+            pass
+        runtime._jeevee = FakeJeevee()
+        runtime.shutdown()
+        runtime.shutdown()
+        self.assertTrue(scraper.closed)
+        self.assertTrue(runtime._jeevee.closed)
@@ -0,0 +1,134 @@
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from scraper.admission import Overloaded
+from scraper.singleflight import (FlightStore, RemoteFlightError, SingleFlight, SingleFlightTimeout,
+                                  decode_error, encode_error)
+
+
+class SingleFlightTests(unittest.TestCase):
+    def test_concurrent_callers_share_one_execution(self):
+        flights = SingleFlight()
+        calls = []
+        started = threading.Event()
+
+        def work():
+            calls.append(1)
+            started.set()
+            time.sleep(0.2)
+            return {'products': [1, 2]}
+
+        with ThreadPoolExecutor(5) as pool:
+            leader = pool.submit(flights.do, 'k', work)
+            started.wait(2)
+            followers = [pool.submit(flights.do, 'k', work) for _ in range(4)]
+            results = [leader.result()] + [f.result() for f in followers]
+
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(result == {'products': [1, 2]} for result in results))
+        # Every caller gets its own copy
+        results[0]['products'].append(3)
+        self.assertEqual(results[1], {'products': [1, 2]})
+        self.assertEqual(flights.stats()['shared'], 4)
+
+    def test_leader_error_reaches_followers(self):
+        flights = SingleFlight()
+        started = threading.Event()
+
+        def work():
+            started.set()
+            time.sleep(0.1)
+            raise Overloaded('jeevee', 7)
+
+        with ThreadPoolExecutor(2) as pool:
+            leader = pool.submit(flights.do, 'k', work)
+            started.wait(2)
+            follower = pool.submit(flights.do, 'k', work)
+            for future in (leader, follower):
+                with self.assertRaises(Overloaded):
+                    future.result()
+
+    def test_follower_times_out(self):
+        flights = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+
+        def work():
+            started.set()
+            release.wait(2)
+
+        with ThreadPoolExecutor(1) as pool:
+            pool.submit(flights.do, 'k', work)
+            started.wait(2)
+            with self.assertRaises(SingleFlightTimeout):
+                flights.do('k', work, timeout=0.05)
+            release.set()
+
+    def test_sequential_calls_run_again(self):
+        flights = SingleFlight()
+        self.assertEqual([flights.do('k', lambda: n) for n in range(3)], [0, 1, 2])
+
+
+class CrossProcessTests(unittest.TestCase):
+    """Two SingleFlights on one FlightStore file stand in for two worker processes"""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        path = Path(tmp.name) / 'flights.sqlite3'
+        self.first = SingleFlight(FlightStore(path, poll_interval=0.01))
+        self.second = SingleFlight(FlightStore(path, poll_interval=0.01))
+
+    def run_both(self, work):
+        started = threading.Event()
+
+        def leader_work():
+            started.set()
+            time.sleep(0.1)
+            return work()
+
+        with ThreadPoolExecutor(1) as pool:
+            leader = pool.submit(self.first.do, 'k', leader_work)
+            started.wait(2)
+            try:
+                return self.second.do('k', lambda: 'second worker ran it'), leader
+            finally:
+                pool.shutdown(wait=True)
+
+    def test_result_is_shared(self):
+        result, leader = self.run_both(lambda: {'products': ['a']})
+        self.assertEqual(result, {'products': ['a']})
+        self.assertEqual(leader.result(), {'products': ['a']})
+        self.assertEqual(self.second.stats()['remote_shared'], 1)
+
+    def test_overloaded_leader_is_a_429_everywhere(self):
+        def overloaded():
+            raise Overloaded('daraz-browser', 12)
+
+        with self.assertRaises(Overloaded) as raised:
+            self.run_both(overloaded)
+        self.assertEqual(raised.exception.upstream, 'daraz-browser')
+        self.assertEqual(raised.exception.retry_after, 12)
+
+    def test_other_leader_errors(self):
+        def broken():
+            raise ValueError('parse failed')
+
+        with self.assertRaises(RemoteFlightError) as raised:
+            self.run_both(broken)
+        self.assertEqual(str(raised.exception), 'parse failed')
+
+
+class ErrorEncodingTests(unittest.TestCase):
+    def test_round_trip(self):
+        error = decode_error(encode_error(Overloaded('jeevee', 3.2)))
+        self.assertIsInstance(error, Overloaded)
+        self.assertEqual(error.retry_after, 4)
+        self.assertIsInstance(decode_error(encode_error(KeyError('x'))), RemoteFlightError)
+
+    def test_plain_message(self):
+        self.assertEqual(str(decode_error('boom')), 'boom')
@@ -0,0 +1,86 @@
+import unittest
+
+from scraper.admission import Overloaded
+from scraper.price_compare import PriceComparer
+from scraper.sources import SourceRegistry
+
+from .fakes import FakeSource
+
+
+def products(*prices, prefix='p'):
+    return [{'id': f'{prefix}{i}', 'name': f'{prefix} item {i}', 'price': str(price), 'rating': 4.5}
+            for i, price in enumerate(prices)]
+
+
+class SourceRegistryTests(unittest.TestCase):
+    def test_sources_in_priority_order(self):
+        registry = SourceRegistry([FakeSource('slow', priority=20), FakeSource('fast', priority=10)])
+        self.assertEqual(registry.names(), ['fast', 'slow'])
+        registry.register(FakeSource('first', priority=1))
+        registry.unregister('slow')
+        self.assertEqual(registry.names(), ['first', 'fast'])
+        self.assertIsNone(registry.get('slow'))
+
+    def test_source_needs_a_name(self):
+        with self.assertRaises(ValueError):
+            SourceRegistry().register(FakeSource(''))
+
+
+class SourceTests(unittest.TestCase):
+    def test_fetch_truncates_to_limit(self):
+        result = FakeSource('shop', products(1, 2, 3, 4)).fetch('soap', 2)
+        self.assertEqual(len(result['products']), 2)
+
+    def test_fetch_turns_errors_into_a_failed_result(self):
+        result = FakeSource('shop', error=RuntimeError('boom')).fetch('soap', 5)
+        self.assertFalse(result['success'])
+        self.assertEqual(result['error'], 'boom')
+
+    def test_fetch_raises_overloaded(self):
+        with self.assertRaises(Overloaded):
+            FakeSource('shop', error=Overloaded('shop', 3)).fetch('soap', 5)
+
+    def test_run_applies_rating_filter(self):
+        items = products(10, 20) + [{'id': 'low', 'name': 'low', 'price': '5', 'rating': 2}]
+        result = FakeSource('shop', items).run('soap', 10, min_rating=4)
+        self.assertEqual([p['id'] for p in result['products']], ['p0', 'p1'])
+
+
+class DeadlineTests(unittest.TestCase):
+    def comparer(self, *sources):
+        return PriceComparer(registry=SourceRegistry(list(sources)), use_cache=False)
+
+    def test_every_source_done(self):
+        comparer = self.comparer(FakeSource('a', products(30, 10)), FakeSource('b', products(20, prefix='b')))
+        result = comparer.get_lowest_prices('deadline all done', limit=10)
+        self.assertFalse(result['partial'])
+        self.assertEqual([p['price'] for p in result['products']], ['10', '20', '30'])
+        self.assertEqual({name: s['status'] for name, s in result['sources'].items()}, {'a': 'done', 'b': 'done'})
+
+    def test_deadline_returns_partial_results(self):
+        comparer = self.comparer(FakeSource('fast', products(10)), FakeSource('slow', products(5), delay=1.0))
+        result = comparer.get_lowest_prices('deadline partial', limit=10, deadline=0.2)
+        self.assertTrue(result['partial'])
+        self.assertEqual(result['sources']['slow']['status'], 'pending')
+        self.assertEqual([p['price'] for p in result['products']], ['10'])
+
+    def test_source_timeout(self):
+        comparer = self.comparer(FakeSource('fast', products(10)), FakeSource('slow', delay=1.0, timeout=0.1))
+        result = comparer.get_lowest_prices('deadline source timeout', limit=10)
+        self.assertEqual(result['sources']['slow']['status'], 'timed_out')
+
+    def test_failed_source(self):
+        comparer = self.comparer(FakeSource('ok', products(10)), FakeSource('broken', error=RuntimeError('down')))
+        result = comparer.get_lowest_prices('deadline failed source', limit=10)
+        self.assertEqual(result['sources']['broken']['status'], 'failed')
+        self.assertTrue(result['partial'])
+
+    def test_every_source_rejected_raises(self):
+        comparer = self.comparer(FakeSource('a', error=Overloaded('a', 5)), FakeSource('b', error=Overloaded('b', 2)))
+        with self.assertRaises(Overloaded) as raised:
+            comparer.get_lowest_prices('deadline rejected', limit=10)
+        self.assertEqual(raised.exception.retry_after, 2)
+
+    def test_unknown_sort(self):
+        with self.assertRaises(ValueError):
+            self.comparer(FakeSource('a')).get_lowest_prices('x', sort='newest')
@@ -0,0 +1,112 @@
+import random
+import tempfile
+import unittest
+from pathlib import Path
+
+from scraper import suggest
+from scraper.product_index import ProductIndex
+from scraper.suggest import SuggestIndex, normalize_prefix
+
+
+def brute_force(index, prefix):
+    """(score, length) of the best terms for prefix, by scanning every term"""
+    snapshot = index._snapshot
+    keys = [key for key in snapshot.keys if key.startswith(prefix)]
+    best = sorted(keys, key=snapshot.rank, reverse=True)[:suggest.MAX_SUGGESTIONS]
+    return [snapshot.rank(key) for key in best]
+
+
+class SuggestTestCase(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.products = ProductIndex(Path(tmp.name) / 'products.sqlite3', flush_every=10000, flush_interval=3600)
+        self.index = SuggestIndex(self.products, refresh_interval=3600)
+
+    def add(self, *names, brand=''):
+        self.products.add([{'id': name, 'name': name, 'brand': brand, 'source': 'Jeevee'} for name in names])
+
+    def ranks(self, prefix):
+        return [self.index._snapshot.rank(s['text'].lower()) for s in self.index.suggest(prefix)]
+
+
+class SuggestIndexTests(SuggestTestCase):
+    def test_normalize_prefix(self):
+        self.assertEqual(normalize_prefix('  Face   W'), 'face w')
+        self.assertEqual(normalize_prefix('face '), 'face ')
+        self.assertEqual(normalize_prefix('   '), '')
+
+    def test_first_lookup_builds_the_index(self):
+        self.add('Face Wash', 'Face Serum')
+        self.products.record_query('face wash')
+        suggestions = self.index.suggest('fac')
+        self.assertEqual(suggestions[0], {'text': 'face wash', 'type': 'query', 'score': 5.5})
+        self.assertEqual(suggestions[1]['text'], 'Face Serum')
+
+    def test_repeated_queries_add_only_the_increase(self):
+        self.products.record_query('toner')
+        self.index.refresh()
+        for _ in range(2):
+            self.products.record_query('toner')
+        self.assertEqual(self.index.refresh(), 1)
+        self.assertEqual(self.index.suggest('ton')[0]['score'], 15.0)
+        self.assertEqual(self.index.refresh(), 0)
+        self.assertEqual(self.index.stats()['queries_seen'], 1)
+
+    def test_queries_written_by_another_worker_are_picked_up(self):
+        self.products.record_query('sunscreen')
+        self.index.refresh()
+        other = ProductIndex(self.products.path)
+        other.record_query('sunscreen')
+        other.record_query('sunblock')
+        other.flush()
+        self.index.refresh()
+        self.assertEqual([(s['text'], s['score']) for s in self.index.suggest('sun')],
+                         [('sunscreen', 10.0), ('sunblock', 5.0)])
+
+    def test_brand_outranks_its_product_names(self):
+        self.add('Cetaphil Cleanser', 'Cetaphil Lotion', brand='Cetaphil')
+        suggestions = self.index.suggest('ceta')
+        self.assertEqual(suggestions[0], {'text': 'Cetaphil', 'type': 'brand', 'score': 2.0})
+
+    def test_limit(self):
+        self.add(*(f'Lip Balm {i}' for i in range(20)))
+        self.assertEqual(len(self.index.suggest('lip', limit=3)), 3)
+        self.assertEqual(len(self.index.suggest('lip', limit=50)), suggest.MAX_SUGGESTIONS)
+        self.assertEqual(self.index.suggest(''), [])
+
+
+class MemoTests(SuggestTestCase):
+    """Memoized prefixes must match a full scan after every incremental refresh"""
+
+    def test_memo_follows_incremental_refreshes(self):
+        rng = random.Random(5)
+        self.add(*(f'Serum {i:04d}' for i in range(suggest.SCAN_LIMIT + 50)))
+        self.index.refresh()
+        prefixes = ['s', 'se', 'serum', 'serum 0']
+        for prefix in prefixes:
+            self.assertEqual(self.ranks(prefix), brute_force(self.index, prefix))
+        self.assertEqual(set(self.index._snapshot.top), set(prefixes))
+
+        for round_ in range(5):
+            # New terms, more hits for existing ones and brands now sharing the prefix
+            self.add(*(f'Serum {round_}{i:03d} Plus' for i in range(rng.randint(1, 30))))
+            self.add(f'Sheet Mask {round_}', brand=f'Serumology {round_}')
+            for _ in range(rng.randint(1, 4)):
+                self.products.record_query(f'serum {rng.randint(0, 299):04d}')
+            self.index.refresh()
+            for prefix in prefixes:
+                with self.subTest(round=round_, prefix=prefix):
+                    self.assertEqual(self.ranks(prefix), brute_force(self.index, prefix))
+        self.assertLessEqual(set(prefixes), set(self.index._snapshot.top))
+
+    def test_resort_drops_the_memo(self):
+        self.add(*(f'Cream {i:04d}' for i in range(suggest.SCAN_LIMIT + 1)))
+        self.index.refresh()
+        self.index.suggest('cream')
+        self.assertIn('cream', self.index._snapshot.top)
+        self.add(*(f'Cream Plus {i:04d}' for i in range(suggest.RESORT_THRESHOLD + 1)))
+        self.index.refresh()
+        self.assertEqual(self.index._snapshot.top, {})
+        self.assertEqual(self.ranks('cream'), brute_force(self.index, 'cream'))
+
@@ -0,0 +1,93 @@
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from scraper.cache import ResultCache
+from scraper.politeness import get_scheduler
+from scraper.sources import SourceRegistry
+from scraper.warmer import QUICK_SEARCH_LIMIT, CacheWarmer, QueryTracker
+
+from .fakes import FakeSource
+
+
+class QueryTrackerTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tracker = QueryTracker(Path(tmp.name) / 'queries.sqlite3', flush_every=1000)
+
+    def test_top_queries_by_count(self):
+        for query in ['Face Wash', 'face  wash', 'shoes', 'face wash', '']:
+            self.tracker.record(query)
+        self.tracker.record('shoes', limit=50)
+        top = self.tracker.top()
+        self.assertEqual(top[0][:2], ('face wash', 20))
+        self.assertAlmostEqual(top[0][2], 3, places=3)
+        self.assertEqual(len(top), 3)
+
+    def test_scores_decay(self):
+        self.tracker.half_life = 0.05
+        self.tracker.record('old')
+        self.tracker.flush()
+        time.sleep(0.1)
+        self.tracker.record('new')
+        scores = {query: score for query, _, score in self.tracker.top()}
+        self.assertLess(scores['old'], 0.5)
+        self.assertAlmostEqual(scores['new'], 1.0, places=1)
+
+
+class CacheWarmerTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.cache = ResultCache(disk_path=Path(tmp.name) / 'results.sqlite3')
+        self.tracker = QueryTracker(Path(tmp.name) / 'queries.sqlite3')
+        self.source = FakeSource('shop', [{'id': 1, 'name': 'x', 'price': '10'}])
+        self.source.domain = f'warm-{id(self)}.test'
+
+    def warmer(self, seeds=()):
+        warmer = CacheWarmer(SourceRegistry([self.source]), self.cache, self.tracker, seeds=list(seeds))
+        self.addCleanup(warmer._executor.shutdown)
+        return warmer
+
+    def test_plan_covers_missing_and_expiring_entries(self):
+        for query in ('cold', 'warm', 'expiring', 'empty'):
+            self.tracker.record(query)
+        self.cache.set(self.source.cache_key('warm', 20), {'products': [1]}, ttl=600)
+        self.cache.set(self.source.cache_key('expiring', 20), {'products': [1]}, ttl=0.5)
+        self.cache.set(self.source.cache_key('empty', 20), {}, ttl=60, stale_ttl=0, negative=True)
+        time.sleep(0.45)
+        plan = self.warmer(seeds=['Sandals']).plan()
+        self.assertEqual({(item['query'], item['limit']) for item in plan},
+                         {('cold', 20), ('expiring', 20), ('sandals', QUICK_SEARCH_LIMIT)})
+        self.assertEqual(plan[0]['query'], 'cold')
+
+    def test_run_once_refreshes(self):
+        self.tracker.record('soap')
+        summary = self.warmer().run_once()
+        self.assertEqual(summary, {'planned': 1, 'refreshed': 1, 'skipped_busy': 0, 'failed': 0})
+        value, meta = self.cache.get(self.source.cache_key('soap', 20))
+        self.assertEqual(len(value['products']), 1)
+
+    def test_skips_sources_whose_outbound_rate_live_traffic_used_up(self):
+        # Live requests from any worker drain the shared bucket
+        scheduler = get_scheduler()
+        while scheduler.has_capacity(self.source.domain):
+            scheduler.throttle(self.source.domain)
+        self.tracker.record('soap')
+        summary = self.warmer().run_once()
+        self.assertEqual(summary['skipped_busy'], 1)
+        self.assertEqual(self.source.calls, 0)
+
+    def test_empty_results_count_as_failed(self):
+        self.source.products = []
+        self.tracker.record('nothing')
+        self.assertEqual(self.warmer().run_once()['failed'], 1)
+
+    def test_stopped_warmer_refreshes_nothing(self):
+        self.tracker.record('soap')
+        warmer = self.warmer()
+        warmer._stop.set()
+        self.assertEqual(warmer.run_once()['refreshed'], 0)
+        self.assertEqual(self.source.calls, 0)
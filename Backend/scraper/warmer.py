@@ -0,0 +1,260 @@
+"""
+Background Cache Warmer
+Tracks how often each query is searched and refreshes the cached results of
+the most popular ones before they expire, so head queries rarely pay for a
+cold scrape.
+"""
+
+import logging
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from . import storage
+from .admission import Overloaded
+from .cache import ResultCache, get_result_cache, normalize_query
+from .politeness import background, get_scheduler
+from .sources import SourceRegistry, default_registry
+
+logger = logging.getLogger(__name__)
+
+# Quick-search tags offered by the frontend search modal, plus its default query.
+# The product grid requests them through /api/lowest-prices/ with limit=50.
+QUICK_SEARCHES = ['shoes', 'sneakers', 'boots', 'sandals', 'face wash', 'skincare', 'moisturizer']
+QUICK_SEARCH_LIMIT = 50
+
+
+class QueryTracker:
+    """
+    Exponentially decayed query frequency, shared by workers through SQLite.
+
+    Hits are buffered in memory and flushed in batches to keep the request
+    path free of per-request writes.
+    """
+
+    def __init__(self, path=None, half_life: float = 24 * 3600,
+                 flush_every: int = 50, flush_interval: float = 10.0):
+        self.path = path or storage.data_path('queries.sqlite3')
+        self.half_life = half_life
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self._pending: Counter = Counter()
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._conn = storage.connect(self.path)
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS query_stats (
+                query TEXT NOT NULL,
+                query_limit INTEGER NOT NULL,
+                score REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (query, query_limit)
+            )
+        ''')
+        self._conn.commit()
+
+    def record(self, query: str, limit: int = 20):
+        """Count one search for query"""
+        query = normalize_query(query)
+        if not query:
+            return
+        with self._lock:
+            self._pending[(query, int(limit))] += 1
+            due = (sum(self._pending.values()) >= self.flush_every
+                   or time.monotonic() - self._last_flush >= self.flush_interval)
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Write buffered hits to the shared table"""
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+            self._last_flush = time.monotonic()
+            if not pending:
+                return
+            now = time.time()
+            try:
+                for (query, limit), hits in pending.items():
+                    row = self._conn.execute(
+                        'SELECT score, updated_at FROM query_stats WHERE query = ? AND query_limit = ?',
+                        (query, limit),
+                    ).fetchone()
+                    score = self._decay(row[0], row[1], now) + hits if row else hits
+                    self._conn.execute(
+                        'INSERT OR REPLACE INTO query_stats VALUES (?, ?, ?, ?)',
+                        (query, limit, score, now),
+                    )
+                self._conn.commit()
+            except Exception as e:
+                logger.warning(f"Could not flush query stats: {e}")
+
+    def top(self, n: int = 100) -> List[Tuple[str, int, float]]:
+        """The n most popular (query, limit, decayed score) entries"""
+        self.flush()
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                # Anything untouched for ten half-lives has decayed to nothing
+                'SELECT query, query_limit, score, updated_at FROM query_stats WHERE updated_at > ?',
+                (now - 10 * self.half_life,),
+            ).fetchall()
+        scored = [(query, limit, self._decay(score, updated_at, now)) for query, limit, score, updated_at in rows]
+        scored.sort(key=lambda row: row[2], reverse=True)
+        return scored[:n]
+
+    def _decay(self, score: float, updated_at: float, now: float) -> float:
+        return score * 0.5 ** ((now - updated_at) / self.half_life)
+
+
+class CacheWarmer:
+    """
+    Refresh cached source results for popular queries before they expire.
+
+    Each pass ranks (query, source) pairs by popularity and staleness and
+    refreshes them through at most `max_sessions` concurrent fetches (and so
+    at most `max_sessions` browsers of its own for Daraz).
+
+    A refresh is skipped as busy when the source's domain has no outbound
+    token free for background work. The token buckets are shared by every
+    worker process, so this sees live traffic when the warmer runs as its
+    own process (manage.py warm_cache). When it runs inside a web process
+    (start()), it also leaves that process at least one of the source's
+    concurrency slots.
+    """
+
+    def __init__(self, registry: Optional[SourceRegistry] = None,
+                 cache: Optional[ResultCache] = None,
+                 tracker: Optional[QueryTracker] = None,
+                 top_n: int = 100, max_sessions: int = 1,
+                 refresh_ahead: float = 0.25, seeds: Optional[List[str]] = None):
+        self.registry = registry or default_registry
+        self.cache = cache or get_result_cache()
+        self.tracker = tracker or get_query_tracker()
+        self.top_n = top_n
+        self.max_sessions = max_sessions
+        self.refresh_ahead = refresh_ahead
+        self.seeds = QUICK_SEARCHES if seeds is None else seeds
+        self._executor = ThreadPoolExecutor(max_workers=max_sessions, thread_name_prefix='cache-warmer')
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def plan(self) -> List[Dict]:
+        """
+        Work for the next pass, highest priority first.
+
+        priority = popularity * (0.5 + urgency), where urgency runs from 0
+        (just refreshed) to 1 (missing, expired or stale).
+        """
+        popular = {(query, limit): score for query, limit, score in self.tracker.top(self.top_n)}
+        for seed in self.seeds:
+            key = (normalize_query(seed), QUICK_SEARCH_LIMIT)
+            popular[key] = max(popular.get(key, 0), 1.0)
+
+        now = time.time()
+        work = []
+        for (query, limit), popularity in popular.items():
+            for source in self.registry.sources():
+                entry = self.cache.peek(source.cache_key(query, limit))
+                urgency = self._urgency(entry, now)
+                if urgency is None:
+                    continue
+                work.append({
+                    'query': query,
+                    'limit': limit,
+                    'source': source.name,
+                    'priority': round(popularity * (0.5 + urgency), 3),
+                })
+        work.sort(key=lambda item: item['priority'], reverse=True)
+        return work
+
+    def _urgency(self, entry, now: float) -> Optional[float]:
+        """How badly an entry needs refreshing, None if it can wait"""
+        if entry is None:
+            return 1.0
+        state = entry.state(now)
+        if entry.negative and state:
+            # Don't hammer a source that just came back empty
+            return None
+        if state != 'fresh':
+            return 1.0
+        ttl = entry.fresh_until - entry.stored_at
+        remaining = entry.fresh_until - now
+        if ttl <= 0 or remaining > self.refresh_ahead * ttl:
+            return None
+        return 1.0 - remaining / ttl
+
+    def run_once(self) -> Dict:
+        """Run one warming pass and wait for it to finish"""
+        work = self.plan()
+        summary = {'planned': len(work), 'refreshed': 0, 'skipped_busy': 0, 'failed': 0}
+        lock = threading.Lock()
+
+        def refresh(item):
+            if self._stop.is_set():
+                return
+            source = self.registry.get(item['source'])
+            if source is None or self._busy(source):
+                outcome = 'skipped_busy'
+            else:
+                try:
+                    with background():
+                        meta = source.refresh(item['query'], item['limit'], self.cache)
+                    outcome = 'failed' if meta.get('negative') else 'refreshed'
+                except Overloaded:
+                    outcome = 'skipped_busy'
+                except Exception as e:
+                    logger.warning(f"Warming {item['source']} '{item['query']}' failed: {e}")
+                    outcome = 'failed'
+            with lock:
+                summary[outcome] += 1
+
+        for future in [self._executor.submit(refresh, item) for item in work]:
+            future.result()
+        return summary
+
+    def _busy(self, source) -> bool:
+        """Whether live traffic leaves no room to warm source right now (see class docstring)"""
+        if source.domain and not get_scheduler().has_capacity(source.domain):
+            return True
+        # in_flight only counts this process's searches
+        return source.in_flight >= max(1, source.max_concurrency - 1)
+
+    def run_forever(self, interval: float = 60.0):
+        """Run warming passes every `interval` seconds until stop() is called"""
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                summary = self.run_once()
+                logger.info(f"Cache warmer pass: {summary}")
+            except Exception as e:
+                logger.error(f"Cache warmer pass failed: {e}")
+            self._stop.wait(max(0.0, interval - (time.monotonic() - started)))
+
+    def start(self, interval: float = 60.0):
+        """Run the warmer in a daemon thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self.run_forever, args=(interval,), name='cache-warmer', daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+
+_default_tracker: Optional[QueryTracker] = None
+_default_lock = threading.Lock()
+
+
+def get_query_tracker() -> QueryTracker:
+    """Return the process-wide query tracker, creating it on first use"""
+    global _default_tracker
+    with _default_lock:
+        if _default_tracker is None:
+            _default_tracker = QueryTracker()
+        return _default_tracker
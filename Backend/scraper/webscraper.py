@@ -3,6 +3,11 @@ from bs4 import BeautifulSoup
 import re
 import json
 
+from .admission import Overloaded, get_bulkhead
+from .politeness import get_scheduler
+from .product_index import record_products
+
+
 class WebScraper:
     """
     Web scraper for extracting product data from various ecommerce sites.
@@ -18,8 +23,15 @@ class WebScraper:
     }
 
     def fetch(self, url):
-        """Fetch and parse product data from a given URL."""
-        response = requests.get(url, headers=self.HEADERS, timeout=15)
+        """Fetch and parse product data from a given URL (products are added to the local index)."""
+        return record_products(self._fetch(url))
+
+    def _fetch(self, url):
+        scheduler = get_scheduler()
+        with get_bulkhead('webscraper').slot():
+            scheduler.throttle(url)
+            response = requests.get(url, headers=self.HEADERS, timeout=15)
+        scheduler.report(url, status=response.status_code)
         response.raise_for_status()
         soup = BeautifulSoup(response.text, 'html.parser')
         
@@ -203,6 +215,8 @@ class WebScraper:
                 try:
                     data = self.fetch(search_urls[site_name])
                     results.extend(data.get('products', []))
+                except Overloaded:
+                    raise
                 except Exception as e:
                     print(f"Error scraping {site_name}: {e}")
         
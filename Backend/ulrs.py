@@ -1,30 +1,56 @@
 from rest_framework import routers
 from django.urls import path, include
+from django.conf import settings
 from api import views as api_views
 
+# Scraping endpoints come from the async views when running under ASGI
+if settings.ASYNC_VIEWS:
+    from api import async_views as scrape_views
+else:
+    scrape_views = api_views
+
 router = routers.DefaultRouter()
 
 urlpatterns = [
     path('api/', include(router.urls)),
     
     # Scraping endpoints
-    path('api/scrape/', api_views.ScrapeView.as_view(), name='scrape'),
+    path('api/scrape/', scrape_views.ScrapeView.as_view(), name='scrape'),
     path('api/search-shoes/', api_views.SearchShoesView.as_view(), name='search-shoes'),
     
     # Daraz API endpoints (Nepal focus)
-    path('api/daraz/search/', api_views.DarazSearchView.as_view(), name='daraz-search'),
+    path('api/daraz/search/', scrape_views.DarazSearchView.as_view(), name='daraz-search'),
     path('api/daraz/category/', api_views.DarazCategoryView.as_view(), name='daraz-category'),
     path('api/daraz/deals/', api_views.DarazDealsView.as_view(), name='daraz-deals'),
     path('api/daraz/product/', api_views.DarazProductDetailView.as_view(), name='daraz-product'),
     
     # Jeevee API endpoints (Nepal only)
-    path('api/jeevee/search/', api_views.JeeveeSearchView.as_view(), name='jeevee-search'),
+    path('api/jeevee/search/', scrape_views.JeeveeSearchView.as_view(), name='jeevee-search'),
     path('api/jeevee/products/', api_views.JeeveeProductsView.as_view(), name='jeevee-products'),
     path('api/jeevee/categories/', api_views.JeeveeCategoriesView.as_view(), name='jeevee-categories'),
     
     # Price Comparison endpoints (Daraz vs Jeevee)
-    path('api/compare/', api_views.PriceCompareView.as_view(), name='price-compare'),
-    path('api/lowest-prices/', api_views.LowestPricesView.as_view(), name='lowest-prices'),
+    path('api/compare/', scrape_views.PriceCompareView.as_view(), name='price-compare'),
+    path('api/compare/stream/', api_views.PriceCompareStreamView.as_view(), name='price-compare-stream'),
+    path('api/lowest-prices/', scrape_views.LowestPricesView.as_view(), name='lowest-prices'),
+    path('api/cache/stats/', api_views.CacheStatsView.as_view(), name='cache-stats'),
+    path('api/prefetch/stats/', api_views.PrefetchStatsView.as_view(), name='prefetch-stats'),
+    path('api/admission/stats/', api_views.AdmissionStatsView.as_view(), name='admission-stats'),
+    path('api/outbound/stats/', api_views.OutboundStatsView.as_view(), name='outbound-stats'),
+    
+    # Search over every product scraped so far (no upstream requests)
+    path('api/local-search/', api_views.LocalSearchView.as_view(), name='local-search'),
+    path('api/local-search/stats/', api_views.LocalIndexStatsView.as_view(), name='local-search-stats'),
+    path('api/suggest/', api_views.SuggestView.as_view(), name='suggest'),
+    path('api/suggest/stats/', api_views.SuggestStatsView.as_view(), name='suggest-stats'),
+    
+    # Several searches in one request
+    path('api/batch/', api_views.BatchView.as_view(), name='batch'),
+    
+    # Background jobs (processed by `manage.py run_jobs`)
+    path('api/jobs/', api_views.JobListView.as_view(), name='job-list'),
+    path('api/jobs/<str:job_id>/', api_views.JobDetailView.as_view(), name='job-detail'),
+    path('api/jobs/<str:job_id>/result/', api_views.JobResultView.as_view(), name='job-result'),
     
     # Product endpoints
     path('api/products/', api_views.ProductListView.as_view(), name='product-list'),
@@ -37,6 +63,7 @@ urlpatterns = [
     path('api/nav-links/', api_views.NavLinksView.as_view(), name='nav-links'),
     path('api/performance/', api_views.PerformanceView.as_view(), name='performance'),
     path('api/features/', api_views.FeaturesView.as_view(), name='features'),
+    path('api/bootstrap/', api_views.BootstrapView.as_view(), name='bootstrap'),
     
     # Contact
     path('api/contact/', api_views.ContactView.as_view(), name='contact'),
@@ -12,14 +12,18 @@ const ProductGrid = forwardRef((props, ref) => {
     const [sources, setSources] = useState({ daraz: 0, jeevee: 0 });
     const initialSearchDone = useRef(false);
 
-    // Fetch products from API
-    const fetchProducts = async (query = 'moisturizer') => {
+    // Product fields ProductCard renders; the server drops the rest
+    const CARD_FIELDS = 'id,name,price,original_price,discount,image,rating,brand,source,url,link';
+
+    // Fetch products from API, filtered by source on the server
+    const fetchProducts = async (query = 'moisturizer', source = sourceFilter) => {
         setLoading(true);
         setError(null);
         setSearchQuery(query);
         
         try {
-            const url = `${API_BASE_URL}/api/lowest-prices/?q=${encodeURIComponent(query)}&region=np&limit=50&min_rating=0`;
+            const sourceParam = source === 'all' ? '' : `&source=${source}`;
+            const url = `${API_BASE_URL}/api/lowest-prices/?q=${encodeURIComponent(query)}&region=np&limit=50&min_rating=0&facets=true&fields=${CARD_FIELDS}${sourceParam}`;
             console.log('Fetching:', url);
             
             const response = await fetch(url);
@@ -30,13 +34,11 @@ const ProductGrid = forwardRef((props, ref) => {
             const data = await response.json();
             console.log('API Response:', data);
             
-            const productList = data.products || [];
-            setProducts(productList);
+            setProducts(data.products || []);
             
-            // Count products by source
-            const darazCount = productList.filter(p => p.source === 'Daraz').length;
-            const jeeveeCount = productList.filter(p => p.source === 'Jeevee').length;
-            setSources({ daraz: darazCount, jeevee: jeeveeCount });
+            // Per-source counts ignore the source filter, so every button keeps its count
+            const counts = data.facets?.source || {};
+            setSources({ daraz: counts.daraz || 0, jeevee: counts.jeevee || 0 });
             
         } catch (err) {
             console.error('Fetch error:', err);
@@ -70,10 +72,15 @@ const ProductGrid = forwardRef((props, ref) => {
         }
     };
 
-    // Filter products by source
-    const filteredProducts = sourceFilter === 'all' 
-        ? products 
-        : products.filter(p => p.source?.toLowerCase() === sourceFilter);
+    const handleSourceFilter = (source) => {
+        setSourceFilter(source);
+        if (searchQuery) {
+            fetchProducts(searchQuery, source);
+        }
+    };
+
+    // Already filtered by source on the server
+    const filteredProducts = products;
 
     return (
         <section id="products" className="min-h-screen bg-gradient-to-b from-gray-900 to-black text-white py-16 px-4 md:px-8">
@@ -143,13 +150,13 @@ const ProductGrid = forwardRef((props, ref) => {
                     {/* Source Filter */}
                     <div className="flex gap-2">
                         {[
-                            { value: 'all', label: 'All Sources', count: products.length },
+                            { value: 'all', label: 'All Sources', count: sources.daraz + sources.jeevee },
                             { value: 'daraz', label: 'Daraz', count: sources.daraz, color: 'orange' },
                             { value: 'jeevee', label: 'Jeevee', count: sources.jeevee, color: 'green' },
                         ].map(({ value, label, count, color }) => (
                             <button
                                 key={value}
-                                onClick={() => setSourceFilter(value)}
+                                onClick={() => handleSourceFilter(value)}
                                 className={`px-4 py-2 rounded-full text-sm font-medium transition-all ${
                                     sourceFilter === value
                                         ? color === 'orange' 
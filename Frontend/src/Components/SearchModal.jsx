@@ -1,7 +1,12 @@
 import { useState, useEffect, useRef } from 'react';
+import { getSuggestions } from '../services/api';
+
+// Wait this long after the last keystroke before asking for suggestions
+const SUGGEST_DELAY_MS = 80;
 
 const SearchModal = ({ isOpen, onClose, onSearch, loading }) => {
     const [query, setQuery] = useState('');
+    const [suggestions, setSuggestions] = useState([]);
     const inputRef = useRef(null);
 
     useEffect(() => {
@@ -24,6 +29,28 @@ const SearchModal = ({ isOpen, onClose, onSearch, loading }) => {
         };
     }, [isOpen, onClose]);
 
+    useEffect(() => {
+        if (!isOpen || !query.trim()) {
+            setSuggestions([]);
+            return;
+        }
+        const controller = new AbortController();
+        const timer = setTimeout(() => {
+            getSuggestions(query, 8, controller.signal)
+                .then((data) => setSuggestions(data.suggestions || []))
+                .catch(() => {});
+        }, SUGGEST_DELAY_MS);
+        return () => {
+            clearTimeout(timer);
+            controller.abort();
+        };
+    }, [isOpen, query]);
+
+    const pick = (term) => {
+        onSearch(term);
+        onClose();
+    };
+
     const handleSubmit = (e) => {
         e.preventDefault();
         if (query.trim()) {
@@ -75,16 +102,31 @@ const SearchModal = ({ isOpen, onClose, onSearch, loading }) => {
                         </button>
                     </div>
                     
+                    {/* Typeahead Suggestions */}
+                    {suggestions.length > 0 && (
+                        <ul className="mt-2 bg-gray-900 border border-gray-700 rounded-2xl overflow-hidden">
+                            {suggestions.map((suggestion) => (
+                                <li key={suggestion.text}>
+                                    <button
+                                        type="button"
+                                        onClick={() => pick(suggestion.text)}
+                                        className="w-full flex items-center justify-between px-6 py-3 text-left text-gray-200 hover:bg-gray-800 transition-colors"
+                                    >
+                                        <span>{suggestion.text}</span>
+                                        <span className="text-xs text-gray-500">{suggestion.type}</span>
+                                    </button>
+                                </li>
+                            ))}
+                        </ul>
+                    )}
+                    
                     {/* Quick Search Suggestions */}
                     <div className="mt-4 flex flex-wrap gap-2 justify-center">
                         {['shoes', 'sneakers', 'boots', 'sandals', 'face wash', 'skincare'].map((term) => (
                             <button
                                 key={term}
                                 type="button"
-                                onClick={() => {
-                                    onSearch(term);
-                                    onClose();
-                                }}
+                                onClick={() => pick(term)}
                                 className="px-4 py-2 bg-gray-800 hover:bg-gray-700 text-gray-300 rounded-full text-sm transition-colors"
                             >
                                 {term}
@@ -70,6 +70,23 @@ export function useCart() {
     return { cart, addItem, removeItem, loading, refetch: fetchCart };
 }
 
+/**
+ * Hook to fetch everything the first page load needs in one request
+ */
+export function useBootstrap() {
+    const [data, setData] = useState({ navLinks: [], performanceData: [], features: [], featuredProducts: [] });
+    const [loading, setLoading] = useState(true);
+
+    useEffect(() => {
+        api.getBootstrap()
+            .then(setData)
+            .catch(err => console.error('Failed to fetch bootstrap data:', err))
+            .finally(() => setLoading(false));
+    }, []);
+
+    return { ...data, loading };
+}
+
 /**
  * Hook to fetch features data
  */
@@ -78,7 +95,7 @@ export function useFeatures() {
     const [loading, setLoading] = useState(true);
 
     useEffect(() => {
-        api.getFeatures()
+        api.getBootstrap()
             .then(data => setFeatures(data.features || []))
             .catch(err => console.error('Failed to fetch features:', err))
             .finally(() => setLoading(false));
@@ -95,7 +112,7 @@ export function usePerformance() {
     const [loading, setLoading] = useState(true);
 
     useEffect(() => {
-        api.getPerformanceData()
+        api.getBootstrap()
             .then(data => setPerformanceData(data.performanceData || []))
             .catch(err => console.error('Failed to fetch performance data:', err))
             .finally(() => setLoading(false));
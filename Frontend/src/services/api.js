@@ -44,14 +44,15 @@ export const getFeaturedProducts = () => {
     return fetchAPI('/api/products/?featured=true');
 };
 
-// Cart APIs
+// Cart APIs (the cart belongs to the session cookie, so send it cross-origin)
 export const getCart = () => {
-    return fetchAPI('/api/cart/');
+    return fetchAPI('/api/cart/', { credentials: 'include' });
 };
 
 export const addToCart = (productId, quantity = 1, size = null, color = null) => {
     return fetchAPI('/api/cart/', {
         method: 'POST',
+        credentials: 'include',
         body: JSON.stringify({ product_id: productId, quantity, size, color }),
     });
 };
@@ -59,6 +60,7 @@ export const addToCart = (productId, quantity = 1, size = null, color = null) =>
 export const removeFromCart = (productId, size = null, color = null) => {
     return fetchAPI('/api/cart/', {
         method: 'DELETE',
+        credentials: 'include',
         body: JSON.stringify({ product_id: productId, size, color }),
     });
 };
@@ -76,6 +78,22 @@ export const getFeatures = () => {
     return fetchAPI('/api/features/');
 };
 
+let bootstrapPromise = null;
+
+/**
+ * Nav links, performance data, features and featured products in one request.
+ * Shared by every caller on the page; the browser revalidates it with its ETag.
+ */
+export const getBootstrap = () => {
+    if (!bootstrapPromise) {
+        bootstrapPromise = fetchAPI('/api/bootstrap/').catch((error) => {
+            bootstrapPromise = null;
+            throw error;
+        });
+    }
+    return bootstrapPromise;
+};
+
 // Scraper APIs
 export const scrapeProducts = (url) => {
     return fetchAPI('/api/scrape/', {
@@ -148,6 +166,50 @@ export const getLowestPrices = (query, region = 'np', limit = 50) => {
     return fetchAPI(`/api/lowest-prices/?q=${encodeURIComponent(query)}&region=${region}&limit=${limit}`);
 };
 
+/**
+ * Typeahead suggestions for a partly typed query, most popular first.
+ * Resolves to { query, suggestions: [{ text, type, score }] }; pass an
+ * AbortController signal to cancel a request made stale by the next keystroke.
+ */
+export const getSuggestions = (prefix, limit = 8, signal) => {
+    return fetchAPI(`/api/suggest/?q=${encodeURIComponent(prefix)}&limit=${limit}`, { signal });
+};
+
+/**
+ * Run several searches in one request.
+ * operations: [{ id, op, params }] with op one of compare, lowest_prices,
+ * jeevee_search, daraz_search, scrape. Resolves to { results: [{ id, op, status, data | error }] }.
+ */
+export const batch = (operations, deadline = 30) => {
+    return fetchAPI('/api/batch/', {
+        method: 'POST',
+        body: JSON.stringify({ operations, deadline }),
+    });
+};
+
+/**
+ * Stream a price comparison over Server-Sent Events.
+ * Handlers: onSource(sourceResult), onMatches(items), onSummary(summary), onError(error)
+ * Returns a function that closes the stream.
+ */
+export const streamComparePrices = (query, handlers = {}, { limit = 20, minRating = 4 } = {}) => {
+    const url = `${API_BASE_URL}/api/compare/stream/?q=${encodeURIComponent(query)}&limit=${limit}&min_rating=${minRating}`;
+    const source = new EventSource(url);
+
+    source.addEventListener('source', (e) => handlers.onSource?.(JSON.parse(e.data)));
+    source.addEventListener('matches', (e) => handlers.onMatches?.(JSON.parse(e.data).items));
+    source.addEventListener('summary', (e) => {
+        handlers.onSummary?.(JSON.parse(e.data));
+        source.close();
+    });
+    source.addEventListener('error', (e) => {
+        handlers.onError?.(e.data ? JSON.parse(e.data) : e);
+        source.close();
+    });
+
+    return () => source.close();
+};
+
 export default {
     getProducts,
     getProductById,
@@ -158,6 +220,7 @@ export default {
     getNavLinks,
     getPerformanceData,
     getFeatures,
+    getBootstrap,
     scrapeProducts,
     searchShoes,
     submitContact,
@@ -171,4 +234,7 @@ export default {
     getJeeveeCategories,
     compareAllPrices,
     getLowestPrices,
+    getSuggestions,
+    streamComparePrices,
+    batch,
 };